@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dimension-reduced vector indexes vs the full-dimension index.
+
+Indexes the same corpus at full size and reduced by truncation and by
+random projection (ReducedEmbedding), then compares KNN latency, index
+size and semantic-cache hit agreement: whether each probe would hit, and
+on which entry, at the same similarity threshold as the full index.
+
+Without --vectors the corpus is synthetic: clustered vectors whose
+variance decays across dimensions, the way Matryoshka-trained models
+(text-embedding-3) front-load information. Probes are paraphrase-like
+perturbations of stored vectors plus unrelated queries. For real numbers,
+pass a float32 .npy of OpenAI embeddings (rows = queries).
+
+Usage:
+    python benchmarks/embedding_reduction_bench.py
+    python benchmarks/embedding_reduction_bench.py --vectors data/openai_queries.npy --threshold 0.85
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import structlog
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.embeddings import EmbeddingProvider, ReducedEmbedding
+from src.tools.search_cache import _create_vec_table, _insert_vectors, _load_vec
+
+
+class _Precomputed(EmbeddingProvider):
+    """Dimensions of the corpus; vectors are reduced directly with ReducedEmbedding.reduce()."""
+
+    def __init__(self, dims: int):
+        self._dims = dims
+
+    @property
+    def dimensions(self) -> int:
+        return self._dims
+
+    def embed(self, text: str) -> bytes:
+        raise NotImplementedError
+
+
+def unit(vectors: np.ndarray) -> np.ndarray:
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def make_corpus(size: int, dims: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    scale = (1.0 + np.arange(dims)) ** -0.5
+    centres = rng.normal(size=(clusters, dims))
+    vectors = centres[rng.integers(0, clusters, size)] + 0.8 * rng.normal(size=(size, dims))
+    return unit(vectors * scale)
+
+
+def make_probes(corpus: np.ndarray, n: int, noise: float, seed: int) -> np.ndarray:
+    """Half perturbed corpus vectors (should hit), half fresh ones (mostly miss)."""
+    rng = np.random.default_rng(seed)
+    dims = corpus.shape[1]
+    scale = (1.0 + np.arange(dims)) ** -0.5
+    near = corpus[rng.integers(0, len(corpus), n // 2)] + noise * unit(rng.normal(size=(n // 2, dims)) * scale)
+    far = rng.normal(size=(n - n // 2, dims)) * scale
+    return unit(np.vstack([near, far]))
+
+
+def build(conn: sqlite3.Connection, table: str, vectors: np.ndarray) -> None:
+    _create_vec_table(conn, table, vectors.shape[1])
+    batch = 5000
+    for start in range(0, len(vectors), batch):
+        _insert_vectors(conn, table, "none", [
+            (i + 1, "basic", 5, vectors[i].tobytes(), 1e12, f"key{i}", f"query {i}")
+            for i in range(start, min(start + batch, len(vectors)))
+        ])
+    conn.commit()
+
+
+def lookup(conn, table: str, query: bytes, threshold: float):
+    """The entry a semantic lookup would return (top-3 KNN, best above threshold), or None."""
+    rows = conn.execute(
+        f"SELECT rowid, distance FROM {table} WHERE embedding MATCH ? AND k = 3 "
+        f"AND search_depth = 'basic' AND max_results = 5 ORDER BY distance",
+        (query,),
+    ).fetchall()
+    if rows and 1.0 - rows[0][1] ** 2 / 2.0 >= threshold:
+        return rows[0][0]
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vectors', help='float32 .npy of real embeddings (default: synthetic)')
+    parser.add_argument('--corpus', type=int, default=20_000, help='Synthetic vectors (default: 20000)')
+    parser.add_argument('--dims', type=int, default=1536, help='Synthetic dimensions (default: 1536)')
+    parser.add_argument('--clusters', type=int, default=500, help='Synthetic topic clusters (default: 500)')
+    parser.add_argument('--queries', type=int, default=400, help='Probe queries (default: 400)')
+    parser.add_argument('--noise', type=float, default=0.6,
+                        help='Paraphrase perturbation (default: 0.6)')
+    parser.add_argument('--threshold', type=float, default=0.85,
+                        help='Similarity threshold (default: 0.85, the OpenAI default)')
+    parser.add_argument('--targets', type=int, nargs='+', default=[512, 256],
+                        help='Reduced sizes (default: 512 256)')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    if args.vectors:
+        corpus = unit(np.load(args.vectors).astype(np.float32))
+        rng = np.random.default_rng(args.seed)
+        held_out = rng.permutation(len(corpus))
+        probes, corpus = corpus[held_out[:args.queries]], corpus[held_out[args.queries:]]
+        source = f"{args.vectors}"
+    else:
+        corpus = make_corpus(args.corpus, args.dims, args.clusters, args.seed)
+        probes = make_probes(corpus, args.queries, args.noise, args.seed + 1)
+        source = "synthetic"
+    full = _Precomputed(corpus.shape[1])
+
+    variants = [("full", None)]
+    for target in args.targets:
+        variants += [(f"truncate {target}", ReducedEmbedding(full, target)),
+                     (f"projection {target}", ReducedEmbedding(full, target, method="projection"))]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        if not _load_vec(conn):
+            sys.exit("sqlite-vec is not loadable in this Python build")
+
+        print(f"Embedding reduction benchmark — {source}: {len(corpus)} vectors x {corpus.shape[1]} dims, "
+              f"{len(probes)} queries, threshold {args.threshold:g}\n")
+        print(f"{'index':<17}{'dims':>6}{'index MB':>10}{'mean ms':>9}{'p95 ms':>8}"
+              f"{'hit rate':>10}{'agreement':>11}")
+        reference = None
+        for name, reducer in variants:
+            table = "bench_" + name.replace(" ", "_")
+            stored = corpus if reducer is None else reducer.reduce(corpus)
+            queries = probes if reducer is None else reducer.reduce(probes)
+            build(conn, table, stored)
+            size = conn.execute(f"SELECT SUM(LENGTH(vectors)) FROM {table}_vector_chunks00").fetchone()[0]
+
+            timings, hits = [], []
+            for query in queries:
+                start = time.perf_counter()
+                hits.append(lookup(conn, table, query.tobytes(), args.threshold))
+                timings.append(time.perf_counter() - start)
+            if reference is None:
+                reference = hits
+            agreement = sum(a == b for a, b in zip(hits, reference)) / len(hits)
+            hit_rate = sum(h is not None for h in hits) / len(hits)
+            p95 = sorted(timings)[int(0.95 * (len(timings) - 1))]
+            print(f"{name:<17}{stored.shape[1]:>6}{size / 1e6:>10.1f}{statistics.mean(timings) * 1000:>9.2f}"
+                  f"{p95 * 1000:>8.2f}{hit_rate:>10.1%}{agreement:>11.1%}")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
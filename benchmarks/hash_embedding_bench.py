@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: HashEmbedding throughput, per-text loop vs embed_batch().
+
+"legacy" is the original per-text implementation (hex-digest parsing and
+one numpy update per token), kept here as the reference; every run also
+checks that embed_batch() reproduces it bit for bit.
+
+Usage:
+    python benchmarks/hash_embedding_bench.py
+    python benchmarks/hash_embedding_bench.py --sizes 1000 10000 --dims 1536
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.embeddings import HashEmbedding
+
+VOCABULARY = (
+    "quantum computing machine learning climate change ocean warming arctic ice "
+    "renewable energy solar wind battery storage ai safety regulation europe "
+    "protein folding drug discovery trends 2025 market analysis startup funding "
+    "supply chain semiconductor policy election results history of the roman empire"
+).split()
+
+
+def legacy_embed(text: str, dims: int) -> bytes:
+    """The pre-batching HashEmbedding.embed."""
+    cleaned = ''.join(c if c.isalnum() or c.isspace() else ' ' for c in text.lower())
+    words = cleaned.split()
+    tokens = list(words)
+    tokens += [f"{words[i]}_{words[i+1]}" for i in range(len(words) - 1)]
+    tokens += [f"{words[i]}_{words[i+1]}_{words[i+2]}" for i in range(len(words) - 2)]
+    vec = np.zeros(dims, dtype=np.float32)
+    for token in tokens:
+        h = hashlib.md5(token.encode()).hexdigest()
+        pos = int(h[:8], 16) % dims
+        sign = 1.0 if int(h[8:16], 16) % 2 == 0 else -1.0
+        vec[pos] += sign
+    norm = np.linalg.norm(vec)
+    if norm > 0:
+        vec = vec / norm
+    return vec.tobytes()
+
+
+def make_queries(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(3, 10))) for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                        help='Batch sizes (default: 1000 10000 100000)')
+    parser.add_argument('--dims', type=int, default=256, help='Embedding dimensions (default: 256)')
+    args = parser.parse_args()
+
+    print(f"HashEmbedding throughput — {args.dims} dims\n")
+    print(f"{'queries':>9}  {'mode':<12}{'seconds':>9}{'queries/s':>12}")
+    for size in args.sizes:
+        queries = make_queries(size)
+        timings = {}
+
+        start = time.perf_counter()
+        expected = [legacy_embed(q, args.dims) for q in queries]
+        timings["legacy"] = time.perf_counter() - start
+
+        provider = HashEmbedding(dimensions=args.dims)
+        start = time.perf_counter()
+        single = [provider.embed(q) for q in queries]
+        timings["embed"] = time.perf_counter() - start
+
+        provider = HashEmbedding(dimensions=args.dims)
+        start = time.perf_counter()
+        batch = provider.embed_batch(queries)
+        timings["embed_batch"] = time.perf_counter() - start
+
+        if single != expected or batch != expected:
+            sys.exit("embed_batch() is not bit-compatible with the legacy vectors")
+        for mode, seconds in timings.items():
+            print(f"{size:>9}  {mode:<12}{seconds:>9.3f}{size / seconds:>12,.0f}")
+        print(f"{'':>9}  speedup: {timings['legacy'] / timings['embed_batch']:.1f}x (batch vs legacy)\n")
+
+
+if __name__ == '__main__':
+    main()
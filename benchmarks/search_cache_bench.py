@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: SearchCache get/put latency, per-call connections vs pooled.
+
+``pool_size=0`` reproduces the old behaviour (a fresh connection and a
+sqlite-vec load for every operation); the default pool keeps connections
+open for the lifetime of the cache.
+
+Usage:
+    python benchmarks/search_cache_bench.py
+    python benchmarks/search_cache_bench.py --ops 2000 --no-semantic
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import structlog
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.search_cache import SearchCache
+from src.tools.embeddings import HashEmbedding
+
+RESPONSE = {
+    "answer": "Quantum computers use qubits.",
+    "results": [
+        {"title": f"Result {i}", "url": f"https://example.com/{i}",
+         "content": "Lorem ipsum dolor sit amet " * 20, "score": 0.9}
+        for i in range(5)
+    ],
+}
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run(pool_size: int, ops: int, semantic: bool) -> dict:
+    """Time `ops` puts followed by `ops` exact-hit gets and `ops` misses."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SearchCache(
+            cache_path=os.path.join(tmp, "bench.db"),
+            embedding_provider=HashEmbedding() if semantic else None,
+            pool_size=pool_size,
+        )
+        timings = {"put": [], "get_hit": [], "get_miss": []}
+
+        for i in range(ops):
+            start = time.perf_counter()
+            cache.put(f"benchmark query number {i}", "basic", 5, RESPONSE)
+            timings["put"].append(time.perf_counter() - start)
+
+        for i in range(ops):
+            start = time.perf_counter()
+            cache.get(f"benchmark query number {i}", "basic", 5)
+            timings["get_hit"].append(time.perf_counter() - start)
+
+        for i in range(ops):
+            start = time.perf_counter()
+            cache.get(f"unrelated lookup {i} zebra", "advanced", 5)
+            timings["get_miss"].append(time.perf_counter() - start)
+
+        cache.close()
+
+    return {
+        op: (statistics.mean(samples) * 1000, _percentile(samples, 0.95) * 1000)
+        for op, samples in timings.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ops', type=int, default=500, help='Operations per phase (default: 500)')
+    parser.add_argument('--pool-size', type=int, default=4, help='Pool size for the pooled run')
+    parser.add_argument('--no-semantic', action='store_true', help='Disable the vector table')
+    args = parser.parse_args()
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    semantic = not args.no_semantic
+    print(f"SearchCache micro-benchmark — {args.ops} ops/phase, semantic={semantic}\n")
+    print(f"{'mode':<22}{'op':<10}{'mean ms':>10}{'p95 ms':>10}")
+
+    results = {}
+    for label, size in (("per-call connection", 0), (f"pooled (size={args.pool_size})", args.pool_size)):
+        results[label] = run(size, args.ops, semantic)
+        for op, (mean, p95) in results[label].items():
+            print(f"{label:<22}{op:<10}{mean:>10.3f}{p95:>10.3f}")
+
+    before, after = results.values()
+    print()
+    for op in before:
+        print(f"{op:<10} speedup: {before[op][0] / after[op][0]:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
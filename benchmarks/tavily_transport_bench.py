@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: threaded TavilyClient vs the pooled async Tavily transport.
+
+Runs WebSearchTool searches (no cache) against a local stub of the Tavily
+/search endpoint that answers after a fixed delay, at several concurrency
+levels, and reports per-request latency and throughput for each transport.
+The "thread" transport holds a default-executor thread per call, so it
+queues once concurrency exceeds the executor size; the "async" transport
+multiplexes all calls over the shared keep-alive connection pool.
+
+The stub is plain HTTP on localhost, so TLS handshakes (which pooling also
+saves against the real API) are not part of these numbers.
+
+Usage:
+    python benchmarks/tavily_transport_bench.py
+    python benchmarks/tavily_transport_bench.py --delay 0.2 --requests 256 --concurrency 1 8 32 64
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import structlog
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.single_flight import SingleFlight
+from src.tools.tavily_transport import TavilyHTTPPool
+from src.tools.web_search import WebSearchTool
+
+FIXTURE = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'mock_tavily_response.json')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.server.delay)
+        data = json.dumps(dict(self.server.payload, query=body["query"])).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub(delay: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    with open(FIXTURE) as f:
+        server.payload = json.load(f)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_tool(transport: str, base_url: str, pool: TavilyHTTPPool) -> WebSearchTool:
+    tool = WebSearchTool(api_key="bench", transport=transport, http_pool=pool,
+                         single_flight=SingleFlight())
+    if transport == "thread":
+        tool.client.base_url = base_url
+    else:
+        tool.transport.base_url = base_url
+    return tool
+
+
+async def run(tool: WebSearchTool, total: int, concurrency: int):
+    """Latencies of ``total`` distinct searches with at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await tool.search(f"benchmark query {i}")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--delay', type=float, default=0.1, help='Stub response delay in seconds (default: 0.1)')
+    parser.add_argument('--requests', type=int, default=128, help='Searches per run (default: 128)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32],
+                        help='Concurrency levels (default: 1 8 32)')
+    args = parser.parse_args()
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    server = start_stub(args.delay)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    pool = TavilyHTTPPool(max_connections=max(args.concurrency), max_keepalive=max(args.concurrency))
+
+    print(f"Tavily transport benchmark — stub delay {args.delay * 1000:.0f} ms, "
+          f"{args.requests} searches per run, executor threads {min(32, (os.cpu_count() or 1) + 4)}\n")
+    print(f"{'transport':<11}{'concurrency':>12}{'mean ms':>10}{'p95 ms':>9}{'req/s':>9}")
+    for transport in ("thread", "async"):
+        tool = make_tool(transport, base_url, pool)
+        asyncio.run(run(tool, 4, 4))  # warm up connections
+        for concurrency in args.concurrency:
+            total = args.requests if concurrency > 1 else min(args.requests, 32)
+            latencies, elapsed = asyncio.run(run(tool, total, concurrency))
+            p95 = sorted(latencies)[int(0.95 * (len(latencies) - 1))]
+            print(f"{transport:<11}{concurrency:>12}{statistics.mean(latencies) * 1000:>10.1f}"
+                  f"{p95 * 1000:>9.1f}{total / elapsed:>9.1f}")
+    pool.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: recall@k and index size of quantized vec0 tables vs float32.
+
+Builds a synthetic corpus of clustered, L2-normalized query embeddings,
+stores it once per format (float32, int8, binary) and compares the top-k of
+each quantized index, with and without exact re-ranking, against the
+float32 KNN result. Probe queries are perturbed corpus vectors, like
+paraphrased searches hitting the semantic cache.
+
+Usage:
+    python benchmarks/vector_quantization_bench.py
+    python benchmarks/vector_quantization_bench.py --corpus 20000 --dims 1536 --candidates 40
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import structlog
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.search_cache import _VEC_FORMATS, _create_vec_table, _insert_vectors, _load_vec
+
+
+def make_corpus(size: int, dims: int, clusters: int, seed: int) -> np.ndarray:
+    """Unit vectors drawn around `clusters` random topic centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dims)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, size)] + 0.6 * rng.normal(size=(size, dims)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build(conn: sqlite3.Connection, corpus: np.ndarray, quantization: str) -> str:
+    table = f"bench_{quantization}"
+    _create_vec_table(conn, table, corpus.shape[1], quantization)
+    batch = 5000
+    for start in range(0, len(corpus), batch):
+        _insert_vectors(conn, table, quantization, [
+            (i + 1, "basic", 5, corpus[i].tobytes(), 1e12, f"key{i}", f"query {i}")
+            for i in range(start, min(start + batch, len(corpus)))
+        ])
+    conn.commit()
+    return table
+
+
+def index_bytes(conn: sqlite3.Connection, table: str) -> int:
+    """Bytes of the KNN vector chunks (what a scan reads), excluding auxiliary columns."""
+    return conn.execute(f"SELECT SUM(LENGTH(vectors)) FROM {table}_vector_chunks00").fetchone()[0]
+
+
+def knn(conn, table: str, quantization: str, query: bytes, k: int, candidates: int, rerank: bool):
+    match = _VEC_FORMATS[quantization][1]
+    if quantization == "none" or not rerank:
+        return [row[0] for row in conn.execute(
+            f"SELECT rowid FROM {table} WHERE embedding MATCH {match} AND k = ? "
+            f"AND search_depth = 'basic' AND max_results = 5 ORDER BY distance",
+            (query, k),
+        )]
+    rows = conn.execute(
+        f"SELECT vec_distance_l2(full_embedding, ?), rowid FROM {table} "
+        f"WHERE embedding MATCH {match} AND k = ? AND search_depth = 'basic' AND max_results = 5",
+        (query, query, max(candidates, k)),
+    ).fetchall()
+    return [rowid for _, rowid in sorted(rows)[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', type=int, default=100_000, help='Stored vectors (default: 100000)')
+    parser.add_argument('--dims', type=int, default=256, help='Embedding dimensions (default: 256)')
+    parser.add_argument('--clusters', type=int, default=500, help='Topic clusters (default: 500)')
+    parser.add_argument('--queries', type=int, default=200, help='Probe queries (default: 200)')
+    parser.add_argument('--k', type=int, default=10, help='Neighbours compared for recall (default: 10)')
+    parser.add_argument('--candidates', type=int, default=40,
+                        help='KNN candidates re-ranked exactly (default: 40)')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    corpus = make_corpus(args.corpus, args.dims, args.clusters, args.seed)
+    rng = np.random.default_rng(args.seed + 1)
+    probes = corpus[rng.integers(0, len(corpus), args.queries)]
+    probes = probes + 0.05 * rng.normal(size=probes.shape).astype(np.float32)
+    probes = (probes / np.linalg.norm(probes, axis=1, keepdims=True)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        if not _load_vec(conn):
+            sys.exit("sqlite-vec is not loadable in this Python build")
+
+        print(f"Vector quantization benchmark — {args.corpus} vectors x {args.dims} dims, "
+              f"{args.queries} queries, recall@{args.k}, {args.candidates} re-rank candidates\n")
+        tables = {q: build(conn, corpus, q) for q in ("none", "int8", "binary")}
+        truth = [set(knn(conn, tables["none"], "none", p.tobytes(), args.k, 0, False)) for p in probes]
+        float_bytes = index_bytes(conn, tables["none"])
+
+        print(f"{'format':<18}{'index MB':>10}{'shrink':>8}{f'recall@{args.k}':>12}{'mean ms':>10}")
+        for quantization, rerank in (("none", False), ("int8", False), ("int8", True),
+                                     ("binary", False), ("binary", True)):
+            table = tables[quantization]
+            recalls, timings = [], []
+            for probe, expected in zip(probes, truth):
+                start = time.perf_counter()
+                found = knn(conn, table, quantization, probe.tobytes(), args.k, args.candidates, rerank)
+                timings.append(time.perf_counter() - start)
+                recalls.append(len(expected & set(found)) / args.k)
+            size = index_bytes(conn, table)
+            label = quantization if quantization == "none" else f"{quantization}{' + rerank' if rerank else ''}"
+            print(f"{label:<18}{size / 1e6:>10.1f}{float_bytes / size:>7.0f}x"
+                  f"{statistics.mean(recalls):>12.3f}{statistics.mean(timings) * 1000:>10.2f}")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@ Usage:
     python cli.py "quantum computing trends 2025"
     python cli.py "AI safety" --depth advanced --lang sl
     python cli.py "climate change" --focus "ocean,arctic" --output report.md
+    python cli.py cache stats                  # Search cache maintenance
 """
 
 import argparse
@@ -58,7 +59,220 @@ def print_progress(step, progress, message, detail='', preview='', **kwargs):
         print()
 
 
+def service_embedding_provider():
+    """
+    The embedding provider the web app's search cache uses for OPENAI_API_KEY.
+    
+    Resolved through the same registry as ``ResearchService._get_search_cache``
+    (OpenAI vectors reduced to the index size), waiting for the key check, so
+    snapshot imports fill the vector table the service actually reads.
+    """
+    from src.tools.embeddings import get_embedding_provider
+    return get_embedding_provider(os.getenv('OPENAI_API_KEY'), wait=True)
+
+
+def cache_main(argv):
+    """Search cache maintenance: python cli.py cache <command>."""
+    parser = argparse.ArgumentParser(
+        prog='cli.py cache',
+        description='Search cache maintenance',
+    )
+    parser.add_argument('--cache-path', default='data/cache/search_cache.db',
+                       help='Search cache database (default: data/cache/search_cache.db)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    sub.add_parser('stats', help='Show cache size, hit counts and compression ratio')
+    
+    recompress = sub.add_parser('recompress', help='Re-encode stored payloads (one-off migration)')
+    recompress.add_argument('--codec', choices=['zlib', 'lzma', 'none'], default='zlib',
+                            help='Target codec (default: zlib)')
+    
+    report = sub.add_parser('report', help='Hit ratio and lookup latency over time (all workers)')
+    report.add_argument('--hours', type=float, default=24,
+                        help='How far back to report (default: 24)')
+    report.add_argument('--bucket', type=int, default=60,
+                        help='Interval width in minutes (default: 60)')
+    report.add_argument('--namespace', default='search',
+                        choices=['search', 'extract', 'context', 'qna'],
+                        help='Cached Tavily method to report on (default: search)')
+    
+    calibrate = sub.add_parser('calibrate', help='Estimate hit/false-hit rates per similarity threshold')
+    calibrate.add_argument('--research-db', default='data/research_history.db',
+                           help='Research database with past queries (default: data/research_history.db)')
+    calibrate.add_argument('--providers', default='hash,idf,openai',
+                           help='Embedding providers to compare (default: hash,idf,openai; '
+                                'idf needs train-idf, openai needs OPENAI_API_KEY)')
+    calibrate.add_argument('--overlap', type=float, default=0.5,
+                           help='Result URL overlap (Jaccard) that counts as the same search (default: 0.5)')
+    calibrate.add_argument('--max-false-rate', type=float, default=0.05,
+                           help='Acceptable false-hit rate for the recommendation (default: 0.05)')
+    calibrate.add_argument('--step', type=float, default=0.05,
+                           help='Threshold step (default: 0.05)')
+    
+    train_idf = sub.add_parser('train-idf', help='Train the local IDF-weighted embedding provider')
+    train_idf.add_argument('--research-db', default='data/research_history.db',
+                           help='Research database with past topics and queries (default: data/research_history.db)')
+    train_idf.add_argument('--dims', type=int, default=256,
+                           help='Embedding dimensions (default: 256)')
+    train_idf.add_argument('--char-ngrams', type=int, default=3,
+                           help='Character n-gram length, 0 to disable (default: 3)')
+    train_idf.add_argument('--max-false-rate', type=float, default=0.05,
+                           help='False-hit budget when calibrating the threshold (default: 0.05)')
+    
+    for command in (calibrate, train_idf):
+        command.add_argument('--idf-path', default='data/cache/idf_embedding.npy',
+                             help='IDF embedding weights (default: data/cache/idf_embedding.npy)')
+    
+    export = sub.add_parser('export', help='Write live entries to a snapshot file for warm-up')
+    export.add_argument('snapshot', help='Snapshot file to write')
+    export.add_argument('--max-age-hours', type=float, default=None,
+                        help='Only entries created within this many hours')
+    export.add_argument('--min-hits', type=int, default=0,
+                        help='Only entries hit at least this many times (default: 0)')
+    export.add_argument('--limit', type=int, default=None,
+                        help='Keep at most this many search entries, most hit first')
+    
+    import_ = sub.add_parser('import', help='Bulk-load a snapshot file (skips existing keys)')
+    import_.add_argument('snapshot', help='Snapshot file to read')
+    
+    for command in (export, import_):
+        command.add_argument('--translation-cache-path', default='data/cache/translation_cache.db',
+                             help='Translation cache database (default: data/cache/translation_cache.db)')
+    
+    args = parser.parse_args(argv)
+    
+    from src.tools.search_cache import SearchCache
+    from src.tools import cache_snapshot
+    
+    cache = None
+    if args.command == 'stats':
+        cache = SearchCache(cache_path=args.cache_path)
+        stats = cache.get_stats()
+        print(f"📦 Search cache: {args.cache_path}")
+        print(f"  Entries:           {stats['entries']}")
+        print(f"  Stored hits:       {stats['total_hits_stored']}")
+        print(f"  Payload (raw):     {stats['payload_bytes_raw']:,} bytes")
+        print(f"  Payload (stored):  {stats['payload_bytes_stored']:,} bytes")
+        print(f"  Compression ratio: {stats['compression_ratio']:.2f}x")
+        for namespace, info in stats['namespaces'].items():
+            print(f"  {namespace + ' entries:':<19}{info['entries']} (TTL {info['ttl_hours']:g}h)")
+    
+    elif args.command == 'recompress':
+        cache = SearchCache(cache_path=args.cache_path, compression=args.codec)
+        result = cache.recompress()
+        print(f"✅ Recompressed {result['rows']} entries with {result['codec']}: "
+              f"{result['bytes_before']:,} → {result['bytes_after']:,} bytes "
+              f"({result['ratio']:.2f}x)")
+    
+    elif args.command == 'report':
+        cache = SearchCache(cache_path=args.cache_path, record_metrics=False)
+        rows = cache.get_metrics(since_hours=args.hours, bucket_minutes=args.bucket, namespace=args.namespace)
+        print(f"📈 Search cache lookups ({args.namespace}), last {args.hours:g}h in {args.bucket}-minute intervals")
+        if not rows:
+            print("  No lookups recorded.")
+        else:
+            print(f"  {'interval':<17}{'lookups':>9}{'hit ratio':>11}{'semantic':>10}"
+                  f"{'stale':>7}{'p50 ms':>9}{'p95 ms':>9}")
+            for row in rows:
+                start = time.strftime('%Y-%m-%d %H:%M', time.localtime(row['start']))
+                p50 = f"{row['p50_ms']:.2f}" if row['p50_ms'] is not None else '-'
+                p95 = f"{row['p95_ms']:.2f}" if row['p95_ms'] is not None else '-'
+                print(f"  {start:<17}{row['lookups']:>9}{row['hit_ratio']:>10.1%}"
+                      f"{row['semantic_hits']:>10}{row['stale_hits']:>7}{p50:>9}{p95:>9}")
+            lookups = sum(row['lookups'] for row in rows)
+            hits = sum(row['hits'] + row['semantic_hits'] for row in rows)
+            print(f"  Total: {lookups} lookups, hit ratio {hits / lookups if lookups else 0:.1%}")
+    
+    elif args.command == 'calibrate':
+        from src.tools.embeddings import HashEmbedding, OpenAIEmbedding
+        from src.tools.idf_embedding import IDFEmbedding
+        from src.tools.threshold_calibration import calibrate, load_samples
+        samples = load_samples(cache_path=args.cache_path, research_db_path=args.research_db)
+        print(f"🎯 Threshold calibration on {len(samples)} distinct queries "
+              f"(equivalent = URL overlap ≥ {args.overlap:g})")
+        thresholds = [round(args.step * i, 4) for i in range(1, int(round(1 / args.step)))]
+        for name in [p.strip() for p in args.providers.split(',') if p.strip()]:
+            if name == 'hash':
+                provider = HashEmbedding()
+            elif name == 'idf' and os.path.exists(args.idf_path):
+                provider = IDFEmbedding.load(args.idf_path)
+            elif name == 'openai' and os.getenv('OPENAI_API_KEY'):
+                provider = OpenAIEmbedding(api_key=os.getenv('OPENAI_API_KEY'))
+            else:
+                print(f"\n  Skipping {name}: not available")
+                continue
+            result = calibrate(samples, provider, thresholds=thresholds,
+                               overlap=args.overlap, max_false_rate=args.max_false_rate)
+            print(f"\n  {result['provider']} — {result['reusable']} reusable queries, "
+                  f"current threshold {result['current_threshold']:.2f}")
+            if not result['curve']:
+                print("  Not enough queries.")
+                continue
+            print(f"  {'threshold':>9}{'hit rate':>10}{'false hits':>12}{'recall':>9}")
+            for point in result['curve']:
+                print(f"  {point['threshold']:>9.2f}{point['hit_rate']:>10.1%}"
+                      f"{point['false_hit_rate']:>12.1%}{point['recall']:>9.1%}")
+            if result['recommended'] is not None:
+                print(f"  ➜ Recommended: {result['recommended']:.2f} "
+                      f"(false-hit rate ≤ {args.max_false_rate:.0%})")
+            else:
+                print(f"  ➜ No threshold keeps false hits ≤ {args.max_false_rate:.0%}")
+    
+    elif args.command == 'train-idf':
+        from src.tools.idf_embedding import IDFEmbedding, load_corpus
+        from src.tools.threshold_calibration import calibrate, load_samples
+        corpus = load_corpus(research_db_path=args.research_db, cache_path=args.cache_path)
+        if not corpus:
+            print("❌ No topics or queries found to train on.")
+            sys.exit(1)
+        model = IDFEmbedding.fit(corpus, dimensions=args.dims, char_ngrams=args.char_ngrams)
+        samples = load_samples(cache_path=args.cache_path, research_db_path=args.research_db)
+        recommended = calibrate(samples, model, max_false_rate=args.max_false_rate)['recommended']
+        if recommended is not None:
+            model = IDFEmbedding(model.weights, dimensions=args.dims, char_ngrams=args.char_ngrams,
+                                 recommended_threshold=recommended)
+        model.save(args.idf_path, documents=len(corpus))
+        print(f"✅ Trained {model.signature} on {len(corpus)} texts → {args.idf_path}")
+        print(f"  Similarity threshold: {model.recommended_threshold:.2f}"
+              f"{' (calibrated)' if recommended is not None else ' (default)'}")
+        if os.path.exists(args.cache_path):
+            # New signature, new vector table: index the live entries now
+            cache = SearchCache(cache_path=args.cache_path, embedding_provider=model)
+            print(f"  Indexed {cache.rebuild_vectors()} cached queries")
+    
+    elif args.command == 'export':
+        cache = SearchCache(cache_path=args.cache_path)
+        result = cache_snapshot.export_snapshot(
+            args.snapshot, cache,
+            translation_cache_path=args.translation_cache_path,
+            max_age_hours=args.max_age_hours,
+            min_hits=args.min_hits,
+            limit=args.limit,
+        )
+        print(f"✅ Exported {result['entries']} entries, {result['documents']} documents, "
+              f"{result['vectors']} vectors, {result['translations']} translations "
+              f"→ {args.snapshot} ({result['bytes']:,} bytes)")
+    
+    elif args.command == 'import':
+        provider = service_embedding_provider()
+        cache = SearchCache(cache_path=args.cache_path, embedding_provider=provider)
+        result = cache_snapshot.import_snapshot(
+            args.snapshot, cache, translation_cache_path=args.translation_cache_path,
+        )
+        print(f"✅ Imported {result['entries']} entries, {result['documents']} documents, "
+              f"{result['vectors']} vectors, {result['translations']} translations")
+        if result['vectors_rebuilt']:
+            print(f"  Re-embedded {result['vectors_rebuilt']} vectors for {provider.signature}")
+    
+    if cache is not None:
+        cache.close()
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'cache':
+        cache_main(sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(
         description='AI Research Assistant — conduct web research from the command line',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -68,6 +282,7 @@ Examples:
   python cli.py "AI safety" --depth advanced
   python cli.py "climate change" --lang sl --focus "ocean,arctic"
   python cli.py "machine learning" --output report.md
+  python cli.py cache --help                  # Cache maintenance commands
         """
     )
     parser.add_argument('topic', help='Research topic (min 10 characters)')
@@ -35,7 +35,8 @@ class MultiLanguageResearchAgent(ResearchAgent):
         enable_database_tracking: bool = True,
         default_language: str = 'en',
         target_languages: List[str] = None,
-        enable_translation: bool = True
+        enable_translation: bool = True,
+        search_concurrency: int = 1
     ):
         """
         Initialize multi-language research agent.
@@ -50,6 +51,7 @@ class MultiLanguageResearchAgent(ResearchAgent):
             default_language: Default language for research ('en', 'sl', etc.)
             target_languages: List of languages to translate results to
             enable_translation: Enable translation capabilities
+            search_concurrency: Web searches run at once
         """
         super().__init__(
             name=name,
@@ -57,7 +59,8 @@ class MultiLanguageResearchAgent(ResearchAgent):
             web_search_tool=web_search_tool,
             report_writer=report_writer,
             sqlite_writer=sqlite_writer,
-            enable_database_tracking=enable_database_tracking
+            enable_database_tracking=enable_database_tracking,
+            search_concurrency=search_concurrency
         )
         
         self.default_language = default_language
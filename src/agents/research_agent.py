@@ -38,6 +38,7 @@ class ResearchAgent(ReasoningAgent):
         description: str = "An AI research agent that conducts web research and generates comprehensive reports",
         max_search_queries: int = 5,
         enable_database_tracking: bool = True,
+        search_concurrency: int = 1,
         **kwargs
     ):
         super().__init__(name, llm_client, description, **kwargs)
@@ -48,11 +49,15 @@ class ResearchAgent(ReasoningAgent):
         self.sqlite_writer = sqlite_writer or (SQLiteWriter() if enable_database_tracking else None)
         self.max_search_queries = max_search_queries
         self.enable_database_tracking = enable_database_tracking
+        # Searches in flight at once (1 = one after another)
+        self.search_concurrency = max(1, search_concurrency)
         
         # Research tracking
         self.research_queries = []
         self.all_search_results = []
         self.all_search_responses = []
+        # Searches that failed or missed their deadline (recorded, not analyzed)
+        self.failed_search_responses = []
         self.research_start_time = None
         self.current_research_id = None
         self.progress_callback = None  # Optional callback for live progress
@@ -92,6 +97,7 @@ class ResearchAgent(ReasoningAgent):
         self.research_queries = []
         self.all_search_results = []
         self.all_search_responses = []
+        self.failed_search_responses = []
         self.current_research_id = None
         
         try:
@@ -191,65 +197,100 @@ class ResearchAgent(ReasoningAgent):
         return queries
     
     async def _execute_searches(self, queries: List[str]) -> List[SearchResponse]:
-        """Execute web searches sequentially for live progress updates."""
-        self.logger.info("Executing web searches", query_count=len(queries))
+        """
+        Execute web searches, at most ``search_concurrency`` at a time.
+        
+        Progress is reported as each search starts and completes, with
+        monotonically increasing percentages and the rolling preview of
+        Tavily answers kept in query order. Successful responses are
+        recorded in query order once all searches have finished, so
+        ``research_queries`` and ``all_search_responses`` stay aligned
+        however the searches interleave. Failed and timed-out searches do
+        not stop the others; they are kept in ``failed_search_responses``
+        and the research carries on with the partial results.
+        """
+        self.logger.info("Executing web searches", query_count=len(queries),
+                         concurrency=self.search_concurrency)
         
         total = len(queries)
-        successful_responses = []
-        preview_parts = []
-        
-        # Sequential execution — each search reports progress with preview
-        for i, query in enumerate(queries):
-            query_num = i + 1
-            # Progress: 20% to 50% spread across searches
-            search_progress = 20 + int(30 * query_num / total)
-            
-            self._report_progress(
-                'searching', search_progress - 5,
-                f'Searching {query_num}/{total}: "{query[:60]}"',
-                f'{len(self.all_search_results)} sources found so far',
-                preview='\n\n---\n\n'.join(preview_parts) if preview_parts else ''
-            )
-            
-            try:
-                depth = getattr(self, 'current_search_depth', 'basic')
-                response = await self.web_search_tool.search(
-                    query=query,
-                    max_results=5,
-                    search_depth=depth,
-                    include_answer=True
+        depth = getattr(self, 'current_search_depth', 'basic')
+        semaphore = asyncio.Semaphore(self.search_concurrency)
+        responses: List[Optional[SearchResponse]] = [None] * total
+        answers: List[Optional[str]] = [None] * total
+        state = {'done': 0, 'sources': len(self.all_search_results)}
+        
+        def preview() -> str:
+            return '\n\n---\n\n'.join(answer for answer in answers if answer)
+        
+        async def run(i: int, query: str) -> None:
+            async with semaphore:
+                # Progress: 20% to 50% spread across completed searches
+                self._report_progress(
+                    'searching', 20 + int(30 * state['done'] / total),
+                    f'Searching {i + 1}/{total}: "{query[:60]}"',
+                    f'{state["sources"]} sources found so far',
+                    preview=preview()
                 )
+                started_at = time.time()
+                try:
+                    response = await self.web_search_tool.search(
+                        query=query,
+                        max_results=5,
+                        search_depth=depth,
+                        include_answer=True
+                    )
+                except Exception as e:
+                    responses[i] = SearchResponse.failed(query, e)
+                    state['done'] += 1
+                    self.logger.warning("Search failed", query=query, error=str(e),
+                                        timed_out=responses[i].timed_out)
+                    self._report_progress(
+                        'searching', 20 + int(30 * state['done'] / total),
+                        f'Search {i + 1}/{total} {"timed out" if responses[i].timed_out else "failed"}',
+                        f'{state["sources"]} total sources, {state["done"]}/{total} searches complete',
+                        preview=preview()
+                    )
+                    return
                 
-                successful_responses.append(response)
-                self.research_queries.append(query)
-                self.all_search_results.extend(response.results)
-                self.all_search_responses.append(response)
-                
+                responses[i] = response
+                state['done'] += 1
+                state['sources'] += len(response.results)
                 # Add Tavily AI answer to rolling preview
                 if response.answer:
-                    preview_parts.append(f"**{query}**\n\n{response.answer}")
+                    answers[i] = f"**{query}**\n\n{response.answer}"
                 
                 self._report_progress(
-                    'searching', search_progress,
-                    f'Search {query_num}/{total} done — {len(response.results)} results',
-                    f'{len(self.all_search_results)} total sources',
-                    preview='\n\n---\n\n'.join(preview_parts)
+                    'searching', 20 + int(30 * state['done'] / total),
+                    f'Search {i + 1}/{total} done — {len(response.results)} results',
+                    f'{state["sources"]} total sources, {state["done"]}/{total} searches complete',
+                    preview=preview()
                 )
                 
                 self.logger.info(
                     "Search completed",
-                    query=query, query_num=query_num, total=total,
+                    query=query, query_num=i + 1, total=total,
                     results=len(response.results),
-                    has_answer=bool(response.answer)
+                    has_answer=bool(response.answer),
+                    seconds=round(time.time() - started_at, 3)
                 )
-                
-            except Exception as e:
-                self.logger.warning("Search failed", query=query, error=str(e))
+        
+        await asyncio.gather(*(run(i, query) for i, query in enumerate(queries)))
+        
+        successful_responses = []
+        for query, response in zip(queries, responses):
+            if response.error is not None:
+                self.failed_search_responses.append(response)
+                continue
+            successful_responses.append(response)
+            self.research_queries.append(query)
+            self.all_search_results.extend(response.results)
+            self.all_search_responses.append(response)
         
         self.logger.info(
             "All web searches completed",
             total_queries=total,
             successful=len(successful_responses),
+            timed_out=sum(1 for r in self.failed_search_responses if r.timed_out),
             total_results=len(self.all_search_results)
         )
         
@@ -559,7 +600,7 @@ class ResearchAgent(ReasoningAgent):
         return report_path
     
     def _prepare_queries_for_database(self) -> List[Dict[str, Any]]:
-        """Prepare query data for database storage."""
+        """Prepare query data for database storage (failed searches as ``success=False``)."""
         queries_data = []
         
         for i, (query_text, response) in enumerate(zip(self.research_queries, self.all_search_responses)):
@@ -589,6 +630,23 @@ class ResearchAgent(ReasoningAgent):
             }
             queries_data.append(query_data)
         
+        for response in self.failed_search_responses:
+            queries_data.append({
+                "query_text": response.query,
+                "executed_at": datetime.utcnow(),
+                "max_results": 5,
+                "search_depth": getattr(self, 'current_search_depth', 'basic'),
+                "include_answer": True,
+                "results_count": 0,
+                "ai_answer": None,
+                "follow_up_questions": [],
+                "search_context": None,
+                "execution_time": 0.0,
+                "success": False,
+                "error_message": ("Timed out: " if response.timed_out else "") + response.error,
+                "sources": []
+            })
+        
         return queries_data
     
     # Override parent methods to integrate research capabilities
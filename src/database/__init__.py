@@ -1,6 +1,6 @@
-from .models import Research, Source, Query, Base
+from .models import Research, Source, Query, Document, Base
 from .sqlite_writer import SQLiteWriter
 from .analytics import ResearchAnalytics
 from .database import DatabaseManager
 
-__all__ = ["Research", "Source", "Query", "Base", "SQLiteWriter", "ResearchAnalytics", "DatabaseManager"]
\ No newline at end of file
+__all__ = ["Research", "Source", "Query", "Document", "Base", "SQLiteWriter", "ResearchAnalytics", "DatabaseManager"]
\ No newline at end of file
@@ -10,7 +10,7 @@ from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
 import structlog
 
-from .models import Base, Research, Query, Source, create_database_engine, create_tables, get_session_factory
+from .models import Base, Research, Query, Source, Document, create_database_engine, create_tables, get_session_factory
 
 logger = structlog.get_logger()
 
@@ -78,6 +78,7 @@ class DatabaseManager:
                 research_count = session.query(Research).count()
                 query_count = session.query(Query).count()
                 source_count = session.query(Source).count()
+                document_count = session.query(Document).count()
                 
                 # Get completed research count
                 completed_count = session.query(Research).filter(
@@ -100,6 +101,7 @@ class DatabaseManager:
                     "completed_sessions": completed_count,
                     "total_queries": query_count,
                     "total_sources": source_count,
+                    "total_documents": document_count,
                     "average_processing_time": avg_processing_time,
                     "database_url": self.database_url
                 }
@@ -137,12 +139,30 @@ class DatabaseManager:
                 
                 self.logger.info("Cleaned up old research data", 
                                deleted_count=count, days_old=days_old)
-                return count
+            self.prune_orphan_documents()
+            return count
                 
         except Exception as e:
             self.logger.error("Failed to cleanup old data", error=str(e))
             raise
     
+    def prune_orphan_documents(self) -> int:
+        """
+        Delete shared documents no longer referenced by any source.
+        
+        Returns:
+            Number of documents deleted
+        """
+        with self.get_session() as session:
+            referenced = session.query(Source.document_id).filter(Source.document_id.isnot(None))
+            deleted = session.query(Document).filter(
+                Document.id.notin_(referenced)
+            ).delete(synchronize_session=False)
+            session.commit()
+        if deleted:
+            self.logger.info("Pruned orphan documents", count=deleted)
+        return deleted
+    
     def backup_database(self, backup_path: str) -> bool:
         """
         Create a backup of the SQLite database.
@@ -4,7 +4,7 @@ SQLAlchemy models for research history and analytics.
 
 from datetime import datetime
 from typing import List, Optional
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float, DateTime, ForeignKey, Boolean, JSON
+from sqlalchemy import create_engine, inspect, text, Column, Integer, String, Text, Float, DateTime, ForeignKey, Boolean, JSON
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 from sqlalchemy.sql import func
 import structlog
@@ -139,6 +139,38 @@ class Query(Base):
         }
 
 
+class Document(Base):
+    """Content-addressed source text, stored once and shared by every Source that returned it."""
+    
+    __tablename__ = "documents"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    doc_key = Column(String(64), nullable=False, unique=True, index=True)  # SHA-256(canonical URL + content hash)
+    canonical_url = Column(String(2000), nullable=False, index=True)
+    content_hash = Column(String(64), nullable=False)  # SHA-256 of content
+    content = Column(Text)
+    content_length = Column(Integer)
+    first_seen_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Relationships
+    sources = relationship("Source", back_populates="document")
+    
+    def __repr__(self):
+        return f"<Document(id={self.id}, url='{self.canonical_url[:50]}', length={self.content_length})>"
+    
+    def to_dict(self):
+        """Convert document record to dictionary."""
+        return {
+            "id": self.id,
+            "doc_key": self.doc_key,
+            "canonical_url": self.canonical_url,
+            "content_hash": self.content_hash,
+            "content": self.content,
+            "content_length": self.content_length,
+            "first_seen_at": self.first_seen_at.isoformat() if self.first_seen_at else None
+        }
+
+
 class Source(Base):
     """Individual source/result model from search queries."""
     
@@ -147,11 +179,12 @@ class Source(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     research_id = Column(Integer, ForeignKey("research.id"), nullable=False, index=True)
     query_id = Column(Integer, ForeignKey("queries.id"), nullable=False, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), index=True)  # Shared content (None on legacy rows)
     
     # Source details
     title = Column(String(1000), nullable=False)
     url = Column(String(2000), nullable=False, index=True)
-    content = Column(Text)
+    content = Column(Text)  # Inline content for legacy rows; new rows reference a Document
     relevance_score = Column(Float, index=True)
     published_date = Column(String(20))  # Store as string from API
     
@@ -164,10 +197,18 @@ class Source(Base):
     # Relationships
     research = relationship("Research", back_populates="sources")
     query = relationship("Query", back_populates="sources")
+    document = relationship("Document", back_populates="sources", lazy="selectin")
     
     def __repr__(self):
         return f"<Source(id={self.id}, title='{self.title[:50]}...', score={self.relevance_score})>"
     
+    @property
+    def text(self) -> Optional[str]:
+        """Source content, from the shared Document when there is one."""
+        if self.content is not None:
+            return self.content
+        return self.document.content if self.document else None
+    
     def to_dict(self):
         """Convert source record to dictionary."""
         return {
@@ -176,7 +217,8 @@ class Source(Base):
             "query_id": self.query_id,
             "title": self.title,
             "url": self.url,
-            "content": self.content,
+            "content": self.text,
+            "document_id": self.document_id,
             "relevance_score": self.relevance_score,
             "published_date": self.published_date,
             "retrieved_at": self.retrieved_at.isoformat() if self.retrieved_at else None,
@@ -262,6 +304,7 @@ def create_tables(engine):
     """Create all tables in the database (skips existing tables)."""
     try:
         Base.metadata.create_all(engine, checkfirst=True)
+        add_missing_columns(engine)
         logger.info("Database tables created successfully")
     except Exception as e:
         # On persistent volumes, tables may already exist from a previous deploy.
@@ -273,6 +316,32 @@ def create_tables(engine):
             raise
 
 
+def add_missing_columns(engine):
+    """
+    Add nullable columns (and their indexes) introduced after a table was created.
+    
+    ``create_all`` skips tables that already exist, so databases from earlier
+    deploys would otherwise never get new columns such as ``sources.document_id``.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            added = [column for column in table.columns
+                     if column.name not in existing and column.nullable]
+            for column in added:
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                    f"{column.type.compile(engine.dialect)}"
+                ))
+                logger.info("Added database column", table=table.name, column=column.name)
+            if added:
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
+
+
 def get_session_factory(engine):
     """Create session factory for database operations."""
     return sessionmaker(bind=engine)
\ No newline at end of file
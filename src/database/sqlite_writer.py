@@ -11,8 +11,10 @@ import structlog
 
 from ..tools.report_writer import ReportWriter
 from .database import DatabaseManager
-from .models import Research, Query, Source
+from .models import Research, Query, Source, Document
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.sql import func
+from ..tools.documents import canonical_url, content_hash, document_key
 from ..utils.llm import normalize_text
 
 logger = structlog.get_logger()
@@ -100,6 +102,9 @@ class SQLiteWriter(ReportWriter):
                 session.flush()  # Get the ID
                 research_id = research.id
                 
+                # Documents resolved in this save, by doc_key
+                documents: Dict[str, Document] = {}
+                
                 # Save queries
                 queries_data = research_data.get("queries", [])
                 for i, query_data in enumerate(queries_data):
@@ -141,13 +146,15 @@ class SQLiteWriter(ReportWriter):
                         url = source_data.get("url", "")  # Don't normalize URLs
                         content = normalize_text(source_data.get("content", ""))
                         published_date = source_data.get("published_date")
+                        document = self._get_or_create_document(session, url, content, documents)
                         
                         source = Source(
                             research_id=research_id,
                             query_id=query.id,
+                            document_id=document.id if document else None,
                             title=title,
                             url=url,
-                            content=content,
+                            content=None if document else content,
                             relevance_score=source_data.get("score", 0.0),
                             published_date=published_date,
                             retrieved_at=datetime.utcnow(),
@@ -173,6 +180,38 @@ class SQLiteWriter(ReportWriter):
             self.logger.error("Failed to save research to database", error=str(e))
             raise RuntimeError(f"Failed to save research to database: {str(e)}") from e
     
+    def _get_or_create_document(
+        self, session, url: str, content: str, documents: Dict[str, Document]
+    ) -> Optional[Document]:
+        """
+        Return the shared Document for (canonical URL, content), creating it once.
+        
+        Sources without a URL or content keep their text inline (returns None).
+        """
+        if not url or not content:
+            return None
+        key = document_key(url, content)
+        if key in documents:
+            return documents[key]
+        
+        document = session.query(Document).filter(Document.doc_key == key).first()
+        if document is None:
+            try:
+                # Savepoint: another worker may insert the same document concurrently
+                with session.begin_nested():
+                    document = Document(
+                        doc_key=key,
+                        canonical_url=canonical_url(url),
+                        content_hash=content_hash(content),
+                        content=content,
+                        content_length=len(content),
+                    )
+                    session.add(document)
+            except IntegrityError:
+                document = session.query(Document).filter(Document.doc_key == key).one()
+        documents[key] = document
+        return document
+    
     def get_research_by_id(self, research_id: int) -> Optional[Dict[str, Any]]:
         """Get research record by ID."""
         try:
@@ -250,6 +289,7 @@ class SQLiteWriter(ReportWriter):
                 if research:
                     session.delete(research)  # Cascades to queries and sources
                     session.commit()
+                    self.db_manager.prune_orphan_documents()
                     self.logger.info("Research deleted", research_id=research_id)
                     return True
                 return False
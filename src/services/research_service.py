@@ -6,14 +6,34 @@ No HTTP or Flask dependencies here.
 """
 
 import asyncio
+import atexit
+import hashlib
 import os
+import threading
 import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Optional, Dict, Any, List, Callable
 import structlog
 
 logger = structlog.get_logger()
 
+# Search cache bounds: the Fly volume is 1 GB and also holds the history DB
+SEARCH_CACHE_MAX_BYTES = 200 * 1024 * 1024
+SEARCH_CACHE_SWEEP_SECONDS = 600
+# Expired search results are served (and refreshed in the background) for this long
+SEARCH_CACHE_STALE_GRACE_HOURS = 48
+# Open SearchCache instances (one per embedding key and provider); the least recently used is closed
+SEARCH_CACHE_MAX_INSTANCES = 16
+# Planned web searches run in parallel, at most this many per research
+SEARCH_CONCURRENCY = 5
+# Tavily calls share one pooled keep-alive HTTP client per process ("thread" is the fallback)
+TAVILY_TRANSPORT = "async"
+# A Tavily call unanswered after this long is given up (the research continues without it)
+SEARCH_TIMEOUT_SECONDS = 20.0
+# Searches slower than this percentile of recent ones send one backup request
+SEARCH_HEDGE_PERCENTILE = 95
+
 
 class ResearchService:
     """
@@ -33,6 +53,12 @@ class ResearchService:
             db = SQLiteWriter()
         self.db = db
         self.progress_tracker: Dict[int, Dict[str, Any]] = {}
+        # Long-lived search caches (pooled connections + L1), one per embedding key, in LRU order
+        self._search_caches: "OrderedDict[str, Any]" = OrderedDict()
+        self._search_cache_lock = threading.Lock()
+        # Persistent text -> embedding store shared by every cache's provider
+        self._embedding_store = None
+        self._close_registered = False
         self.logger = logger.bind(component="research_service")
     
     # ── Key & provider resolution ────────────────────────────────────
@@ -118,14 +144,79 @@ class ResearchService:
     def _create_search_tool(self, keys):
         """Create web search tool with semantic cache."""
         from src.tools.web_search import WebSearchTool
+        
+        search_cache = self._get_search_cache(keys.get('openai_api_key'))
+        return WebSearchTool(api_key=keys['tavily_api_key'], search_cache=search_cache,
+                             transport=TAVILY_TRANSPORT, timeout=SEARCH_TIMEOUT_SECONDS,
+                             hedge_percentile=SEARCH_HEDGE_PERCENTILE)
+    
+    def _get_search_cache(self, openai_api_key: Optional[str] = None):
+        """
+        Return the shared SearchCache for this embedding key, creating it once.
+        
+        Caches are keyed by a hash of the OpenAI key so one user's key is never
+        used to embed another user's queries, and by the provider currently
+        chosen for it: the process-wide registry answers without network
+        calls, using the local provider until the key has been validated in
+        the background. Providers are wrapped in ``CachedEmbedding`` over one
+        shared ``EmbeddingStore``, so a text is embedded once per provider
+        across caches and restarts.
+        
+        At most ``SEARCH_CACHE_MAX_INSTANCES`` caches stay open; the least
+        recently used one is closed (flushing its hits and stopping its
+        threads). A research run still holding it keeps working on fresh,
+        unpooled connections.
+        """
         from src.tools.search_cache import SearchCache
-        from src.tools.embeddings import create_embedding_provider
+        from src.tools.embeddings import get_embedding_provider
+        from src.tools.embedding_cache import CachedEmbedding, EmbeddingStore
         
-        embedding_provider = create_embedding_provider(
-            openai_api_key=keys.get('openai_api_key')
-        )
-        search_cache = SearchCache(embedding_provider=embedding_provider)
-        return WebSearchTool(api_key=keys['tavily_api_key'], search_cache=search_cache)
+        provider = get_embedding_provider(openai_api_key)
+        key_id = hashlib.sha256((openai_api_key or '').encode('utf-8')).hexdigest()[:16]
+        cache_id = f"{key_id}:{provider.signature}"
+        evicted = []
+        with self._search_cache_lock:
+            search_cache = self._search_caches.get(cache_id)
+            if search_cache is not None:
+                self._search_caches.move_to_end(cache_id)
+            else:
+                if self._embedding_store is None:
+                    self._embedding_store = EmbeddingStore()
+                embedding_provider = CachedEmbedding(provider, store=self._embedding_store)
+                search_cache = SearchCache(
+                    embedding_provider=embedding_provider,
+                    l1_size=256,
+                    max_bytes=SEARCH_CACHE_MAX_BYTES,
+                    admission="tinylfu",
+                    sweep_interval_seconds=SEARCH_CACHE_SWEEP_SECONDS,
+                    stale_grace_hours=SEARCH_CACHE_STALE_GRACE_HOURS,
+                )
+                self._search_caches[cache_id] = search_cache
+                while len(self._search_caches) > SEARCH_CACHE_MAX_INSTANCES:
+                    evicted.append(self._search_caches.popitem(last=False)[1])
+                if not self._close_registered:
+                    # Buffered hit counts and metrics are written on close, so flush them at exit
+                    atexit.register(self.close)
+                    self._close_registered = True
+        self._close_caches(evicted)
+        return search_cache
+    
+    def _close_caches(self, caches):
+        for search_cache in caches:
+            try:
+                search_cache.close()
+            except Exception as e:
+                self.logger.warning("Failed to close search cache", error=str(e))
+    
+    def close(self):
+        """Flush and close the search caches and the embedding store (safe to call twice)."""
+        with self._search_cache_lock:
+            caches = list(self._search_caches.values())
+            self._search_caches.clear()
+            store, self._embedding_store = self._embedding_store, None
+        self._close_caches(caches)
+        if store is not None:
+            store.close()
     
     def _make_progress_callback(self, research_id: int) -> Callable:
         """Create a progress callback that updates the tracker."""
@@ -255,6 +346,7 @@ class ResearchService:
                 default_language='en',
                 target_languages=[language] if language != 'en' else ['en'],
                 enable_translation=True,
+                search_concurrency=SEARCH_CONCURRENCY,
             )
             agent.progress_callback = on_progress
             
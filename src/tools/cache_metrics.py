@@ -0,0 +1,216 @@
+"""
+Persistent per-minute cache telemetry.
+
+Each cache in a worker process buffers lookup outcomes and latencies in
+memory (``MetricsBuffer``) and merges them into the ``cache_metrics`` table
+in batches, one row per minute, worker (process and cache instance) and
+namespace ("search" for web search results, or the Tavily method of other
+cached calls). Reports aggregate across workers, so hit ratios and latency
+percentiles survive restarts and cover every gunicorn worker rather than
+whichever one answered the stats request.
+"""
+
+import bisect
+import itertools
+import json
+import os
+import socket
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Sequence
+import structlog
+
+logger = structlog.get_logger()
+
+# Upper bounds (ms) of the latency histogram buckets; one overflow bucket follows
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+EVENTS = ("hits", "misses", "semantic_hits", "stale_hits")
+
+
+_instances = itertools.count(1)
+
+
+def next_instance() -> int:
+    """A process-unique number for one writer (e.g. one ``SearchCache``)."""
+    return next(_instances)
+
+
+def worker_id(instance: Optional[int] = None) -> str:
+    """Identifies a writer's rows: host, pid and, given one, the writer's instance number."""
+    base = f"{socket.gethostname()}:{os.getpid()}"
+    return base if instance is None else f"{base}:{instance}"
+
+
+def _empty() -> Dict[str, object]:
+    bucket = {event: 0 for event in EVENTS}
+    bucket["latency"] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    return bucket
+
+
+def _merge(into: Dict[str, object], other: Dict[str, object]) -> None:
+    for event in EVENTS:
+        into[event] += other[event]
+    into["latency"] = [a + b for a, b in zip(into["latency"], other["latency"])]
+
+
+class MetricsBuffer:
+    """
+    Thread-safe per-minute counters and latency histograms awaiting a batched write.
+
+    ``drain()`` hands ``{minute: {event: count, "latency": [bucket counts]}}``
+    to the writer; a failed write puts it back with ``requeue()``.
+    """
+
+    def __init__(self):
+        self._pending: Dict[int, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, event: str, timestamp: float, latency_ms: Optional[float] = None, count: int = 1) -> None:
+        """Count ``count`` lookups with outcome ``event``, optionally with one latency sample each."""
+        minute = int(timestamp // 60)
+        with self._lock:
+            bucket = self._pending.get(minute)
+            if bucket is None:
+                bucket = self._pending[minute] = _empty()
+            bucket[event] += count
+            if latency_ms is not None:
+                bucket["latency"][bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += count
+
+    def drain(self) -> Dict[int, Dict[str, object]]:
+        """Take every pending minute and reset the buffer."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            return pending
+
+    def requeue(self, pending: Dict[int, Dict[str, object]]) -> None:
+        """Merge minutes from a failed write back into the buffer."""
+        with self._lock:
+            for minute, counts in pending.items():
+                _merge(self._pending.setdefault(minute, _empty()), counts)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+def ensure_metrics_table(conn: sqlite3.Connection) -> None:
+    """Create the ``cache_metrics`` table if missing (rebuilding pre-namespace tables)."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(cache_metrics)")}
+    legacy = bool(columns) and "namespace" not in columns
+    if legacy:
+        # The namespace is part of the primary key, so the table is rebuilt
+        conn.execute("ALTER TABLE cache_metrics RENAME TO cache_metrics_legacy")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cache_metrics (
+            minute        INTEGER NOT NULL,
+            worker        TEXT NOT NULL,
+            namespace     TEXT NOT NULL DEFAULT 'search',
+            hits          INTEGER NOT NULL DEFAULT 0,
+            misses        INTEGER NOT NULL DEFAULT 0,
+            semantic_hits INTEGER NOT NULL DEFAULT 0,
+            stale_hits    INTEGER NOT NULL DEFAULT 0,
+            latency_hist  TEXT NOT NULL,
+            PRIMARY KEY (minute, worker, namespace)
+        )
+    """)
+    if legacy:
+        names = f"minute, worker, {', '.join(EVENTS)}, latency_hist"
+        conn.execute(f"INSERT INTO cache_metrics ({names}) SELECT {names} FROM cache_metrics_legacy")
+        conn.execute("DROP TABLE cache_metrics_legacy")
+
+
+def write_metrics(
+    conn: sqlite3.Connection, worker: str, pending: Dict[int, Dict[str, object]], namespace: str = "search"
+) -> None:
+    """
+    Merge drained minutes into this worker's rows for ``namespace`` on an open connection.
+
+    Starts a write transaction (unless one is open) before reading the
+    existing rows, so a concurrent flush of the same rows waits instead of
+    being overwritten; the caller commits.
+    """
+    minutes = sorted(pending)
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    placeholders = ",".join("?" * len(minutes))
+    for minute, *counts, hist in conn.execute(
+        f"SELECT minute, {', '.join(EVENTS)}, latency_hist FROM cache_metrics "
+        f"WHERE worker = ? AND namespace = ? AND minute IN ({placeholders})",
+        (worker, namespace, *minutes),
+    ).fetchall():
+        existing = dict(zip(EVENTS, counts))
+        existing["latency"] = json.loads(hist)
+        _merge(pending[minute], existing)
+    conn.executemany(
+        f"INSERT OR REPLACE INTO cache_metrics (minute, worker, namespace, {', '.join(EVENTS)}, latency_hist) "
+        f"VALUES (?, ?, ?, {', '.join('?' * len(EVENTS))}, ?)",
+        [
+            (minute, worker, namespace, *(pending[minute][event] for event in EVENTS),
+             json.dumps(pending[minute]["latency"]))
+            for minute in minutes
+        ],
+    )
+
+
+def histogram_quantile(counts: Sequence[int], q: float) -> Optional[float]:
+    """
+    Estimate the ``q`` quantile (0-1) in ms from bucket counts.
+
+    Interpolates linearly inside the bucket holding the quantile; samples in
+    the overflow bucket report its lower bound.
+    """
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(counts):
+        if count and seen + count >= rank:
+            lower = LATENCY_BUCKETS_MS[i - 1] if i > 0 else 0.0
+            if i >= len(LATENCY_BUCKETS_MS):
+                return lower
+            return lower + (LATENCY_BUCKETS_MS[i] - lower) * (rank - seen) / count
+        seen += count
+    return float(LATENCY_BUCKETS_MS[-1])
+
+
+def query_metrics(
+    conn: sqlite3.Connection, since: float, until: float, bucket_minutes: int = 5,
+    namespace: str = "search",
+) -> List[Dict[str, object]]:
+    """
+    Aggregate every worker's rows for ``namespace`` into ``bucket_minutes``-wide intervals.
+
+    Each interval reports its start (unix seconds), lookups, the raw counts,
+    ``hit_ratio`` (exact + semantic hits over lookups) and ``p50_ms``/``p95_ms``.
+    """
+    bucket_minutes = max(1, int(bucket_minutes))
+    intervals: Dict[int, Dict[str, object]] = {}
+    for minute, *counts, hist in conn.execute(
+        f"SELECT minute, {', '.join(EVENTS)}, latency_hist FROM cache_metrics "
+        f"WHERE namespace = ? AND minute >= ? AND minute <= ? ORDER BY minute",
+        (namespace, int(since // 60), int(until // 60)),
+    ):
+        row = dict(zip(EVENTS, counts))
+        row["latency"] = json.loads(hist)
+        _merge(intervals.setdefault(minute - minute % bucket_minutes, _empty()), row)
+
+    report = []
+    for start in sorted(intervals):
+        bucket = intervals[start]
+        hits = bucket["hits"] + bucket["semantic_hits"]
+        lookups = hits + bucket["misses"]
+        report.append({
+            "start": start * 60,
+            "lookups": lookups,
+            **{event: bucket[event] for event in EVENTS},
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "p50_ms": histogram_quantile(bucket["latency"], 0.50),
+            "p95_ms": histogram_quantile(bucket["latency"], 0.95),
+        })
+    return report
+
+
+def prune_metrics(conn: sqlite3.Connection, before: float) -> int:
+    """Delete rows for minutes before ``before`` (unix seconds). Returns rows deleted."""
+    return conn.execute("DELETE FROM cache_metrics WHERE minute < ?", (int(before // 60),)).rowcount
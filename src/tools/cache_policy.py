@@ -0,0 +1,160 @@
+"""
+Eviction, admission and bookkeeping helpers for SQLite-backed caches.
+
+- ``EVICTION_ORDER``: SQL ``ORDER BY`` clauses ranking rows from first-to-evict
+- ``FrequencySketch``: count-min sketch for TinyLFU admission decisions
+- ``HitBuffer``: write-behind accumulator for per-key hit counts
+- ``BackgroundSweeper``: daemon thread running a maintenance callback periodically
+"""
+
+import hashlib
+import threading
+from typing import Callable, Dict, Optional, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+
+# Rows sorting first are evicted first. cache_key breaks ties deterministically.
+EVICTION_ORDER = {
+    "lru": "COALESCE(last_accessed, created_at) ASC, cache_key",
+    "lfu": "hit_count ASC, COALESCE(last_accessed, created_at) ASC, cache_key",
+    "ttl": "expires_at ASC, cache_key",
+}
+
+
+class FrequencySketch:
+    """
+    Approximate access-frequency counter (count-min sketch, 4 rows).
+
+    Counters saturate at 15 and are halved once ``10 * width`` increments
+    have been recorded, so estimates favour recent popularity (the
+    "aging" step of TinyLFU). Memory is ``4 * width`` small ints regardless
+    of how many distinct keys are seen.
+    """
+
+    DEPTH = 4
+    MAX_COUNT = 15
+
+    def __init__(self, width: int = 4096):
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self._mask = self.width - 1
+        self._rows = [[0] * self.width for _ in range(self.DEPTH)]
+        self._additions = 0
+        self._sample_size = 10 * self.width
+        self._lock = threading.Lock()
+
+    def _indexes(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=4 * self.DEPTH).digest()
+        return [
+            int.from_bytes(digest[4 * i:4 * i + 4], "little") & self._mask
+            for i in range(self.DEPTH)
+        ]
+
+    def increment(self, key: str) -> None:
+        """Record one access to ``key``."""
+        indexes = self._indexes(key)
+        with self._lock:
+            for row, idx in zip(self._rows, indexes):
+                if row[idx] < self.MAX_COUNT:
+                    row[idx] += 1
+            self._additions += 1
+            if self._additions >= self._sample_size:
+                self._age()
+
+    def estimate(self, key: str) -> int:
+        """Estimated number of recent accesses to ``key``."""
+        indexes = self._indexes(key)
+        with self._lock:
+            return min(row[idx] for row, idx in zip(self._rows, indexes))
+
+    def _age(self) -> None:
+        for row in self._rows:
+            for i, count in enumerate(row):
+                row[i] = count >> 1
+        self._additions //= 2
+
+
+class HitBuffer:
+    """
+    Thread-safe in-memory buffer of hit counts awaiting a batched write.
+
+    ``record()`` returns True once ``flush_every`` hits are pending, as a
+    cue to flush early. ``drain()`` hands the pending counts to the writer;
+    if the write fails they go back with ``requeue()``, so a failed flush
+    only delays counts. A process crash loses at most what is pending.
+    """
+
+    def __init__(self, flush_every: int = 100):
+        self.flush_every = flush_every
+        self._pending: Dict[str, Tuple[int, float]] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, key: str, timestamp: float) -> bool:
+        """Add one hit for ``key`` at ``timestamp``. Returns True when a flush is due."""
+        with self._lock:
+            hits, _ = self._pending.get(key, (0, 0.0))
+            self._pending[key] = (hits + 1, timestamp)
+            self._count += 1
+            return self._count >= self.flush_every
+
+    def drain(self) -> Dict[str, Tuple[int, float]]:
+        """Take every pending ``{key: (hits, last_hit_at)}`` and reset the buffer."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._count = 0
+            return pending
+
+    def requeue(self, pending: Dict[str, Tuple[int, float]]) -> None:
+        """Merge counts from a failed flush back into the buffer."""
+        with self._lock:
+            for key, (hits, timestamp) in pending.items():
+                current, last = self._pending.get(key, (0, 0.0))
+                self._pending[key] = (current + hits, max(last, timestamp))
+                self._count += hits
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class BackgroundSweeper:
+    """
+    Daemon thread calling ``fn`` every ``interval`` seconds until stopped.
+
+    ``trigger()`` runs ``fn`` early without waiting for the interval.
+    Exceptions raised by ``fn`` are logged and do not stop the loop.
+    """
+
+    def __init__(self, fn: Callable[[], object], interval: float, name: str = "cache-sweeper"):
+        self.fn = fn
+        self.interval = interval
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = threading.Thread(
+            target=self._run, name=name, daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            try:
+                self.fn()
+            except Exception as e:
+                logger.warning("Background sweep failed", error=str(e))
+
+    def trigger(self) -> None:
+        """Wake the thread to run ``fn`` now."""
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Signal the thread to exit and wait for the current sweep to finish."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
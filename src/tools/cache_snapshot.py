@@ -0,0 +1,260 @@
+"""
+Cache snapshots for warming up fresh machines.
+
+A snapshot is a single SQLite file holding live search cache entries (with
+the documents they reference), their vectors for every embedding signature,
+and translation cache rows, optionally filtered by age and popularity.
+Payloads are copied as stored, so compressed rows stay compressed.
+
+Import runs in one transaction on the search cache connection (the
+translation cache is attached to it) and skips keys that already exist.
+Vectors are copied for every signature in the snapshot; the current
+provider's table is re-embedded only when the snapshot has no vectors for
+its signature (different provider or dimensions).
+"""
+
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import structlog
+
+from .search_cache import SearchCache, _VEC_FORMATS, _create_vec_table, _insert_vectors, _load_vec
+
+logger = structlog.get_logger()
+
+SNAPSHOT_FORMAT = 1
+
+_VEC_COLUMN = re.compile(r"embedding (float|int8|bit)\[(\d+)\]")
+_QUANTIZATION_BY_TYPE = {column_type: name for name, (column_type, _) in _VEC_FORMATS.items()}
+
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def _has_table(conn: sqlite3.Connection, schema: str, table: str) -> bool:
+    return conn.execute(
+        f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone() is not None
+
+
+def export_snapshot(
+    snapshot_path: Union[str, Path],
+    search_cache: SearchCache,
+    translation_cache_path: Optional[Union[str, Path]] = None,
+    max_age_hours: Optional[float] = None,
+    min_hits: int = 0,
+    limit: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Write live cache entries to a new snapshot file (replacing any existing one).
+
+    Args:
+        snapshot_path: Output file
+        search_cache: Source search cache
+        translation_cache_path: Translation cache database to include (skipped if missing)
+        max_age_hours: Only entries created within this many hours
+        min_hits: Only entries with at least this many stored hits (translations: accesses)
+        limit: Keep at most this many search entries, most hit first
+
+    Returns:
+        Counts of exported entries, documents, vectors and translations, plus file size
+    """
+    snapshot_path = Path(snapshot_path)
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    snapshot_path.unlink(missing_ok=True)
+
+    now = time.time()
+    min_created = now - max_age_hours * 3600 if max_age_hours is not None else 0
+    counts = {"entries": 0, "documents": 0, "vectors": 0, "translations": 0}
+
+    search_cache.flush_hits()
+    with search_cache._connect() as conn:
+        conn.execute("ATTACH DATABASE ? AS snap", (str(snapshot_path),))
+        try:
+            conn.execute("CREATE TABLE snap.snapshot_meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE snap.search_cache AS SELECT * FROM main.search_cache WHERE 0")
+            conn.execute(
+                "CREATE TABLE snap.search_documents AS SELECT * FROM main.search_documents WHERE 0"
+            )
+            conn.execute("""
+                CREATE TABLE snap.search_vectors (
+                    vec_table    TEXT NOT NULL,
+                    rowid_       INTEGER NOT NULL,
+                    search_depth TEXT NOT NULL,
+                    max_results  INTEGER NOT NULL,
+                    embedding    BLOB NOT NULL,
+                    expires_at   REAL NOT NULL,
+                    cache_key    TEXT NOT NULL,
+                    query_text   TEXT NOT NULL
+                )
+            """)
+
+            counts["entries"] = conn.execute(
+                "INSERT INTO snap.search_cache SELECT * FROM main.search_cache "
+                "WHERE expires_at > ? AND created_at >= ? AND hit_count >= ? "
+                "ORDER BY hit_count DESC, created_at DESC LIMIT ?",
+                (now, min_created, min_hits, limit if limit is not None else -1),
+            ).rowcount
+            counts["documents"] = conn.execute("""
+                INSERT INTO snap.search_documents
+                SELECT * FROM main.search_documents WHERE doc_key IN (
+                    SELECT refs.value FROM snap.search_cache AS c, json_each(c.doc_keys) AS refs
+                    WHERE c.doc_keys IS NOT NULL
+                )
+            """).rowcount
+
+            # Reading vec0 tables needs sqlite-vec; without it the importer re-embeds
+            meta = [("format", str(SNAPSHOT_FORMAT)), ("created_at", str(now))]
+            if search_cache._vec_loaded or _load_vec(conn):
+                for table, sql in conn.execute(
+                    "SELECT name, sql FROM main.sqlite_master WHERE type = 'table' "
+                    "AND name LIKE 'search_vec_%' AND sql LIKE 'CREATE VIRTUAL TABLE%'"
+                ).fetchall():
+                    column = _VEC_COLUMN.search(sql)
+                    if not column:
+                        continue
+                    quantization = _QUANTIZATION_BY_TYPE[column.group(1)]
+                    # Quantized tables export their float32 copy; import re-quantizes
+                    source = "embedding" if quantization == "none" else "full_embedding"
+                    copied = conn.execute(f"""
+                        INSERT INTO snap.search_vectors
+                        SELECT ?, rowid, search_depth, max_results, {source},
+                               expires_at, cache_key, query_text
+                        FROM main.{table}
+                        WHERE cache_key IN (SELECT cache_key FROM snap.search_cache)
+                    """, (table,)).rowcount
+                    if copied:
+                        meta.append((f"vec_dims:{table}", column.group(2)))
+                        meta.append((f"vec_quantization:{table}", quantization))
+                        counts["vectors"] += copied
+            conn.executemany("INSERT INTO snap.snapshot_meta VALUES (?, ?)", meta)
+
+            if translation_cache_path and Path(translation_cache_path).exists():
+                conn.execute("ATTACH DATABASE ? AS tc", (str(translation_cache_path),))
+                try:
+                    if _has_table(conn, "tc", "translation_cache"):
+                        conn.execute(
+                            "CREATE TABLE snap.translation_cache AS "
+                            "SELECT * FROM tc.translation_cache WHERE 0"
+                        )
+                        age_filter = (
+                            f"AND datetime(created_at) > datetime('now', '-{float(max_age_hours)} hours')"
+                            if max_age_hours is not None else ""
+                        )
+                        counts["translations"] = conn.execute(
+                            f"INSERT INTO snap.translation_cache SELECT * FROM tc.translation_cache "
+                            f"WHERE access_count >= ? {age_filter}",
+                            (min_hits,),
+                        ).rowcount
+                    conn.commit()
+                finally:
+                    conn.execute("DETACH DATABASE tc")
+            conn.commit()
+        finally:
+            conn.execute("DETACH DATABASE snap")
+
+    with sqlite3.connect(snapshot_path) as snap:
+        snap.execute("VACUUM")
+    snap.close()
+
+    counts["bytes"] = snapshot_path.stat().st_size
+    logger.info("Exported cache snapshot", path=str(snapshot_path), **counts)
+    return counts
+
+
+def import_snapshot(
+    snapshot_path: Union[str, Path],
+    search_cache: SearchCache,
+    translation_cache_path: Optional[Union[str, Path]] = None,
+) -> Dict[str, int]:
+    """
+    Bulk-load a snapshot into ``search_cache`` (and the translation cache).
+
+    Everything is inserted in one transaction; existing keys are kept.
+    Vectors are rebuilt with the cache's own provider only if the snapshot
+    carries none for its embedding signature.
+
+    Returns:
+        Counts of imported entries, documents, vectors and translations,
+        plus ``vectors_rebuilt``
+    """
+    snapshot_path = Path(snapshot_path)
+    if not snapshot_path.exists():
+        raise FileNotFoundError(f"Snapshot not found: {snapshot_path}")
+    if translation_cache_path:
+        # Creates the translation_cache table on a fresh machine
+        from .translation_cache import TranslationCache
+        TranslationCache(cache_path=str(translation_cache_path))
+
+    counts = {"entries": 0, "documents": 0, "vectors": 0, "translations": 0}
+    snapshot_tables: List[str] = []
+
+    with search_cache._connect() as conn:
+        conn.commit()
+        conn.execute("ATTACH DATABASE ? AS snap", (str(snapshot_path),))
+        if translation_cache_path:
+            conn.execute("ATTACH DATABASE ? AS tc", (str(translation_cache_path),))
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM snap.snapshot_meta").fetchall())
+            if int(meta.get("format", 0)) > SNAPSHOT_FORMAT:
+                raise ValueError(f"Unsupported snapshot format: {meta.get('format')}")
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table in ("search_cache", "search_documents"):
+                    target = set(_columns(conn, "main", table))
+                    cols = ", ".join(c for c in _columns(conn, "snap", table) if c in target)
+                    counts["entries" if table == "search_cache" else "documents"] = conn.execute(
+                        f"INSERT OR IGNORE INTO main.{table} ({cols}) SELECT {cols} FROM snap.{table}"
+                    ).rowcount
+
+                if search_cache._vec_loaded:
+                    for key, dims in meta.items():
+                        if not key.startswith("vec_dims:"):
+                            continue
+                        table = key.split(":", 1)[1]
+                        quantization = meta.get(f"vec_quantization:{table}", "none")
+                        _create_vec_table(conn, table, int(dims), quantization)
+                        indexed = {row[0] for row in conn.execute(f"SELECT rowid FROM main.{table}")}
+                        rows = [
+                            row for row in conn.execute(
+                                "SELECT rowid_, search_depth, max_results, embedding, "
+                                "expires_at, cache_key, query_text "
+                                "FROM snap.search_vectors WHERE vec_table = ?", (table,)
+                            )
+                            if row[0] not in indexed
+                        ]
+                        _insert_vectors(conn, f"main.{table}", quantization, rows)
+                        counts["vectors"] += len(rows)
+                        snapshot_tables.append(table)
+
+                if translation_cache_path and _has_table(conn, "snap", "translation_cache"):
+                    target = set(_columns(conn, "tc", "translation_cache"))
+                    cols = ", ".join(
+                        c for c in _columns(conn, "snap", "translation_cache")
+                        if c in target and c != "id"
+                    )
+                    counts["translations"] = conn.execute(
+                        f"INSERT OR IGNORE INTO tc.translation_cache ({cols}) "
+                        f"SELECT {cols} FROM snap.translation_cache"
+                    ).rowcount
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        finally:
+            conn.execute("DETACH DATABASE snap")
+            if translation_cache_path:
+                conn.execute("DETACH DATABASE tc")
+
+    # Only re-embed when the snapshot was made with another provider/dimension
+    counts["vectors_rebuilt"] = (
+        search_cache.rebuild_vectors()
+        if search_cache._vec_available and search_cache._vec_table not in snapshot_tables
+        else 0
+    )
+    logger.info("Imported cache snapshot", path=str(snapshot_path), **counts)
+    return counts
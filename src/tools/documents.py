@@ -0,0 +1,70 @@
+"""
+Content addressing for search result documents.
+
+A document is identified by its canonical URL plus a hash of its content, so
+the same page returned by different queries (or researches) is stored once,
+while a page whose content changed gets a new entry.
+
+Two stores use these keys: ``search_documents`` in the search cache file and
+``documents`` in the research history DB. They are kept apart on purpose.
+The cache is a size-capped file whose documents are deleted with the last
+entry that references them. History sources must outlive any cache eviction
+(and the cache file can be dropped or restored from a snapshot). Since both
+stores share ``document_key``, a page has the same key in each, so they can be
+joined by ``doc_key`` without a foreign key between the two files.
+"""
+
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the click, never select content
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "ref_src",
+})
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL for deduplication.
+
+    Lowercases scheme and host, drops default ports, fragments, ``utm_*``
+    and other tracking parameters, sorts the remaining query parameters and
+    strips a trailing slash from non-root paths. Unparseable input is
+    returned stripped but otherwise unchanged.
+    """
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.netloc:
+        return url
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 hex digest of the document text."""
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+
+def document_key(url: str, content: str) -> str:
+    """Content address of a document: SHA-256 over canonical URL and content hash."""
+    raw = f"{canonical_url(url)}\n{content_hash(content)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
@@ -0,0 +1,218 @@
+"""
+Persistent text -> embedding cache shared by every embedding consumer.
+
+``EmbeddingStore`` keeps raw float32 vectors in SQLite, keyed by
+(provider, model, dims, sha256(text)), so a query or topic is embedded once
+across lookups, stores and process restarts. ``CachedEmbedding`` wraps any
+``EmbeddingProvider`` with an in-memory LRU in front of the store; it keeps
+the wrapped provider's signature, so vectors stay comparable with ones
+already indexed.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import structlog
+
+from .embeddings import EmbeddingProvider
+from .lru_cache import LRUCache
+from .sqlite_pool import SQLitePool
+
+logger = structlog.get_logger()
+
+# Bound on bound parameters per SELECT ... IN (...)
+_LOOKUP_CHUNK = 500
+
+
+def text_hash(text: str) -> str:
+    """Key for a text as the provider sees it (surrounding whitespace ignored)."""
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+
+def provider_identity(provider: EmbeddingProvider) -> Tuple[str, str, int]:
+    """(provider, model, dims) under which ``provider``'s vectors are stored."""
+    model = getattr(provider, "model", None) or provider.signature
+    return type(provider).__name__, model, provider.dimensions
+
+
+class EmbeddingStore:
+    """
+    SQLite table of embeddings, shared by all providers and caches.
+
+    Entries never expire (an embedding of a text does not change); with
+    ``max_entries`` set, the oldest tenth is evicted once the table grows
+    past the cap.
+    """
+
+    def __init__(
+        self,
+        path: str = "data/cache/embedding_cache.db",
+        max_entries: Optional[int] = 500_000,
+        pool_size: int = 4,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.logger = logger.bind(component="embedding_cache")
+        self._pool = SQLitePool(str(self.path), size=pool_size)
+        self._count_lock = threading.Lock()
+        with self._pool.connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    dims INTEGER NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (provider, model, dims, text_hash)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embedding_created ON embedding_cache(created_at)")
+            # Approximate (other processes write too); only used to decide when to evict
+            self._count = conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+    def get_many(self, identity: Tuple[str, str, int], hashes: Sequence[str]) -> Dict[str, bytes]:
+        """Stored embeddings for the given text hashes (missing ones are left out)."""
+        found: Dict[str, bytes] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._pool.connection() as conn:
+            for start in range(0, len(unique), _LOOKUP_CHUNK):
+                chunk = unique[start:start + _LOOKUP_CHUNK]
+                rows = conn.execute(
+                    f"""
+                    SELECT text_hash, embedding FROM embedding_cache
+                    WHERE provider = ? AND model = ? AND dims = ?
+                      AND text_hash IN ({",".join("?" * len(chunk))})
+                    """,
+                    (*identity, *chunk),
+                )
+                found.update(rows)
+        return found
+
+    def put_many(self, identity: Tuple[str, str, int], items: Sequence[Tuple[str, bytes]]) -> None:
+        """Store (text_hash, embedding) pairs; existing rows are kept."""
+        if not items:
+            return
+        now = time.time()
+        with self._pool.connection() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO embedding_cache VALUES (?, ?, ?, ?, ?, ?)",
+                [(*identity, key, embedding, now) for key, embedding in items],
+            )
+            added = conn.total_changes - before
+        with self._count_lock:
+            self._count += added
+            over = self.max_entries is not None and self._count > self.max_entries
+        if over:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop the oldest tenth of the cap (and anything beyond it)."""
+        with self._pool.connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+            excess = count - self.max_entries + max(self.max_entries // 10, 1)
+            if excess > 0:
+                conn.execute(
+                    """
+                    DELETE FROM embedding_cache WHERE (provider, model, dims, text_hash) IN (
+                        SELECT provider, model, dims, text_hash FROM embedding_cache
+                        ORDER BY created_at LIMIT ?
+                    )
+                    """,
+                    (excess,),
+                )
+                count -= excess
+        with self._count_lock:
+            self._count = count
+        self.logger.info("Evicted old embeddings", removed=max(excess, 0), remaining=count)
+
+    def __len__(self) -> int:
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+class CachedEmbedding(EmbeddingProvider):
+    """
+    Caching decorator for an ``EmbeddingProvider``.
+
+    Lookups go LRU -> ``store`` (if any) -> wrapped provider; only texts
+    found nowhere are sent to the provider, in one ``embed_batch()`` call.
+    Store errors are logged and treated as misses, so the cache can never
+    make embedding fail.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        store: Optional[EmbeddingStore] = None,
+        lru_size: int = 4096,
+    ):
+        self.provider = provider
+        self.store = store
+        self._identity = provider_identity(provider)
+        self._lru = LRUCache(lru_size)
+        self.logger = logger.bind(component="embedding_cache")
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def dimensions(self) -> int:
+        return self.provider.dimensions
+
+    @property
+    def recommended_threshold(self) -> float:
+        return self.provider.recommended_threshold
+
+    @property
+    def signature(self) -> str:
+        return self.provider.signature
+
+    def embed(self, text: str) -> bytes:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> List[bytes]:
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[str, bytes] = {}
+        for key in hashes:
+            embedding = self._lru.get(key)
+            if embedding is not None:
+                found[key] = embedding
+
+        if self.store is not None and len(found) < len(hashes):
+            try:
+                stored = self.store.get_many(self._identity, [k for k in hashes if k not in found])
+            except sqlite3.Error as e:
+                self.logger.warning("Embedding store lookup failed", error=str(e))
+                stored = {}
+            for key, embedding in stored.items():
+                self._lru.put(key, embedding)
+            found.update(stored)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(hashes, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        self.hits += len(hashes) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            computed = self.provider.embed_batch(list(missing.values()))
+            new_items = list(zip(missing, computed))
+            for key, embedding in new_items:
+                self._lru.put(key, embedding)
+                found[key] = embedding
+            if self.store is not None:
+                try:
+                    self.store.put_many(self._identity, new_items)
+                except sqlite3.Error as e:
+                    self.logger.warning("Embedding store write failed", error=str(e))
+
+        return [found[key] for key in hashes]
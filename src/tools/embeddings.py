@@ -4,13 +4,19 @@ Embedding providers for semantic search cache.
 Supports:
 - HashEmbedding: zero-dependency hash-based vectorizer (default)
 - OpenAIEmbedding: high-quality embeddings via OpenAI API (optional)
+- IDFEmbedding: hash features weighted by corpus IDF (see idf_embedding.py)
+- ReducedEmbedding: fewer dimensions of another provider's vectors
 """
 
 import hashlib
 import math
+import os
+import re
 import struct
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 import structlog
 
@@ -19,6 +25,22 @@ logger = structlog.get_logger()
 # Embedding dimensions
 HASH_DIMENSIONS = 256
 OPENAI_DIMENSIONS = 1536  # text-embedding-3-small
+# OpenAI vectors are indexed truncated to this many dimensions (None = full)
+OPENAI_INDEX_DIMENSIONS = 512
+
+# Embeddings endpoint limits per request (inputs, total tokens), with headroom
+OPENAI_MAX_BATCH_INPUTS = 2048
+OPENAI_MAX_BATCH_TOKENS = 250_000
+
+# How long a provider choice (and an OpenAI key check) is reused
+PROVIDER_TTL_SECONDS = 3600
+
+# Distinct tokens whose hash slots a HashEmbedding remembers
+TOKEN_CACHE_SIZE = 65536
+
+# Anything that is not a letter or digit separates words (same split as
+# replacing non-alphanumerics with spaces: underscores count as separators)
+_NON_ALNUM = re.compile(r"[\W_]+")
 
 
 class EmbeddingProvider(ABC):
@@ -34,11 +56,20 @@ class EmbeddingProvider(ABC):
         """Recommended similarity threshold for this provider."""
         return 0.85
     
+    @property
+    def signature(self) -> str:
+        """Identifies the vector space; vectors with different signatures are not comparable."""
+        return f"{type(self).__name__.lower()}-{self.dimensions}"
+    
     @abstractmethod
     def embed(self, text: str) -> bytes:
         """Return embedding as packed float bytes for sqlite-vec."""
         pass
     
+    def embed_batch(self, texts: List[str]) -> List[bytes]:
+        """Embed several texts, in order. Providers with a batch API override this."""
+        return [self.embed(text) for text in texts]
+    
     def embed_float(self, text: str) -> List[float]:
         """Return embedding as list of floats."""
         raw = self.embed(text)
@@ -52,10 +83,14 @@ class HashEmbedding(EmbeddingProvider):
     
     Zero external dependencies. Works well for short text (search queries).
     Generates a fixed-size vector by hashing words and n-grams into positions.
+    ``embed_batch()`` builds all vectors in one numpy scatter; token slots
+    are memoized, so repeated words are hashed once.
     """
     
     def __init__(self, dimensions: int = HASH_DIMENSIONS):
         self._dimensions = dimensions
+        self._buckets = dimensions  # hash space tokens are reduced into
+        self._slots = {}  # token -> bucket * 2 + (1 if the sign is negative)
     
     @property
     def dimensions(self) -> int:
@@ -66,45 +101,74 @@ class HashEmbedding(EmbeddingProvider):
         # Hash embeddings produce lower absolute cosine values than neural models
         return 0.20
     
+    @property
+    def signature(self) -> str:
+        return f"hash-{self._dimensions}"
+    
     def _tokenize(self, text: str) -> List[str]:
         """Tokenize into words, bigrams, and trigrams."""
         # Lowercase, strip punctuation, split
-        cleaned = ''.join(c if c.isalnum() or c.isspace() else ' ' for c in text.lower())
-        words = cleaned.split()
+        words = _NON_ALNUM.sub(' ', text.lower()).split()
         
         tokens = list(words)  # unigrams
         
         # Bigrams
-        for i in range(len(words) - 1):
-            tokens.append(f"{words[i]}_{words[i+1]}")
+        tokens += [f"{a}_{b}" for a, b in zip(words, words[1:])]
         
         # Trigrams
-        for i in range(len(words) - 2):
-            tokens.append(f"{words[i]}_{words[i+1]}_{words[i+2]}")
+        tokens += [f"{a}_{b}_{c}" for a, b, c in zip(words, words[1:], words[2:])]
         
         return tokens
     
+    def _slot(self, token: str) -> int:
+        """
+        Encoded bucket and sign of a token: MD5 bytes 0-3 pick the bucket,
+        the low bit of byte 7 the sign (set = negative).
+        """
+        slot = self._slots.get(token)
+        if slot is None:
+            digest = hashlib.md5(token.encode()).digest()
+            slot = (int.from_bytes(digest[:4], "big") % self._buckets) * 2 + (digest[7] & 1)
+            if len(self._slots) >= TOKEN_CACHE_SIZE:
+                self._slots.clear()
+            self._slots[token] = slot
+        return slot
+    
     def embed(self, text: str) -> bytes:
         """Generate hash-based embedding."""
-        vec = np.zeros(self._dimensions, dtype=np.float32)
-        tokens = self._tokenize(text)
-        
-        if not tokens:
-            return vec.tobytes()
-        
-        for token in tokens:
-            # Hash to get position and sign
-            h = hashlib.md5(token.encode()).hexdigest()
-            pos = int(h[:8], 16) % self._dimensions
-            sign = 1.0 if int(h[8:16], 16) % 2 == 0 else -1.0
-            vec[pos] += sign
-        
-        # L2 normalize
-        norm = np.linalg.norm(vec)
-        if norm > 0:
-            vec = vec / norm
-        
-        return vec.tobytes()
+        return self.embed_batch([text])[0]
+    
+    def _token_slots(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Text index and encoded slot (see ``_slot``) of every token in ``texts``."""
+        tokens, counts = [], []
+        for text in texts:
+            text_tokens = self._tokenize(text)
+            tokens += text_tokens
+            counts.append(len(text_tokens))
+        cached = self._slots.get
+        slots = np.fromiter(
+            (slot if (slot := cached(token)) is not None else self._slot(token) for token in tokens),
+            dtype=np.int64, count=len(tokens),
+        )
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), counts)
+        return rows, slots
+    
+    def _scatter(self, n: int, rows: np.ndarray, positions: np.ndarray, weights: np.ndarray) -> List[bytes]:
+        """Sum token weights into ``n`` vectors and L2-normalize them (empty rows stay zero)."""
+        dims = self._dimensions
+        matrix = np.bincount(
+            rows * dims + positions, weights=weights, minlength=n * dims
+        ).astype(np.float32).reshape(n, dims)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return [row.tobytes() for row in matrix]
+    
+    def embed_batch(self, texts: List[str]) -> List[bytes]:
+        """Embed several texts at once; each vector equals ``embed(text)`` bit for bit."""
+        rows, slots = self._token_slots(texts)
+        # Scatter-add every token at once; counts are small integers, so the
+        # float64 sums cast to float32 exactly
+        return self._scatter(len(texts), rows, slots >> 1, 1.0 - 2.0 * (slots & 1))
 
 
 class OpenAIEmbedding(EmbeddingProvider):
@@ -112,39 +176,192 @@ class OpenAIEmbedding(EmbeddingProvider):
     OpenAI text-embedding-3-small provider.
     
     High quality embeddings, costs ~$0.00002/1K tokens.
-    Requires OpenAI API key.
+    Requires OpenAI API key. ``embed_batch()`` sends many inputs per request,
+    split so no request exceeds ``max_batch_inputs`` or ``max_batch_tokens``.
+    ``base_url`` points the client at another server (e.g. a local stub).
     """
     
-    def __init__(self, api_key: str, model: str = "text-embedding-3-small"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "text-embedding-3-small",
+        base_url: Optional[str] = None,
+        max_batch_inputs: int = OPENAI_MAX_BATCH_INPUTS,
+        max_batch_tokens: int = OPENAI_MAX_BATCH_TOKENS,
+    ):
         import openai
-        self.client = openai.OpenAI(api_key=api_key)
+        self.client = openai.OpenAI(api_key=api_key, base_url=base_url)
         self.model = model
+        self.max_batch_inputs = max_batch_inputs
+        self.max_batch_tokens = max_batch_tokens
         self._dimensions = OPENAI_DIMENSIONS
     
     @property
     def dimensions(self) -> int:
         return self._dimensions
     
+    @property
+    def signature(self) -> str:
+        return f"openai-{self.model}-{self._dimensions}"
+    
     def embed(self, text: str) -> bytes:
         """Generate embedding via OpenAI API."""
-        response = self.client.embeddings.create(
-            model=self.model,
-            input=text.strip()
-        )
-        vec = np.array(response.data[0].embedding, dtype=np.float32)
-        return vec.tobytes()
+        return self.embed_batch([text])[0]
+    
+    @staticmethod
+    def _token_estimate(text: str) -> int:
+        # UTF-8 length bounds the BPE token count from above without a tokenizer
+        return len(text.encode("utf-8")) + 1
+    
+    def _chunks(self, texts: List[str]) -> List[List[int]]:
+        """Split input indexes into requests within the input and token budgets."""
+        chunks, current, tokens = [], [], 0
+        for i, text in enumerate(texts):
+            cost = self._token_estimate(text)
+            if current and (len(current) >= self.max_batch_inputs or tokens + cost > self.max_batch_tokens):
+                chunks.append(current)
+                current, tokens = [], 0
+            current.append(i)
+            tokens += cost
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def embed_batch(self, texts: List[str]) -> List[bytes]:
+        """Generate embeddings with as few API requests as the limits allow."""
+        inputs = [text.strip() for text in texts]
+        embeddings: List[Optional[bytes]] = [None] * len(inputs)
+        for chunk in self._chunks(inputs):
+            response = self.client.embeddings.create(
+                model=self.model,
+                input=[inputs[i] for i in chunk],
+            )
+            # Results carry their input index; don't rely on response order
+            for item in response.data:
+                embeddings[chunk[item.index]] = np.array(item.embedding, dtype=np.float32).tobytes()
+        return embeddings
+
+
+class ReducedEmbedding(EmbeddingProvider):
+    """
+    Lower-dimensional, re-normalized view of another provider's vectors.
+    
+    - ``"truncate"``: keep the first ``dimensions`` components
+      (Matryoshka-style; text-embedding-3 models are trained for this).
+    - ``"projection"``: multiply by a seeded Gaussian random projection,
+      which roughly preserves cosine similarity for any provider. The matrix
+      is generated once and, with ``projection_path``, stored and
+      memory-mapped on later runs.
+    
+    The signature records the method and size, so reduced vectors get their
+    own vector table.
+    """
+    
+    METHODS = ("truncate", "projection")
+    
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        dimensions: int,
+        method: str = "truncate",
+        seed: int = 0,
+        projection_path: Optional[str] = None,
+    ):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown reduction method: {method}")
+        if not 0 < dimensions <= provider.dimensions:
+            raise ValueError(f"Cannot reduce {provider.dimensions} dimensions to {dimensions}")
+        self.provider = provider
+        self.method = method
+        self.seed = seed
+        self.projection_path = projection_path
+        self._dimensions = dimensions
+        self._projection: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def dimensions(self) -> int:
+        return self._dimensions
+    
+    @property
+    def recommended_threshold(self) -> float:
+        return self.provider.recommended_threshold
+    
+    @property
+    def signature(self) -> str:
+        if self.method == "truncate":
+            return f"{self.provider.signature}-t{self._dimensions}"
+        return f"{self.provider.signature}-rp{self._dimensions}s{self.seed}"
+    
+    def projection(self) -> np.ndarray:
+        """The (source dims x dimensions) projection matrix, built or loaded once."""
+        with self._lock:
+            if self._projection is None:
+                shape = (self.provider.dimensions, self._dimensions)
+                path = self.projection_path
+                if path and os.path.exists(path):
+                    matrix = np.load(path, mmap_mode="r")
+                    if matrix.shape != shape:
+                        raise ValueError(f"Projection in {path} is {matrix.shape}, expected {shape}")
+                else:
+                    rng = np.random.default_rng(self.seed)
+                    matrix = (rng.standard_normal(shape) / math.sqrt(self._dimensions)).astype(np.float32)
+                    if path:
+                        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                        np.save(path, matrix)
+                self._projection = matrix
+            return self._projection
+    
+    def reduce(self, matrix: np.ndarray) -> np.ndarray:
+        """Reduce and L2-normalize rows of full-size vectors."""
+        if self.method == "truncate":
+            reduced = np.array(matrix[:, :self._dimensions], dtype=np.float32)
+        else:
+            reduced = (matrix @ self.projection()).astype(np.float32)
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        np.divide(reduced, norms, out=reduced, where=norms > 0)
+        return reduced
+    
+    def embed(self, text: str) -> bytes:
+        return self.embed_batch([text])[0]
+    
+    def embed_batch(self, texts: List[str]) -> List[bytes]:
+        if not texts:
+            return []
+        full = np.stack([
+            np.frombuffer(embedding, dtype=np.float32) for embedding in self.provider.embed_batch(texts)
+        ])
+        return [row.tobytes() for row in self.reduce(full)]
+
+
+def _load_idf(idf_path: Optional[str]) -> Optional[EmbeddingProvider]:
+    """Trained IDF provider from ``idf_path``, or None when there is none."""
+    from .idf_embedding import IDF_WEIGHTS_PATH, IDFEmbedding
+    path = idf_path or IDF_WEIGHTS_PATH
+    try:
+        return IDFEmbedding.load(path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("IDF embeddings unavailable", path=str(path), error=str(e))
+        return None
 
 
 def create_embedding_provider(
     openai_api_key: Optional[str] = None,
-    provider: str = "auto"
+    provider: str = "auto",
+    idf_path: Optional[str] = None,
 ) -> EmbeddingProvider:
     """
     Create the best available embedding provider.
     
+    Preference in auto mode: OpenAI (with a key), then trained IDF weights
+    (``cli.py cache train-idf``), then hash.
+    
     Args:
         openai_api_key: OpenAI API key (enables high-quality embeddings)
-        provider: "auto", "hash", or "openai"
+        provider: "auto", "hash", "idf" or "openai"
+        idf_path: Trained IDF weights (default: data/cache/idf_embedding.npy)
     
     Returns:
         EmbeddingProvider instance
@@ -161,7 +378,126 @@ def create_embedding_provider(
             logger.info("Using OpenAI embeddings (auto-detected)")
             return ep
         except Exception as e:
-            logger.warning("OpenAI embeddings unavailable, falling back to hash", error=str(e))
+            logger.warning("OpenAI embeddings unavailable, falling back to local", error=str(e))
+    
+    if provider in ("auto", "idf"):
+        idf = _load_idf(idf_path)
+        if idf is not None:
+            logger.info("Using IDF embeddings", signature=idf.signature)
+            return idf
     
     logger.info("Using hash-based embeddings", dimensions=HASH_DIMENSIONS)
     return HashEmbedding()
+
+
+class EmbeddingProviderRegistry:
+    """
+    Process-wide memo of embedding providers, keyed by a hash of the API key.
+    
+    ``get()`` never blocks on the network. In auto mode an OpenAI key is
+    validated in a background thread, at most once per ``ttl_seconds``;
+    until the check has passed (or after it failed) the local provider
+    (trained IDF weights, else hash) is returned. Once validated, the
+    OpenAI provider keeps being returned while it is re-checked. OpenAI
+    vectors are truncated to ``openai_dimensions`` (None keeps all 1536).
+    """
+    
+    def __init__(
+        self,
+        ttl_seconds: float = PROVIDER_TTL_SECONDS,
+        idf_path: Optional[str] = None,
+        openai_dimensions: Optional[int] = OPENAI_INDEX_DIMENSIONS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.idf_path = idf_path
+        self.openai_dimensions = openai_dimensions
+        self._lock = threading.Lock()
+        self._local: Optional[Tuple[EmbeddingProvider, float]] = None
+        # key hash -> (provider, validated ok, checked_at)
+        self._remote: Dict[str, Tuple[EmbeddingProvider, bool, float]] = {}
+        self._checking: Dict[str, threading.Thread] = {}
+    
+    @staticmethod
+    def key_id(api_key: Optional[str]) -> str:
+        return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    
+    def local(self) -> EmbeddingProvider:
+        """Local provider, re-resolved once per TTL (picks up retrained IDF weights)."""
+        now = time.time()
+        with self._lock:
+            if self._local is not None and now - self._local[1] < self.ttl_seconds:
+                return self._local[0]
+        provider = create_embedding_provider(provider="idf", idf_path=self.idf_path)
+        with self._lock:
+            if self._local is None or self._local[0].signature != provider.signature:
+                self._local = (provider, now)
+            else:
+                # Keep the instance (and its token memo) when nothing changed
+                self._local = (self._local[0], now)
+            return self._local[0]
+    
+    def get(self, openai_api_key: Optional[str] = None, provider: str = "auto") -> EmbeddingProvider:
+        """Best provider available right now for this key (see class docstring)."""
+        if provider == "hash":
+            return create_embedding_provider(provider="hash")
+        if provider == "idf" or not openai_api_key:
+            return self.local()
+        
+        key_id = self.key_id(openai_api_key)
+        now = time.time()
+        with self._lock:
+            entry = self._remote.get(key_id)
+            if entry is None:
+                remote = OpenAIEmbedding(api_key=openai_api_key)
+                if self.openai_dimensions:
+                    remote = ReducedEmbedding(remote, self.openai_dimensions)
+                entry = (remote, False, 0.0)
+                self._remote[key_id] = entry
+            remote, ok, checked_at = entry
+            if provider == "openai":
+                return remote
+            if now - checked_at >= self.ttl_seconds and key_id not in self._checking:
+                thread = threading.Thread(
+                    target=self._validate, args=(key_id, remote), name="embedding-check", daemon=True
+                )
+                self._checking[key_id] = thread
+                thread.start()
+        return remote if ok else self.local()
+    
+    def _validate(self, key_id: str, remote: EmbeddingProvider) -> None:
+        try:
+            remote.embed("test")
+            ok = True
+            logger.info("OpenAI embeddings validated", key_id=key_id)
+        except Exception as e:
+            ok = False
+            logger.warning("OpenAI embeddings unavailable, using local", key_id=key_id, error=str(e))
+        with self._lock:
+            self._remote[key_id] = (remote, ok, time.time())
+            self._checking.pop(key_id, None)
+    
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for in-flight key checks (tests and one-shot scripts)."""
+        with self._lock:
+            threads = list(self._checking.values())
+        for thread in threads:
+            thread.join(timeout)
+
+
+_registry = EmbeddingProviderRegistry()
+
+
+def get_embedding_provider(
+    openai_api_key: Optional[str] = None, provider: str = "auto", wait: bool = False
+) -> EmbeddingProvider:
+    """
+    Memoized, non-blocking provider lookup through the process-wide registry.
+    
+    With ``wait`` (one-shot scripts), block until the key check has finished
+    and return the provider a long-running service settles on for this key.
+    """
+    resolved = _registry.get(openai_api_key, provider=provider)
+    if wait and openai_api_key:
+        _registry.wait()
+        resolved = _registry.get(openai_api_key, provider=provider)
+    return resolved
@@ -0,0 +1,158 @@
+"""
+Hedged requests for tail-latency control.
+
+A hedged call starts the request, and if it has not answered within a delay
+(a high percentile of recent latencies, from ``LatencyTracker``), starts one
+identical backup request and returns whichever succeeds first. With the delay
+at p95, at most about 5% of calls send a second request, while a single stuck
+connection or slow backend replica no longer sets the latency of the call.
+
+Every attempt's latency is recorded, failures included; a primary that loses
+to its backup is recorded at the time it had run, a lower bound. Recording
+only winners would pull the percentile, and so the delay, down exactly when
+the tail gets worse.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+
+class LatencyTracker:
+    """
+    Rolling window of recent call latencies, shared across threads.
+
+    ``percentile()`` returns None until ``min_samples`` calls have been
+    recorded, so nothing is hedged on a cold start.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """The ``p``-th percentile (0-100) of the window, in seconds."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            samples = list(self._samples)
+        return float(np.percentile(samples, p))
+
+    def record_hedge(self, won: bool) -> None:
+        with self._lock:
+            self.hedged += 1
+            self.hedge_wins += won
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Window size, p50/p95 latency and hedge counts."""
+        p50, p95 = self.percentile(50), self.percentile(95)
+        with self._lock:
+            return {
+                "samples": len(self._samples),
+                "p50": round(p50, 4) if p50 is not None else None,
+                "p95": round(p95, 4) if p95 is not None else None,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+            }
+
+
+class LatencyTrackers:
+    """One ``LatencyTracker`` per key (e.g. search depth), created on first use."""
+
+    def __init__(self, **tracker_kwargs):
+        self._tracker_kwargs = tracker_kwargs
+        self._trackers: Dict[str, LatencyTracker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> LatencyTracker:
+        with self._lock:
+            tracker = self._trackers.get(key)
+            if tracker is None:
+                tracker = self._trackers[key] = LatencyTracker(**self._tracker_kwargs)
+            return tracker
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """``LatencyTracker.get_stats()`` per key."""
+        with self._lock:
+            trackers = dict(self._trackers)
+        return {key: tracker.get_stats() for key, tracker in trackers.items()}
+
+
+async def _timed(call: Callable[[], Awaitable[Any]], tracker: Optional[LatencyTracker]) -> Any:
+    """Await ``call()``, recording its latency whether it succeeds or fails (not if cancelled)."""
+    started = time.perf_counter()
+    cancelled = False
+    try:
+        return await call()
+    except asyncio.CancelledError:
+        cancelled = True
+        raise
+    finally:
+        if tracker is not None and not cancelled:
+            tracker.record(time.perf_counter() - started)
+
+
+async def hedged(
+    call: Callable[[], Awaitable[Any]],
+    delay: Optional[float],
+    tracker: Optional[LatencyTracker] = None,
+) -> Any:
+    """
+    Await ``call()``, starting a second ``call()`` if the first takes longer than ``delay``.
+
+    If one attempt fails while the other is still running, the other's
+    outcome is used; the loser is cancelled. Each attempt's latency, hedges
+    sent and whether the backup won are recorded on ``tracker`` (see the
+    module docstring). If the caller cancels (e.g. a deadline), nothing is
+    recorded for the attempts in flight. With ``delay`` None this is a plain
+    ``await call()``.
+    """
+    if delay is None:
+        return await _timed(call, tracker)
+
+    started = time.perf_counter()
+    primary = asyncio.ensure_future(_timed(call, tracker))
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+    except asyncio.CancelledError:
+        primary.cancel()
+        raise
+    if done:
+        return primary.result()
+
+    logger.debug("Sending hedged request", delay=round(delay, 3))
+    backup = asyncio.ensure_future(_timed(call, tracker))
+    attempts = [primary, backup]
+    pending = set(attempts)
+    first_error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Prefer the primary if both finished in the same step
+            for task in sorted(done, key=attempts.index):
+                if task.exception() is None:
+                    if tracker is not None:
+                        tracker.record_hedge(won=task is backup)
+                        if task is backup and not primary.done():
+                            tracker.record(time.perf_counter() - started)
+                    return task.result()
+                first_error = first_error or task.exception()
+        if tracker is not None:
+            tracker.record_hedge(won=False)
+        raise first_error
+    finally:
+        for task in attempts:
+            task.cancel()
@@ -0,0 +1,170 @@
+"""
+Corpus-trained, IDF-weighted local embeddings.
+
+``HashEmbedding`` counts every token once, so common words ("trends",
+"latest", "2025") weigh as much as the words that make two queries the same
+topic. ``IDFEmbedding`` uses the same tokens (plus optional character
+n-grams, which match word variants such as "computing"/"computers"), hashes
+them into a large feature space and weights each feature by its inverse
+document frequency over the queries and topics already seen. Weighted
+features are folded into ``dimensions`` signed positions, so vectors stay
+small enough for the vec0 index.
+
+Weights are a single float32 ``.npy`` array (one value per feature bucket,
+1 MB at the default 2**18 buckets) memory-mapped on load, with a JSON
+sidecar for the settings; ``python cli.py cache train-idf`` builds them.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Union
+import numpy as np
+import structlog
+
+from .embeddings import HASH_DIMENSIONS, HashEmbedding
+from .search_cache import search_rows_condition
+
+logger = structlog.get_logger()
+
+IDF_WEIGHTS_PATH = "data/cache/idf_embedding.npy"
+IDF_FEATURES = 2 ** 18
+
+
+def _meta_path(path: Union[str, Path]) -> Path:
+    return Path(path).with_suffix(".json")
+
+
+class IDFEmbedding(HashEmbedding):
+    """
+    Hashing-trick embedding with learned IDF feature weights.
+
+    Build with ``fit()`` or ``load()``. The signature includes a
+    fingerprint of the weights, so a retrained model gets its own vector
+    table instead of mixing incomparable vectors.
+    """
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        dimensions: int = HASH_DIMENSIONS,
+        char_ngrams: int = 0,
+        recommended_threshold: float = 0.40,
+        fingerprint: Optional[str] = None,
+    ):
+        super().__init__(dimensions=dimensions)
+        self.weights = weights
+        self.char_ngrams = char_ngrams
+        self._buckets = len(weights)
+        self._recommended_threshold = recommended_threshold
+        self.fingerprint = fingerprint or hashlib.sha1(
+            np.ascontiguousarray(weights).tobytes() + f"{dimensions}:{char_ngrams}".encode()
+        ).hexdigest()[:12]
+
+    @property
+    def recommended_threshold(self) -> float:
+        return self._recommended_threshold
+
+    @property
+    def signature(self) -> str:
+        return f"idf-{self._dimensions}-{self.fingerprint}"
+
+    def _tokenize(self, text: str) -> List[str]:
+        """Word uni/bi/trigrams, plus character n-grams of each word when enabled."""
+        tokens = super()._tokenize(text)
+        n = self.char_ngrams
+        if n:
+            grams = []
+            # Words come first in the token list; "#" marks word boundaries
+            for word in tokens:
+                if "_" in word:
+                    break
+                padded = f"#{word}#"
+                grams += [f"~{padded[i:i + n]}" for i in range(len(padded) - n + 1)]
+            tokens += grams
+        return tokens
+
+    def embed_batch(self, texts: List[str]) -> List[bytes]:
+        rows, slots = self._token_slots(texts)
+        buckets = slots >> 1
+        weights = np.asarray(self.weights[buckets], dtype=np.float64) * (1.0 - 2.0 * (slots & 1))
+        return self._scatter(len(texts), rows, buckets % self._dimensions, weights)
+
+    @classmethod
+    def fit(
+        cls,
+        texts: Iterable[str],
+        dimensions: int = HASH_DIMENSIONS,
+        features: int = IDF_FEATURES,
+        char_ngrams: int = 3,
+    ) -> "IDFEmbedding":
+        """
+        Learn smoothed IDF weights, ``log((1 + N) / (1 + df)) + 1``, from ``texts``.
+
+        Buckets never seen get the highest weight, as a feature seen in no
+        document would.
+        """
+        texts = [text for text in dict.fromkeys(t.strip() for t in texts) if text]
+        model = cls(np.ones(features, dtype=np.float32), dimensions=dimensions, char_ngrams=char_ngrams)
+        rows, slots = model._token_slots(texts)
+        # Document frequency counts each bucket once per text
+        present = np.unique(rows * features + (slots >> 1))
+        df = np.bincount(present % features, minlength=features)
+        weights = (np.log((1.0 + len(texts)) / (1.0 + df)) + 1.0).astype(np.float32)
+        logger.info("Fitted IDF embedding", documents=len(texts),
+                    features_seen=int((df > 0).sum()), dimensions=dimensions)
+        return cls(weights, dimensions=dimensions, char_ngrams=char_ngrams)
+
+    def save(self, path: Union[str, Path] = IDF_WEIGHTS_PATH, **meta) -> Path:
+        """Write the weights (``.npy``) and settings (``.json`` sidecar)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(path, np.asarray(self.weights, dtype=np.float32))
+        _meta_path(path).write_text(json.dumps({
+            "dimensions": self._dimensions,
+            "char_ngrams": self.char_ngrams,
+            "recommended_threshold": self._recommended_threshold,
+            "fingerprint": self.fingerprint,
+            "trained_at": time.time(),
+            **meta,
+        }, indent=2))
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path] = IDF_WEIGHTS_PATH, mmap: bool = True) -> "IDFEmbedding":
+        """Load saved weights, memory-mapped by default (pages are shared between workers)."""
+        meta = json.loads(_meta_path(path).read_text())
+        weights = np.load(str(path), mmap_mode="r" if mmap else None)
+        return cls(
+            weights,
+            dimensions=meta["dimensions"],
+            char_ngrams=meta["char_ngrams"],
+            recommended_threshold=meta["recommended_threshold"],
+            fingerprint=meta["fingerprint"],
+        )
+
+
+def load_corpus(
+    research_db_path: Optional[Union[str, Path]] = None,
+    cache_path: Optional[Union[str, Path]] = None,
+) -> List[str]:
+    """Research topics and queries from the history DB, plus cached query texts."""
+    texts: List[str] = []
+    sources = (
+        (research_db_path, ("SELECT topic FROM research", "SELECT query_text FROM queries")),
+        (cache_path, ("SELECT query_text FROM search_cache WHERE {search_rows}",)),
+    )
+    for path, statements in sources:
+        if not path or not Path(path).exists():
+            continue
+        with sqlite3.connect(str(path)) as conn:
+            for statement in statements:
+                try:
+                    statement = statement.format(search_rows=search_rows_condition(conn))
+                    texts += [row[0] for row in conn.execute(statement) if row[0]]
+                except sqlite3.OperationalError as e:
+                    logger.warning("Skipping corpus source", path=str(path), error=str(e))
+        conn.close()
+    return texts
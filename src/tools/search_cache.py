@@ -1,22 +1,62 @@
 """
 SQLite-based search cache with exact-match and semantic vector search.
 
-Uses sqlite-vec for semantic similarity matching on cache miss.
+Uses sqlite-vec for semantic similarity matching on cache miss. Vectors live in
+one vec0 table per embedding signature, partitioned by search depth and
+max_results with expiry as a filter column, so KNN only ranks eligible rows.
 Falls back to exact-match only if sqlite-vec is unavailable.
+With ``vector_quantization`` ("int8" or "binary") the KNN pass runs over
+quantized vectors and its top candidates are re-ranked by exact distance
+to the float32 vectors kept in an auxiliary column.
+Connections are pooled and long-lived (WAL mode), with sqlite-vec loaded
+once per connection. An optional in-process LRU (L1) sits in front of the
+SQLite table (L2) and serves already-parsed responses. Stored payloads are
+compressed (zlib by default) behind a one-byte codec header; plain JSON rows
+written by older versions are still read as-is. Size caps (entries and/or
+payload bytes) are enforced by set-based eviction, optionally from a
+background sweeper, with an optional TinyLFU admission filter on writes.
+Hit counts are buffered in memory and written in batches, so lookups never
+take the write lock. With ``stale_grace_hours`` set, expired rows are kept
+for a grace window and served by ``get_stale()`` (stale-while-revalidate).
+Result document content is stored once in ``search_documents``,
+keyed by canonical URL and content hash, and referenced from each payload.
+Lookup outcomes and latencies are recorded per minute and worker in
+``cache_metrics`` (see ``cache_metrics.py``) for ``get_metrics()``.
+Results of other Tavily methods (URL extraction, search context, QnA) are
+kept in the same table under their own namespace and TTL through
+``get_entry()``/``put_entry()``: exact match only, with the same L1, size
+caps, hit accounting and (per-namespace) metrics as search results.
 """
 
 import hashlib
 import json
 import sqlite3
+import lzma
+import re
 import struct
+import threading
 import time
+import zlib
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Iterable, List, Tuple, Union
 import structlog
 
+from .documents import canonical_url, content_hash, document_key
+from .cache_metrics import (
+    MetricsBuffer, ensure_metrics_table, next_instance, prune_metrics, query_metrics, worker_id,
+    write_metrics,
+)
+from .cache_policy import EVICTION_ORDER, BackgroundSweeper, FrequencySketch, HitBuffer
+from .lru_cache import LRUCache
+from .sqlite_pool import SQLitePool
+
 logger = structlog.get_logger()
 
+# Cached Tavily methods other than search, with their default TTLs in hours.
+# Page content changes slowly; answers and context track search results.
+NAMESPACE_TTL_HOURS = {"extract": 24 * 7, "context": 24, "qna": 12}
+
 
 def _load_vec(conn: sqlite3.Connection) -> bool:
     """Try to load sqlite-vec extension. Returns True on success."""
@@ -24,12 +64,166 @@ def _load_vec(conn: sqlite3.Connection) -> bool:
         import sqlite_vec
         conn.enable_load_extension(True)
         sqlite_vec.load(conn)
+        conn.enable_load_extension(False)
         return True
     except (ImportError, Exception) as e:
         logger.debug("sqlite-vec not available", error=str(e))
         return False
 
 
+# Payload codecs: compressed rows are BLOBs prefixed with one codec byte.
+# Rows stored as TEXT are plain JSON (legacy rows, or payloads below the
+# compression threshold).
+_CODEC_IDS = {"zlib": 1, "lzma": 2}
+_CODEC_NAMES = {v: k for k, v in _CODEC_IDS.items()}
+COMPRESS_MIN_BYTES = 256
+
+
+def _encode_payload(payload: Any, codec: str = "zlib") -> Tuple[Union[str, bytes], int]:
+    """Serialize a payload for storage. Returns (stored_value, raw_size_bytes)."""
+    text = json.dumps(payload)
+    raw = text.encode("utf-8")
+    if codec == "none" or len(raw) < COMPRESS_MIN_BYTES:
+        return text, len(raw)
+    if codec == "zlib":
+        body = zlib.compress(raw, 6)
+    elif codec == "lzma":
+        body = lzma.compress(raw, preset=6)
+    else:
+        raise ValueError(f"Unknown cache codec: {codec}")
+    return bytes([_CODEC_IDS[codec]]) + body, len(raw)
+
+
+def _decode_payload(stored: Union[str, bytes]) -> Any:
+    """Inverse of _encode_payload; also accepts legacy plain-JSON rows."""
+    if isinstance(stored, str):
+        return json.loads(stored)
+    codec = _CODEC_NAMES.get(stored[0])
+    if codec == "zlib":
+        return json.loads(zlib.decompress(stored[1:]))
+    if codec == "lzma":
+        return json.loads(lzma.decompress(stored[1:]))
+    raise ValueError(f"Unknown cache codec byte: {stored[0]}")
+
+
+def _stored_size(stored: Union[str, bytes]) -> int:
+    return len(stored.encode("utf-8")) if isinstance(stored, str) else len(stored)
+
+
+# Bytes an entry accounts for: its payload plus the documents it references
+# (shared documents are counted once per referencing entry, so byte caps err
+# on the side of evicting more).
+_ENTRY_BYTES = "(length(CAST(response_json AS BLOB)) + COALESCE(doc_bytes, 0))"
+
+
+def _split_documents(response: Any) -> Tuple[Any, Dict[str, Dict[str, Any]]]:
+    """
+    Move each result's content out of a Tavily response.
+
+    Returns (payload, documents): in the payload every result with a URL and
+    string content keeps its other fields (title included, since the same
+    page can carry different titles) plus a ``doc`` reference; ``documents``
+    maps those references to their canonical URL, content hash and content.
+    """
+    if not isinstance(response, dict) or not isinstance(response.get("results"), list):
+        return response, {}
+    documents: Dict[str, Dict[str, Any]] = {}
+    results = []
+    for result in response["results"]:
+        if (not isinstance(result, dict) or "doc" in result
+                or not result.get("url") or not isinstance(result.get("content"), str)):
+            results.append(result)
+            continue
+        key = document_key(result["url"], result["content"])
+        documents[key] = {
+            "canonical_url": canonical_url(result["url"]),
+            "content_hash": content_hash(result["content"]),
+            "content": result["content"],
+        }
+        slim = {k: v for k, v in result.items() if k != "content"}
+        slim["doc"] = key
+        results.append(slim)
+    return dict(response, results=results), documents
+
+
+def _vec_rowid(cache_key: str) -> int:
+    """Deterministic vec0 rowid for a cache key (60 bits of its SHA-256 hex)."""
+    return int(cache_key[:15], 16)
+
+
+# Vector quantization: vec0 column type of the KNN embedding, and the SQL
+# expression turning a float32 blob parameter into it. Quantized tables keep
+# the float32 vector in an auxiliary column for exact re-ranking.
+_VEC_FORMATS = {
+    "none": ("float", "?"),
+    "int8": ("int8", "vec_quantize_int8(?, 'unit')"),
+    "binary": ("bit", "vec_quantize_binary(?)"),
+}
+
+
+def _vec_table_name(signature: str, quantization: str = "none") -> str:
+    """vec0 table name for an embedding provider signature (and quantization)."""
+    name = "search_vec_" + re.sub(r"[^0-9a-z]+", "_", signature.lower()).strip("_")
+    return name if quantization == "none" else f"{name}_{quantization}"
+
+
+def _create_vec_table(
+    conn: sqlite3.Connection, table: str, dims: int, quantization: str = "none"
+) -> None:
+    """Create a per-signature vec0 table (sqlite-vec must be loaded on ``conn``)."""
+    column_type = _VEC_FORMATS[quantization][0]
+    full = ",\n            +full_embedding blob" if quantization != "none" else ""
+    # Partition keys + expiry metadata let KNN skip ineligible rows;
+    # auxiliary columns avoid a join back to search_cache per candidate.
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {table}
+        USING vec0(
+            search_depth text partition key,
+            max_results integer partition key,
+            embedding {column_type}[{int(dims)}],
+            expires_at float,
+            +cache_key text,
+            +query_text text{full}
+        )
+    """)
+
+
+def _insert_vectors(
+    conn: sqlite3.Connection, table: str, quantization: str, rows: List[tuple]
+) -> None:
+    """
+    Insert ``(rowid, search_depth, max_results, embedding, expires_at, cache_key,
+    query_text)`` rows with float32 embeddings, quantizing them for the table.
+    """
+    if quantization == "none":
+        conn.executemany(f"""
+            INSERT INTO {table}
+                (rowid, search_depth, max_results, embedding, expires_at, cache_key, query_text)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        return
+    match = _VEC_FORMATS[quantization][1]
+    conn.executemany(f"""
+        INSERT INTO {table}
+            (rowid, search_depth, max_results, embedding, expires_at, cache_key, query_text,
+             full_embedding)
+        VALUES (?, ?, ?, {match}, ?, ?, ?, ?)
+    """, [(*row, row[3]) for row in rows])
+
+
+def search_rows_condition(conn: sqlite3.Connection) -> str:
+    """SQL condition selecting web search rows of ``search_cache`` (all rows in pre-namespace files)."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(search_cache)")}
+    return "namespace = 'search'" if "namespace" in columns else "1"
+
+
+def _ensure_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> None:
+    """Add a column to an existing table if it is missing (lightweight migration)."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in existing:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
 class SearchCache:
     """
     SQLite-based cache for web search results.
@@ -38,6 +232,31 @@ class SearchCache:
     - Exact-match caching keyed on query text + search parameters
     - Semantic vector search for similar queries (via sqlite-vec)
     - Automatic fallback to exact-match if sqlite-vec unavailable
+    - Pooled long-lived connections (WAL, synchronous=NORMAL, busy timeout)
+    - Optional bounded in-memory L1 tier (``l1_size`` > 0) in front of SQLite
+    - Transparent payload compression (``compression``: "zlib", "lzma" or "none")
+    - Size caps (``max_entries`` / ``max_bytes`` of stored payload) with
+      "lru", "lfu" (by hit_count) or "ttl" (soonest-expiring first) eviction
+    - Optional TinyLFU admission (``admission="tinylfu"``): when the cache is
+      full, a new entry is only stored if it has been looked up at least as
+      often recently as the entry it would displace
+    - Optional background sweeper (``sweep_interval_seconds``) running
+      expiry, eviction and incremental vacuum; without one, size caps are
+      enforced after each write
+    - Write-behind hit accounting: hit_count/last_accessed updates are
+      buffered and flushed every ``hit_flush_every`` hits or
+      ``hit_flush_interval_seconds``, whichever comes first
+    - Embeddings computed for a lookup are memoized briefly
+      (``embedding_memo_size`` / ``embedding_memo_ttl_seconds``) so the
+      ``put()`` that follows a miss does not embed the same query again
+    - Optional stale-while-revalidate window (``stale_grace_hours``): expired
+      rows survive that long and are available through ``get_stale()``
+    - Content-addressed result documents (``dedupe_documents``): a page seen
+      by many queries is stored once, and decoded documents are shared in
+      memory through a small LRU (``document_cache_size``)
+    - Namespaced entries for other Tavily methods (``get_entry``/``put_entry``),
+      with per-namespace TTLs (``NAMESPACE_TTL_HOURS``, overridden by
+      ``namespace_ttl_hours``)
     """
 
     def __init__(
@@ -46,10 +265,51 @@ class SearchCache:
         ttl_hours: int = 24,
         similarity_threshold: float = None,
         embedding_provider=None,
+        pool_size: int = 4,
+        busy_timeout_ms: int = 5000,
+        l1_size: int = 0,
+        l1_ttl_seconds: float = 300,
+        compression: str = "zlib",
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        eviction_policy: str = "lru",
+        admission: Optional[str] = None,
+        sweep_interval_seconds: Optional[float] = None,
+        hit_flush_every: int = 100,
+        hit_flush_interval_seconds: float = 5.0,
+        embedding_memo_size: int = 256,
+        embedding_memo_ttl_seconds: float = 300,
+        stale_grace_hours: float = 0,
+        dedupe_documents: bool = True,
+        document_cache_size: int = 512,
+        vector_quantization: str = "none",
+        rerank_candidates: int = 10,
+        record_metrics: bool = True,
+        metrics_retention_days: float = 14,
+        namespace_ttl_hours: Optional[Dict[str, float]] = None,
     ):
         self.cache_path = Path(cache_path)
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
         self.ttl_hours = ttl_hours
+        self.namespace_ttl_hours = {**NAMESPACE_TTL_HOURS, **(namespace_ttl_hours or {})}
+        self.stale_grace_hours = stale_grace_hours
+        self.dedupe_documents = dedupe_documents
+        if compression not in ("none", *_CODEC_IDS):
+            raise ValueError(f"Unknown cache codec: {compression}")
+        self.compression = compression
+        if eviction_policy not in EVICTION_ORDER:
+            raise ValueError(f"Unknown eviction policy: {eviction_policy}")
+        if admission not in (None, "tinylfu"):
+            raise ValueError(f"Unknown admission policy: {admission}")
+        if vector_quantization not in _VEC_FORMATS:
+            raise ValueError(f"Unknown vector quantization: {vector_quantization}")
+        self.vector_quantization = vector_quantization
+        self.rerank_candidates = rerank_candidates
+        self.metrics_retention_days = metrics_retention_days
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.eviction_policy = eviction_policy
+        self.admission = admission
         self.embedding_provider = embedding_provider
         # Use provider's recommended threshold unless explicitly set
         if similarity_threshold is None and embedding_provider:
@@ -62,14 +322,78 @@ class SearchCache:
         self._hits = 0
         self._misses = 0
         self._semantic_hits = 0
+        self._l1_hits = 0
+        self._l1_misses = 0
+        self._l2_hits = 0
+        self._l2_misses = 0
+        self._stale_hits = 0
+        self._evictions = 0
+        self._admission_rejects = 0
+        # Other namespaces: {namespace: {"hits": n, "misses": n}}
+        self._namespace_stats: Dict[str, Dict[str, int]] = {}
+
+        # Per-minute outcome counts and latency histograms per namespace, written with the hit counts
+        self._record_metrics = record_metrics
+        self._metrics: Dict[str, MetricsBuffer] = {}
+        self._metrics_lock = threading.Lock()
+        # Own rows per instance: a service runs several caches per process on one file
+        self._metrics_instance = next_instance()
+
+        # doc_key -> decoded {"content"}, shared by every response using it
+        self._documents = LRUCache(document_cache_size)
+
+        # Query text -> embedding from recent lookups, consumed by the store after a miss
+        self._embedding_memo = LRUCache(embedding_memo_size, ttl_seconds=embedding_memo_ttl_seconds)
+
+        # Write-behind hit counts; the flusher thread starts on the first hit
+        self._hit_buffer = HitBuffer(flush_every=hit_flush_every)
+        self._hit_flush_interval = hit_flush_interval_seconds
+        self._hit_flusher: Optional[BackgroundSweeper] = None
+        self._hit_flusher_lock = threading.Lock()
+
+        # TinyLFU frequency sketch, sized to the entry cap when there is one
+        self._sketch = (
+            FrequencySketch(width=max(max_entries or 0, 1024)) if admission == "tinylfu" else None
+        )
+
+        # L1: parsed responses keyed by _make_key; entries never outlive the L2 row
+        self._l1 = LRUCache(l1_size, ttl_seconds=l1_ttl_seconds) if l1_size > 0 else None
 
         # Check if sqlite-vec is available
         self._vec_available = False
+        self._vec_loaded = False
+        self._vec_table = (
+            _vec_table_name(embedding_provider.signature, vector_quantization)
+            if embedding_provider else None
+        )
+        self._pool = SQLitePool(
+            str(self.cache_path),
+            size=pool_size,
+            busy_timeout_ms=busy_timeout_ms,
+            on_connect=self._on_connect,
+        )
         self._init_db()
 
+        self._sweeper = (
+            BackgroundSweeper(self.sweep, sweep_interval_seconds, name="search-cache-sweeper")
+            if sweep_interval_seconds else None
+        )
+
+    def _on_connect(self, conn: sqlite3.Connection) -> None:
+        """Per-connection setup: load sqlite-vec once if semantic search may be used."""
+        if self.embedding_provider:
+            self._vec_loaded = _load_vec(conn)
+
     def _init_db(self) -> None:
         """Create cache tables (exact + vector)."""
         with self._connect() as conn:
+            # Incremental auto-vacuum lets the sweeper hand freed pages back to
+            # the filesystem. It can only be switched on before the first table
+            # exists (or by a full VACUUM, e.g. from recompress()).
+            if not conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+
             # Exact-match table (unchanged from Phase 1)
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS search_cache (
@@ -86,31 +410,41 @@ class SearchCache:
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_expires_at ON search_cache(expires_at)
             """)
+            # Uncompressed payload size, for compression-ratio stats (NULL on legacy rows)
+            _ensure_column(conn, "search_cache", "raw_size", "INTEGER")
+            # Last hit time for LRU eviction (NULL until first hit; falls back to created_at)
+            _ensure_column(conn, "search_cache", "last_accessed", "REAL")
+            # Referenced documents (JSON array of doc keys) and their stored size
+            _ensure_column(conn, "search_cache", "doc_keys", "TEXT")
+            _ensure_column(conn, "search_cache", "doc_bytes", "INTEGER")
+            # "search", or the Tavily method of a get_entry()/put_entry() row
+            _ensure_column(conn, "search_cache", "namespace", "TEXT NOT NULL DEFAULT 'search'")
+
+            # Content-addressed result documents (body: encoded {"content"})
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_documents (
+                    doc_key       TEXT PRIMARY KEY,
+                    canonical_url TEXT NOT NULL,
+                    content_hash  TEXT NOT NULL,
+                    body          NOT NULL,
+                    raw_size      INTEGER,
+                    created_at    REAL NOT NULL
+                )
+            """)
+            ensure_metrics_table(conn)
             
             # Try to set up vector table
-            if _load_vec(conn) and self.embedding_provider:
+            legacy = False
+            if self._vec_loaded and self.embedding_provider:
                 try:
+                    legacy = self._drop_legacy_vec_tables(conn)
                     dims = self.embedding_provider.dimensions
-                    conn.execute(f"""
-                        CREATE VIRTUAL TABLE IF NOT EXISTS search_vec
-                        USING vec0(embedding float[{dims}])
-                    """)
-                    # Metadata table linking vec rowid to cache_key
-                    conn.execute("""
-                        CREATE TABLE IF NOT EXISTS search_vec_meta (
-                            rowid       INTEGER PRIMARY KEY,
-                            cache_key   TEXT NOT NULL,
-                            query_text  TEXT NOT NULL,
-                            search_depth TEXT NOT NULL,
-                            max_results INTEGER NOT NULL,
-                            created_at  REAL NOT NULL,
-                            expires_at  REAL NOT NULL,
-                            FOREIGN KEY (cache_key) REFERENCES search_cache(cache_key)
-                        )
-                    """)
+                    _create_vec_table(conn, self._vec_table, dims, self.vector_quantization)
                     self._vec_available = True
                     self.logger.info("Semantic search cache enabled",
+                                   table=self._vec_table,
                                    dimensions=dims,
+                                   quantization=self.vector_quantization,
                                    threshold=self.similarity_threshold)
                 except Exception as e:
                     self.logger.warning("Failed to create vector table", error=str(e))
@@ -118,8 +452,174 @@ class SearchCache:
             else:
                 self.logger.info("Semantic search cache disabled (no embedding provider or sqlite-vec)")
 
-    def _connect(self) -> sqlite3.Connection:
-        return sqlite3.connect(str(self.cache_path))
+        if legacy and self._vec_available:
+            self.rebuild_vectors()
+
+    @staticmethod
+    def _drop_legacy_vec_tables(conn: sqlite3.Connection) -> bool:
+        """Drop the pre-partitioning search_vec/search_vec_meta pair. Returns True if found."""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'search_vec_meta'"
+        ).fetchone()
+        if not exists:
+            return False
+        conn.execute("DROP TABLE IF EXISTS search_vec")
+        conn.execute("DROP TABLE search_vec_meta")
+        logger.info("Dropped legacy vector tables; vectors will be rebuilt")
+        return True
+
+    @staticmethod
+    def _vec_tables(conn: sqlite3.Connection) -> List[str]:
+        """All per-signature vec0 tables in this cache file."""
+        return [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name LIKE 'search_vec_%' AND sql LIKE 'CREATE VIRTUAL TABLE%'"
+        )]
+
+    def rebuild_vectors(self) -> int:
+        """
+        Embed every live cache entry that has no vector in this provider's table.
+
+        Used after a schema migration, and whenever the vector table was
+        created after the entries it should index.
+        """
+        if not self._vec_available:
+            return 0
+        now = time.time()
+        with self._connect() as conn:
+            indexed = {row[0] for row in conn.execute(f"SELECT rowid FROM {self._vec_table}")}
+            rows = [
+                row for row in conn.execute(
+                    "SELECT cache_key, query_text, search_depth, max_results, created_at, expires_at "
+                    "FROM search_cache WHERE expires_at > ? AND namespace = 'search'", (now,)
+                )
+                if _vec_rowid(row[0]) not in indexed
+            ]
+        if not rows:
+            return 0
+
+        embeddings = self._embed_many([row[1] for row in rows])
+        stored = 0
+        with self._connect() as conn:
+            for (key, query, depth, max_results, created_at, expires_at), embedding in zip(rows, embeddings):
+                if embedding is not None:
+                    self._store_vector(conn, key, query, embedding, depth, max_results, created_at, expires_at)
+                    stored += 1
+        self.logger.info("Rebuilt vector index", table=self._vec_table, vectors=stored)
+        return stored
+
+    def _connect(self):
+        """Check out a pooled connection (commits on exit, then returns it to the pool)."""
+        return self._pool.connection()
+
+    def close(self) -> None:
+        """Flush buffered hits and metrics, stop background threads and close pooled connections."""
+        with self._hit_flusher_lock:
+            flusher, self._hit_flusher = self._hit_flusher, None
+        if flusher is not None:
+            flusher.stop()
+        self._flush_buffers()
+        if self._sweeper is not None:
+            self._sweeper.stop()
+            self._sweeper = None
+        self._pool.close()
+
+    def _record_hit(self, key: str) -> None:
+        """Buffer one hit for ``key``; wake the flusher when the batch is full."""
+        flush_due = self._hit_buffer.record(key, time.time())
+        if self._hit_buffer.flush_every <= 1:
+            self.flush_hits()
+            return
+        flusher = self._flusher()
+        if flush_due:
+            flusher.trigger()
+
+    def _record_metric(
+        self, event: str, started: Optional[float] = None, count: int = 1, share: int = 1,
+        namespace: str = "search",
+    ) -> None:
+        """
+        Buffer ``count`` lookup outcomes. With ``started`` (a ``perf_counter``
+        value) each gets a latency sample of the elapsed time over ``share``.
+        """
+        if not self._record_metrics or count <= 0:
+            return
+        latency_ms = (time.perf_counter() - started) * 1000 / share if started is not None else None
+        with self._metrics_lock:
+            buffer = self._metrics.get(namespace)
+            if buffer is None:
+                buffer = self._metrics[namespace] = MetricsBuffer()
+        buffer.record(event, time.time(), latency_ms, count)
+        self._flusher()
+
+    def _flusher(self) -> BackgroundSweeper:
+        """The background thread writing buffered hits and metrics, started on first use."""
+        with self._hit_flusher_lock:
+            if self._hit_flusher is None:
+                self._hit_flusher = BackgroundSweeper(
+                    self._flush_buffers, self._hit_flush_interval, name="search-cache-hit-flush"
+                )
+            return self._hit_flusher
+
+    def _flush_buffers(self) -> None:
+        self.flush_hits()
+        self.flush_metrics()
+
+    def flush_metrics(self) -> int:
+        """Merge buffered per-minute metrics into ``cache_metrics``. Returns minutes written."""
+        with self._metrics_lock:
+            buffers = list(self._metrics.items())
+        pending = {namespace: buffer.drain() for namespace, buffer in buffers}
+        pending = {namespace: minutes for namespace, minutes in pending.items() if minutes}
+        if not pending:
+            return 0
+        try:
+            with self._connect() as conn:
+                for namespace, minutes in pending.items():
+                    write_metrics(conn, worker_id(self._metrics_instance), minutes, namespace)
+        except sqlite3.Error as e:
+            for namespace, minutes in pending.items():
+                self._metrics[namespace].requeue(minutes)
+            self.logger.warning("Failed to flush cache metrics", error=str(e))
+            return 0
+        return sum(len(minutes) for minutes in pending.values())
+
+    def get_metrics(
+        self, since_hours: float = 24, bucket_minutes: int = 60, namespace: str = "search"
+    ) -> List[Dict[str, Any]]:
+        """
+        Hit ratio and p50/p95 lookup latency over time, across all workers.
+
+        Flushes this worker's buffer first. Returns one dict per
+        ``bucket_minutes`` interval with data (see ``query_metrics()``),
+        for search results or another ``namespace``.
+        """
+        self.flush_metrics()
+        now = time.time()
+        with self._connect() as conn:
+            return query_metrics(conn, now - since_hours * 3600, now, bucket_minutes, namespace)
+
+    def flush_hits(self) -> int:
+        """
+        Write buffered hit counts in one transaction. Returns hits written.
+
+        On failure the counts are put back and retried on the next flush.
+        """
+        pending = self._hit_buffer.drain()
+        if not pending:
+            return 0
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "UPDATE search_cache SET hit_count = hit_count + ?, "
+                    "last_accessed = MAX(COALESCE(last_accessed, 0), ?) WHERE cache_key = ?",
+                    [(hits, last_hit, key) for key, (hits, last_hit) in sorted(pending.items())],
+                )
+        except sqlite3.Error as e:
+            self._hit_buffer.requeue(pending)
+            self.logger.warning("Failed to flush cache hit counts", error=str(e))
+            return 0
+        return sum(hits for hits, _ in pending.values())
 
     @staticmethod
     def _make_key(query: str, search_depth: str, max_results: int) -> str:
@@ -136,28 +636,57 @@ class SearchCache:
         1. Try exact match first
         2. On miss, try semantic vector search (if available)
         3. Return None if no match found
+
+        With an L1 tier, hits are served from memory first; L2 hits are
+        promoted into L1 under the looked-up key.
         """
+        started = time.perf_counter()
+        key = self._make_key(query, search_depth, max_results)
+        if self._sketch is not None:
+            self._sketch.increment(key)
+
+        # Phase 0: In-process L1
+        if self._l1 is not None:
+            result = self._l1.get(key)
+            if result is not None:
+                self._l1_hits += 1
+                self._hits += 1
+                self._record_hit(key)
+                self._record_metric("hits", started)
+                return result
+            self._l1_misses += 1
+
         # Phase 1: Exact match
-        result = self._get_exact(query, search_depth, max_results)
-        if result is not None:
+        found = self._get_exact(key, query)
+        if found is not None:
             self._hits += 1
-            return result
+            self._record_metric("hits", started)
+            return self._promote(key, *found)
         
         # Phase 2: Semantic match
         if self._vec_available and self.embedding_provider:
-            result = self._get_semantic(query, search_depth, max_results)
-            if result is not None:
+            found = self._get_semantic(query, search_depth, max_results)
+            if found is not None:
                 self._semantic_hits += 1
-                return result
+                self._record_metric("semantic_hits", started)
+                return self._promote(key, *found)
         
+        self._l2_misses += 1
         self._misses += 1
+        self._record_metric("misses", started)
         return None
 
+    def _promote(self, key: str, response: Dict[str, Any], expires_at: float) -> Dict[str, Any]:
+        """Record an L2 hit and copy the parsed response into L1."""
+        self._l2_hits += 1
+        if self._l1 is not None:
+            self._l1.put(key, response, expires_at=expires_at)
+        return response
+
     def _get_exact(
-        self, query: str, search_depth: str, max_results: int
-    ) -> Optional[Dict[str, Any]]:
-        """Exact-match cache lookup."""
-        key = self._make_key(query, search_depth, max_results)
+        self, key: str, query: str
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Exact-match cache lookup. Returns (response, expires_at) on hit."""
         now = time.time()
 
         with self._connect() as conn:
@@ -168,91 +697,214 @@ class SearchCache:
 
             if row is None:
                 return None
-
             response_json, expires_at = row
 
+            # Expired rows are left for clear_expired()/sweep() so lookups stay read-only
             if now > expires_at:
-                conn.execute("DELETE FROM search_cache WHERE cache_key = ?", (key,))
                 self.logger.debug("Cache expired", query=query)
                 return None
+            response = self._hydrate(conn, [_decode_payload(response_json)])[0]
 
+        self._record_hit(key)
+        self.logger.info("Cache hit (exact)", query=query)
+        return response, expires_at
+
+    def get_stale(
+        self, query: str, search_depth: str = "basic", max_results: int = 5
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return an expired entry that is still inside the stale grace window.
+
+        Exact match only; meant for callers that already missed with
+        ``get()`` and will refresh the entry in the background.
+        """
+        if self.stale_grace_hours <= 0:
+            return None
+        key = self._make_key(query, search_depth, max_results)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response_json FROM search_cache "
+                "WHERE cache_key = ? AND expires_at <= ? AND expires_at + ? > ?",
+                (key, now, self.stale_grace_hours * 3600, now),
+            ).fetchone()
+            if row is None:
+                return None
+            response = self._hydrate(conn, [_decode_payload(row[0])])[0]
+        self._stale_hits += 1
+        self._record_hit(key)
+        self._record_metric("stale_hits")
+        self.logger.info("Cache hit (stale)", query=query)
+        return response
+
+    @staticmethod
+    def _entry_key(namespace: str, key_text: str, search_depth: str, max_results: int) -> str:
+        raw = f"{namespace}|{key_text.strip()}|{search_depth}|{max_results}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _namespace_ttl(self, namespace: str) -> float:
+        if namespace not in self.namespace_ttl_hours:
+            raise ValueError(f"Unknown cache namespace: {namespace}")
+        return self.namespace_ttl_hours[namespace]
+
+    def get_entry(
+        self, namespace: str, key_text: str, search_depth: str = "", max_results: int = 0
+    ) -> Optional[Any]:
+        """
+        Look up a cached result of another Tavily method.
+
+        ``key_text`` is used as given (callers normalize it: the canonical
+        URL for "extract", the lowercased query otherwise). Exact match
+        only, through L1 then L2, with hits and latencies recorded under
+        ``namespace``.
+        """
+        self._namespace_ttl(namespace)
+        started = time.perf_counter()
+        key = self._entry_key(namespace, key_text, search_depth, max_results)
+        stats = self._namespace_stats.setdefault(namespace, {"hits": 0, "misses": 0})
+        if self._sketch is not None:
+            self._sketch.increment(key)
+
+        if self._l1 is not None:
+            result = self._l1.get(key)
+            if result is not None:
+                self._l1_hits += 1
+                stats["hits"] += 1
+                self._record_hit(key)
+                self._record_metric("hits", started, namespace=namespace)
+                return result
+            self._l1_misses += 1
+
+        found = self._get_exact(key, key_text)
+        if found is not None:
+            stats["hits"] += 1
+            self._record_metric("hits", started, namespace=namespace)
+            return self._promote(key, *found)
+
+        self._l2_misses += 1
+        stats["misses"] += 1
+        self._record_metric("misses", started, namespace=namespace)
+        return None
+
+    def put_entry(
+        self, namespace: str, key_text: str, payload: Any, search_depth: str = "", max_results: int = 0
+    ) -> None:
+        """Store a result of another Tavily method under ``namespace``'s TTL (see ``get_entry``)."""
+        now = time.time()
+        expires = now + self._namespace_ttl(namespace) * 3600
+        key = self._entry_key(namespace, key_text, search_depth, max_results)
+        stored, raw_size = _encode_payload(payload, self.compression)
+        row = (key, key_text.strip(), search_depth, max_results, stored, now, expires, raw_size)
+
+        with self._connect() as conn:
+            if not self._admit(conn, [row]):
+                self._admission_rejects += 1
+                return
             conn.execute(
-                "UPDATE search_cache SET hit_count = hit_count + 1 WHERE cache_key = ?",
-                (key,),
+                """
+                INSERT OR REPLACE INTO search_cache
+                    (cache_key, query_text, search_depth, max_results,
+                     response_json, created_at, expires_at, hit_count, raw_size, last_accessed,
+                     namespace)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?)
+                """,
+                (*row, now, namespace),
             )
-            self.logger.info("Cache hit (exact)", query=query)
-            return json.loads(response_json)
+
+        if self._l1 is not None:
+            self._l1.put(key, payload, expires_at=expires)
+        self.logger.debug("Cached entry", namespace=namespace, key=key_text)
+
+        if self._sweeper is None:
+            self.evict()
 
     def _get_semantic(
         self, query: str, search_depth: str, max_results: int
-    ) -> Optional[Dict[str, Any]]:
-        """Semantic vector similarity search."""
-        now = time.time()
-        
-        try:
-            query_embedding = self.embedding_provider.embed(query)
-        except Exception as e:
-            self.logger.warning("Failed to generate query embedding", error=str(e))
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Semantic vector similarity search. Returns (response, expires_at) on hit."""
+        query_embedding = self._embed_many([query], remember=True)[0]
+        if query_embedding is None:
             return None
 
         with self._connect() as conn:
-            if not _load_vec(conn):
-                return None
+            return self._semantic_lookup(conn, query, query_embedding, search_depth, max_results)
+
+    def _semantic_lookup(
+        self,
+        conn: sqlite3.Connection,
+        query: str,
+        query_embedding: bytes,
+        search_depth: str,
+        max_results: int,
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Nearest-neighbour lookup on an open connection. Returns (response, expires_at) on hit."""
+        now = time.time()
+        try:
+            # Find nearest vector within threshold
+            # sqlite-vec returns L2 distance; convert threshold to max distance
+            # For normalized vectors: L2_distance = sqrt(2 * (1 - cosine_similarity))
+            max_distance = (2.0 * (1.0 - self.similarity_threshold)) ** 0.5
             
-            try:
-                # Find nearest vector within threshold
-                # sqlite-vec returns L2 distance; convert threshold to max distance
-                # For normalized vectors: L2_distance = sqrt(2 * (1 - cosine_similarity))
-                max_distance = (2.0 * (1.0 - self.similarity_threshold)) ** 0.5
-                
-                rows = conn.execute("""
-                    SELECT v.rowid, v.distance, m.cache_key, m.query_text, m.expires_at
-                    FROM search_vec v
-                    JOIN search_vec_meta m ON v.rowid = m.rowid
-                    WHERE v.embedding MATCH ?
+            # Depth/max_results partitions and the expiry filter are applied
+            # inside the KNN scan, so every returned row is eligible.
+            if self.vector_quantization == "none":
+                rows = conn.execute(f"""
+                    SELECT distance, cache_key, query_text
+                    FROM {self._vec_table}
+                    WHERE embedding MATCH ?
                       AND k = 3
-                    ORDER BY v.distance
-                """, (query_embedding,)).fetchall()
-                
-                for rowid, distance, cache_key, cached_query, expires_at in rows:
-                    # Skip expired
-                    if now > expires_at:
-                        continue
-                    
-                    # Skip if too far
-                    if distance > max_distance:
-                        continue
-                    
-                    # Check that search params match (depth + max_results)
-                    cached_row = conn.execute(
-                        "SELECT response_json, search_depth, max_results FROM search_cache WHERE cache_key = ?",
-                        (cache_key,),
-                    ).fetchone()
-                    
-                    if cached_row is None:
-                        continue
-                    
-                    response_json, cached_depth, cached_max = cached_row
-                    
-                    # Depth and max_results must match
-                    if cached_depth != search_depth or cached_max != max_results:
-                        continue
-                    
-                    # Semantic hit!
-                    cosine_sim = 1.0 - (distance ** 2) / 2.0
-                    conn.execute(
-                        "UPDATE search_cache SET hit_count = hit_count + 1 WHERE cache_key = ?",
-                        (cache_key,),
-                    )
-                    self.logger.info("Cache hit (semantic)",
-                                   query=query,
-                                   matched_query=cached_query,
-                                   similarity=round(cosine_sim, 3),
-                                   distance=round(distance, 4))
-                    return json.loads(response_json)
+                      AND search_depth = ?
+                      AND max_results = ?
+                      AND expires_at > ?
+                    ORDER BY distance
+                """, (query_embedding, search_depth, max_results, now)).fetchall()
+            else:
+                # KNN over quantized vectors picks candidates; exact float32
+                # distances re-rank them and are what the threshold applies to
+                match = _VEC_FORMATS[self.vector_quantization][1]
+                rows = sorted(conn.execute(f"""
+                    SELECT vec_distance_l2(full_embedding, ?), cache_key, query_text
+                    FROM {self._vec_table}
+                    WHERE embedding MATCH {match}
+                      AND k = ?
+                      AND search_depth = ?
+                      AND max_results = ?
+                      AND expires_at > ?
+                """, (query_embedding, query_embedding, max(self.rerank_candidates, 3),
+                      search_depth, max_results, now)).fetchall())[:3]
+            
+            candidates = [row for row in rows if row[0] <= max_distance]
+            if not candidates:
+                return None
+            
+            # One fetch for all candidates instead of a query per candidate
+            keys = [row[1] for row in candidates]
+            cached = {
+                cache_key: (response_json, expires_at)
+                for cache_key, response_json, expires_at in conn.execute(
+                    f"SELECT cache_key, response_json, expires_at FROM search_cache "
+                    f"WHERE cache_key IN ({','.join('?' * len(keys))}) AND expires_at > ?",
+                    (*keys, now),
+                )
+            }
+            
+            for distance, cache_key, cached_query in candidates:
+                if cache_key not in cached:
+                    continue
+                response_json, expires_at = cached[cache_key]
                 
-            except Exception as e:
-                self.logger.warning("Semantic search failed", error=str(e))
+                # Semantic hit!
+                cosine_sim = 1.0 - (distance ** 2) / 2.0
+                self._record_hit(cache_key)
+                self.logger.info("Cache hit (semantic)",
+                               query=query,
+                               matched_query=cached_query,
+                               similarity=round(cosine_sim, 3),
+                               distance=round(distance, 4))
+                return self._hydrate(conn, [_decode_payload(response_json)])[0], expires_at
+            
+        except Exception as e:
+            self.logger.warning("Semantic search failed", error=str(e))
         
         return None
 
@@ -264,93 +916,564 @@ class SearchCache:
         response: Dict[str, Any],
     ) -> None:
         """Store a search response in the cache (exact + vector)."""
-        key = self._make_key(query, search_depth, max_results)
+        self.put_many([(query, response)], search_depth, max_results)
+
+    def get_many(
+        self, queries: List[str], search_depth: str = "basic", max_results: int = 5
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Look up several queries at once. Returns responses aligned with ``queries``.
+
+        Same tiers as ``get()``, batched: L1 per key, one ``IN (...)`` query
+        for all exact keys, one embedding batch for the remaining misses and
+        a single transaction for their vector searches. Metrics get each
+        query's share of the batch latency.
+        """
+        started = time.perf_counter()
+        keys = [self._make_key(q, search_depth, max_results) for q in queries]
+        if self._sketch is not None:
+            for key in keys:
+                self._sketch.increment(key)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+
+        pending = []
+        for i, key in enumerate(keys):
+            if self._l1 is not None:
+                cached = self._l1.get(key)
+                if cached is not None:
+                    self._l1_hits += 1
+                    self._hits += 1
+                    self._record_hit(key)
+                    results[i] = cached
+                    continue
+                self._l1_misses += 1
+            pending.append(i)
+        if not pending:
+            self._record_metric("hits", started, len(queries), share=len(queries))
+            return results
+
+        # Phase 1: all exact keys in one query
+        now = time.time()
+        unique_keys = sorted({keys[i] for i in pending})
+        placeholders = ",".join("?" * len(unique_keys))
+        with self._connect() as conn:
+            found = {
+                cache_key: (stored, expires_at)
+                for cache_key, stored, expires_at in conn.execute(
+                    f"SELECT cache_key, response_json, expires_at FROM search_cache "
+                    f"WHERE cache_key IN ({placeholders})",
+                    unique_keys,
+                )
+                if expires_at >= now
+            }
+            found_keys = list(found)
+            decoded = dict(zip(found_keys, self._hydrate(
+                conn, [_decode_payload(found[key][0]) for key in found_keys]
+            )))
+        for key in found:
+            self._record_hit(key)
+
+        misses = []
+        for i in pending:
+            if keys[i] in decoded:
+                self._hits += 1
+                results[i] = self._promote(keys[i], decoded[keys[i]], found[keys[i]][1])
+            else:
+                misses.append(i)
+        if found:
+            self.logger.info("Cache hits (exact, batched)", hits=len(pending) - len(misses))
+
+        # Phase 2: embed all misses together, search them in one transaction
+        semantic_hits = 0
+        if misses and self._vec_available and self.embedding_provider:
+            embeddings = self._embed_many([queries[i] for i in misses], remember=True)
+            still_missing = []
+            with self._connect() as conn:
+                conn.execute("BEGIN")
+                for i, embedding in zip(misses, embeddings):
+                    hit = None
+                    if embedding is not None:
+                        hit = self._semantic_lookup(conn, queries[i], embedding, search_depth, max_results)
+                    if hit is not None:
+                        self._semantic_hits += 1
+                        semantic_hits += 1
+                        results[i] = self._promote(keys[i], *hit)
+                    else:
+                        still_missing.append(i)
+            misses = still_missing
+
+        self._l2_misses += len(misses)
+        self._misses += len(misses)
+        for event, count in (("hits", len(queries) - semantic_hits - len(misses)),
+                             ("semantic_hits", semantic_hits), ("misses", len(misses))):
+            self._record_metric(event, started, count, share=len(queries))
+        return results
+
+    def put_many(
+        self,
+        entries: Iterable[Tuple[str, Dict[str, Any]]],
+        search_depth: str,
+        max_results: int,
+    ) -> None:
+        """Store several (query, response) pairs in one transaction, embedding them as a batch."""
+        entries = list(entries)
+        if not entries:
+            return
         now = time.time()
         expires = now + self.ttl_hours * 3600
 
+        rows = []
+        row_documents: List[Dict[str, Dict[str, Any]]] = []
+        for query, response in entries:
+            documents: Dict[str, Dict[str, Any]] = {}
+            if self.dedupe_documents:
+                response, documents = _split_documents(response)
+            stored, raw_size = _encode_payload(response, self.compression)
+            rows.append((self._make_key(query, search_depth, max_results), query.strip(),
+                         search_depth, max_results, stored, now, expires, raw_size))
+            row_documents.append(documents)
+
+        # Embed before taking the write lock — provider calls may hit the network
+        embeddings: List[Optional[bytes]] = []
+        if self._vec_available and self.embedding_provider:
+            embeddings = self._embed_many([query for query, _ in entries])
+
         with self._connect() as conn:
+            admitted = self._admit(conn, rows)
+            if len(admitted) < len(rows):
+                rejected = len(rows) - len(admitted)
+                self._admission_rejects += rejected
+                self.logger.debug("Admission filter rejected entries", count=rejected)
+            if not admitted:
+                return
+
+            # Documents first, so every stored reference resolves
+            doc_sizes = self._store_documents(
+                conn, {k: v for i in admitted for k, v in row_documents[i].items()}, now
+            )
+
             # Store in exact-match table
-            conn.execute(
+            conn.executemany(
                 """
                 INSERT OR REPLACE INTO search_cache
                     (cache_key, query_text, search_depth, max_results,
-                     response_json, created_at, expires_at, hit_count)
-                VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+                     response_json, created_at, expires_at, hit_count, raw_size, last_accessed,
+                     doc_keys, doc_bytes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?)
                 """,
-                (key, query.strip(), search_depth, max_results,
-                 json.dumps(response), now, expires),
+                [
+                    (*rows[i], now,
+                     json.dumps(sorted(row_documents[i])) if row_documents[i] else None,
+                     sum(doc_sizes[k] for k in row_documents[i]))
+                    for i in admitted
+                ],
             )
             
-            # Store vector embedding if available
-            if self._vec_available and self.embedding_provider:
+            # Store vector embeddings if available
+            for i in admitted:
+                if i < len(embeddings) and embeddings[i] is not None:
+                    self._store_vector(conn, rows[i][0], rows[i][1], embeddings[i],
+                                       search_depth, max_results, now, expires)
+
+        if self._l1 is not None:
+            for i in admitted:
+                self._l1.put(rows[i][0], entries[i][1], expires_at=expires)
+        self.logger.debug("Cached search results", count=len(admitted))
+
+        # Without a sweeper the size caps are enforced on the write path
+        if self._sweeper is None:
+            self.evict()
+
+    def _store_documents(
+        self, conn: sqlite3.Connection, documents: Dict[str, Dict[str, Any]], now: float
+    ) -> Dict[str, int]:
+        """Insert documents not stored yet. Returns {doc_key: stored body size} for all of them."""
+        if not documents:
+            return {}
+        keys = list(documents)
+        sizes = {
+            doc_key: size for doc_key, size in conn.execute(
+                f"SELECT doc_key, length(CAST(body AS BLOB)) FROM search_documents "
+                f"WHERE doc_key IN ({','.join('?' * len(keys))})",
+                keys,
+            )
+        }
+        new_rows = []
+        for doc_key in keys:
+            if doc_key in sizes:
+                continue
+            doc = documents[doc_key]
+            body, raw_size = _encode_payload({"content": doc["content"]}, self.compression)
+            sizes[doc_key] = _stored_size(body)
+            new_rows.append((doc_key, doc["canonical_url"], doc["content_hash"], body, raw_size, now))
+        conn.executemany(
+            "INSERT OR IGNORE INTO search_documents "
+            "(doc_key, canonical_url, content_hash, body, raw_size, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            new_rows,
+        )
+        return sizes
+
+    def _hydrate(self, conn: sqlite3.Connection, payloads: List[Any]) -> List[Any]:
+        """
+        Resolve ``doc`` references in decoded payloads back into result content.
+
+        Documents come from the in-memory LRU when possible (so repeated
+        sources share one decoded copy), otherwise from one ``IN`` query.
+        Payloads without references (legacy rows) are returned unchanged.
+        """
+        wanted = {
+            result["doc"]
+            for payload in payloads if isinstance(payload, dict)
+            for result in (payload.get("results") or []) if isinstance(result, dict) and "doc" in result
+        }
+        if not wanted:
+            return payloads
+
+        documents = {}
+        for doc_key in wanted:
+            doc = self._documents.get(doc_key)
+            if doc is not None:
+                documents[doc_key] = doc
+        missing = [doc_key for doc_key in wanted if doc_key not in documents]
+        if missing:
+            for doc_key, body in conn.execute(
+                f"SELECT doc_key, body FROM search_documents "
+                f"WHERE doc_key IN ({','.join('?' * len(missing))})",
+                missing,
+            ):
+                documents[doc_key] = _decode_payload(body)
+                self._documents.put(doc_key, documents[doc_key])
+
+        hydrated = []
+        for payload in payloads:
+            if not isinstance(payload, dict) or not isinstance(payload.get("results"), list):
+                hydrated.append(payload)
+                continue
+            results = []
+            for result in payload["results"]:
+                if isinstance(result, dict) and "doc" in result:
+                    doc = documents.get(result["doc"], {})
+                    result = {k: v for k, v in result.items() if k != "doc"}
+                    result["content"] = doc.get("content", "")
+                results.append(result)
+            hydrated.append(dict(payload, results=results))
+        return hydrated
+
+    def _gc_documents(self, conn: sqlite3.Connection) -> int:
+        """Delete documents no longer referenced by any cache entry."""
+        return conn.execute("""
+            DELETE FROM search_documents WHERE doc_key NOT IN (
+                SELECT refs.value FROM search_cache, json_each(search_cache.doc_keys) AS refs
+            )
+        """).rowcount
+
+    def _admit(self, conn: sqlite3.Connection, rows: List[tuple]) -> List[int]:
+        """
+        TinyLFU admission: indexes of ``rows`` allowed into a full cache.
+
+        Without an admission filter, or while below the size caps, every row
+        is admitted. Otherwise a new key must have an estimated recent
+        frequency at least that of the next eviction victim; overwrites of
+        keys already stored are always admitted.
+        """
+        everything = list(range(len(rows)))
+        if self._sketch is None or not self._over_capacity(conn, incoming=len(rows)):
+            return everything
+        victim = conn.execute(
+            f"SELECT cache_key FROM search_cache ORDER BY {EVICTION_ORDER[self.eviction_policy]} LIMIT 1"
+        ).fetchone()
+        if victim is None:
+            return everything
+        victim_freq = self._sketch.estimate(victim[0])
+
+        keys = [row[0] for row in rows]
+        present = {
+            row[0] for row in conn.execute(
+                f"SELECT cache_key FROM search_cache WHERE cache_key IN ({','.join('?' * len(keys))})",
+                keys,
+            )
+        }
+        return [
+            i for i, key in enumerate(keys)
+            if key in present or self._sketch.estimate(key) >= victim_freq
+        ]
+
+    def _usage(self, conn: sqlite3.Connection) -> Tuple[int, int]:
+        """(entries, stored bytes incl. referenced documents) in the exact-match table."""
+        return conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM({_ENTRY_BYTES}), 0) FROM search_cache"
+        ).fetchone()
+
+    def _over_capacity(self, conn: sqlite3.Connection, incoming: int = 0) -> bool:
+        if self.max_entries is None and self.max_bytes is None:
+            return False
+        entries, stored_bytes = self._usage(conn)
+        if self.max_entries is not None and entries + incoming > self.max_entries:
+            return True
+        return self.max_bytes is not None and stored_bytes >= self.max_bytes
+
+    def _embed_many(self, texts: List[str], remember: bool = False) -> List[Optional[bytes]]:
+        """
+        Embed several texts; failed embeddings come back as None.
+
+        Memoized embeddings are reused first. Lookups pass ``remember=True``
+        to memoize what they compute; the store path takes reused entries
+        out of the memo, so a miss followed by ``put()`` embeds once.
+        The rest go to the provider in one ``embed_batch()`` call; if the
+        batch fails, texts are retried one by one so a single bad input
+        only loses its own embedding.
+        """
+        embeddings: List[Optional[bytes]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            embedding = self._embedding_memo.get(text)
+            if embedding is not None:
+                if not remember:
+                    self._embedding_memo.pop(text)
+                embeddings[i] = embedding
+            else:
+                missing.setdefault(text, []).append(i)
+        if not missing:
+            return embeddings
+
+        pending = list(missing)
+        try:
+            computed = self.embedding_provider.embed_batch(pending)
+        except Exception as e:
+            self.logger.warning("Batch embedding failed, embedding one by one",
+                                texts=len(pending), error=str(e))
+            computed = []
+            for text in pending:
                 try:
-                    if not _load_vec(conn):
-                        return
-                    
-                    embedding = self.embedding_provider.embed(query)
-                    
-                    # Insert into vector table (auto-assigns rowid)
-                    conn.execute(
-                        "INSERT INTO search_vec(embedding) VALUES (?)",
-                        (embedding,),
-                    )
-                    rowid = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
-                    
-                    # Store metadata linking rowid to cache_key
-                    conn.execute(
-                        """
-                        INSERT OR REPLACE INTO search_vec_meta
-                            (rowid, cache_key, query_text, search_depth, max_results, created_at, expires_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (rowid, key, query.strip(), search_depth, max_results, now, expires),
-                    )
-                    self.logger.debug("Stored vector embedding", query=query)
+                    computed.append(self.embedding_provider.embed(text))
                 except Exception as e:
-                    self.logger.warning("Failed to store vector embedding", error=str(e))
-        
-        self.logger.debug("Cached search result", query=query)
+                    self.logger.warning("Failed to generate embedding", error=str(e))
+                    computed.append(None)
+
+        for text, embedding in zip(pending, computed):
+            if embedding is None:
+                continue
+            if remember:
+                self._embedding_memo.put(text, embedding)
+            for i in missing[text]:
+                embeddings[i] = embedding
+        return embeddings
+
+    def _store_vector(
+        self,
+        conn: sqlite3.Connection,
+        key: str,
+        query: str,
+        embedding: bytes,
+        search_depth: str,
+        max_results: int,
+        created_at: float,
+        expires_at: float,
+    ) -> None:
+        """Insert (or replace) the vector row for a cache key on an open connection."""
+        rowid = _vec_rowid(key)
+        try:
+            conn.execute(f"DELETE FROM {self._vec_table} WHERE rowid = ?", (rowid,))
+            _insert_vectors(
+                conn, self._vec_table, self.vector_quantization,
+                [(rowid, search_depth, int(max_results), embedding, float(expires_at), key, query)],
+            )
+            self.logger.debug("Stored vector embedding", query=query)
+        except Exception as e:
+            self.logger.warning("Failed to store vector embedding", error=str(e))
 
     def clear_expired(self) -> int:
-        """Delete expired entries from both exact and vector tables."""
-        now = time.time()
+        """Delete expired entries (past any stale grace window) from exact and vector tables."""
+        now = time.time() - self.stale_grace_hours * 3600
         with self._connect() as conn:
-            # Get expired cache keys before deleting
-            expired_keys = [row[0] for row in conn.execute(
-                "SELECT cache_key FROM search_cache WHERE expires_at < ?", (now,)
-            ).fetchall()]
-            
             # Delete from exact table
             cursor = conn.execute(
                 "DELETE FROM search_cache WHERE expires_at < ?", (now,)
             )
             removed = cursor.rowcount
             
-            # Delete from vector tables if available
-            if self._vec_available and expired_keys:
+            # Delete from every vector table (expiry is a vec0 metadata column)
+            if self._vec_available:
                 try:
-                    if _load_vec(conn):
-                        for key in expired_keys:
-                            row = conn.execute(
-                                "SELECT rowid FROM search_vec_meta WHERE cache_key = ?", (key,)
-                            ).fetchone()
-                            if row:
-                                conn.execute("DELETE FROM search_vec WHERE rowid = ?", (row[0],))
-                                conn.execute("DELETE FROM search_vec_meta WHERE rowid = ?", (row[0],))
+                    for table in self._vec_tables(conn):
+                        conn.execute(f"DELETE FROM {table} WHERE expires_at < ?", (now,))
                 except Exception as e:
                     self.logger.warning("Failed to clean vector cache", error=str(e))
+            if removed:
+                self._gc_documents(conn)
         
         if removed:
             self.logger.info("Cleared expired cache entries", count=removed)
         return removed
 
+    def evict(self) -> int:
+        """
+        Delete entries until the cache fits ``max_entries`` / ``max_bytes``.
+
+        Victims are ranked by ``eviction_policy`` in a single windowed query
+        and removed with one DELETE per table. Returns the number evicted.
+        """
+        if self.max_entries is None and self.max_bytes is None:
+            return 0
+        self.flush_hits()  # rank on current hit_count / last_accessed
+        order = EVICTION_ORDER[self.eviction_policy]
+        with self._connect() as conn:
+            entries, stored_bytes = self._usage(conn)
+            excess_entries = entries - self.max_entries if self.max_entries is not None else 0
+            excess_bytes = stored_bytes - self.max_bytes if self.max_bytes is not None else 0
+            if excess_entries <= 0 and excess_bytes <= 0:
+                return 0
+
+            # A row is a victim while it is within the first excess_entries, or
+            # while the bytes freed by the rows ranked before it are still short.
+            victims = [row[0] for row in conn.execute(f"""
+                SELECT cache_key FROM (
+                    SELECT cache_key,
+                           ROW_NUMBER() OVER w AS position,
+                           SUM({_ENTRY_BYTES}) OVER w - {_ENTRY_BYTES} AS freed_before
+                    FROM search_cache
+                    WINDOW w AS (ORDER BY {order} ROWS UNBOUNDED PRECEDING)
+                )
+                WHERE position <= ? OR freed_before < ?
+            """, (excess_entries, excess_bytes))]
+
+            conn.execute(
+                "DELETE FROM search_cache WHERE cache_key IN (SELECT value FROM json_each(?))",
+                (json.dumps(victims),),
+            )
+            if self._vec_available:
+                rowids = json.dumps([_vec_rowid(key) for key in victims])
+                try:
+                    for table in self._vec_tables(conn):
+                        conn.execute(
+                            f"DELETE FROM {table} WHERE rowid IN (SELECT value FROM json_each(?))",
+                            (rowids,),
+                        )
+                except Exception as e:
+                    self.logger.warning("Failed to evict vectors", error=str(e))
+            self._gc_documents(conn)
+
+        if self._l1 is not None:
+            for key in victims:
+                self._l1.pop(key)
+        self._evictions += len(victims)
+        self.logger.info("Evicted cache entries", count=len(victims), policy=self.eviction_policy)
+        return len(victims)
+
+    def sweep(self) -> Dict[str, int]:
+        """
+        One maintenance pass: drop expired rows, evict down to the size caps,
+        then return free pages to the filesystem (incremental vacuum).
+
+        Runs periodically when ``sweep_interval_seconds`` is set; safe to call
+        directly (e.g. from a cron job).
+        """
+        expired = self.clear_expired()
+        evicted = self.evict()
+        with self._connect() as conn:
+            prune_metrics(conn, time.time() - self.metrics_retention_days * 86400)
+            free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # executescript steps the pragma to completion (execute() frees one page)
+            conn.executescript("PRAGMA incremental_vacuum;")
+            free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return {"expired": expired, "evicted": evicted, "pages_freed": free_before - free_after}
+
+    def recompress(self, codec: Optional[str] = None, batch_size: int = 200) -> Dict[str, Any]:
+        """
+        Re-encode every stored payload with ``codec`` (default: this cache's codec).
+
+        One-off migration for caches written before compression existed, or
+        when switching codecs. Rewrites payloads and documents in batches,
+        then VACUUMs so the freed pages are returned to the filesystem.
+        """
+        codec = codec or self.compression
+        if codec not in ("none", *_CODEC_IDS):
+            raise ValueError(f"Unknown cache codec: {codec}")
+
+        rewritten, bytes_before, bytes_after = self._recompress_table(
+            "search_cache", "cache_key", "response_json", codec, batch_size
+        )
+        documents, doc_before, doc_after = self._recompress_table(
+            "search_documents", "doc_key", "body", codec, batch_size
+        )
+        bytes_before += doc_before
+        bytes_after += doc_after
+
+        with self._connect() as conn:
+            # Referenced document sizes changed with their encoding
+            conn.execute("""
+                UPDATE search_cache SET doc_bytes = (
+                    SELECT COALESCE(SUM(length(CAST(d.body AS BLOB))), 0)
+                    FROM json_each(search_cache.doc_keys) AS refs
+                    JOIN search_documents AS d ON d.doc_key = refs.value
+                ) WHERE doc_keys IS NOT NULL
+            """)
+
+        with self._connect() as conn:
+            # The full VACUUM also switches older cache files to incremental auto-vacuum
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+
+        self.logger.info("Recompressed search cache", codec=codec, rows=rewritten,
+                         bytes_before=bytes_before, bytes_after=bytes_after)
+        return {
+            "codec": codec,
+            "rows": rewritten,
+            "documents": documents,
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "ratio": bytes_before / bytes_after if bytes_after else 1.0,
+        }
+
+    def _recompress_table(
+        self, table: str, key_column: str, value_column: str, codec: str, batch_size: int
+    ) -> Tuple[int, int, int]:
+        """Re-encode one table's stored values. Returns (rows, bytes_before, bytes_after)."""
+        rewritten = 0
+        bytes_before = 0
+        bytes_after = 0
+        last_key = ""
+        while True:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    f"SELECT {key_column}, {value_column} FROM {table} "
+                    f"WHERE {key_column} > ? ORDER BY {key_column} LIMIT ?",
+                    (last_key, batch_size),
+                ).fetchall()
+                if not rows:
+                    break
+                updates = []
+                for key, stored in rows:
+                    new_stored, raw_size = _encode_payload(_decode_payload(stored), codec)
+                    bytes_before += _stored_size(stored)
+                    bytes_after += _stored_size(new_stored)
+                    updates.append((new_stored, raw_size, key))
+                conn.executemany(
+                    f"UPDATE {table} SET {value_column} = ?, raw_size = ? WHERE {key_column} = ?",
+                    updates,
+                )
+                rewritten += len(updates)
+                last_key = rows[-1][0]
+        return rewritten, bytes_before, bytes_after
+
     def get_stats(self) -> Dict[str, Any]:
-        """Return cache statistics."""
+        """Return cache statistics (flushes buffered hit counts first)."""
+        self.flush_hits()
         with self._connect() as conn:
-            row = conn.execute(
-                "SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM search_cache"
+            row = conn.execute("""
+                SELECT COUNT(*), COALESCE(SUM(hit_count), 0),
+                       COALESCE(SUM(COALESCE(raw_size, length(CAST(response_json AS BLOB)))), 0),
+                       COALESCE(SUM(length(CAST(response_json AS BLOB))), 0)
+                FROM search_cache
+            """).fetchone()
+            entries, total_hits, raw_bytes, stored_bytes = row
+            documents, document_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length(CAST(body AS BLOB))), 0) FROM search_documents"
             ).fetchone()
-            entries, total_hits = row
+            namespace_entries = dict(conn.execute(
+                "SELECT namespace, COUNT(*) FROM search_cache WHERE namespace != 'search' GROUP BY namespace"
+            ).fetchall())
 
         total_lookups = self._hits + self._semantic_hits + self._misses
         return {
@@ -359,12 +1482,41 @@ class SearchCache:
             "session_hits": self._hits,
             "session_semantic_hits": self._semantic_hits,
             "session_misses": self._misses,
+            "session_stale_hits": self._stale_hits,
             "session_hit_rate": (
                 (self._hits + self._semantic_hits) / total_lookups
                 if total_lookups > 0
                 else 0.0
             ),
+            "l1_enabled": self._l1 is not None,
+            "l1_entries": len(self._l1) if self._l1 is not None else 0,
+            "l1_hits": self._l1_hits,
+            "l1_misses": self._l1_misses,
+            "l2_hits": self._l2_hits,
+            "l2_misses": self._l2_misses,
+            "compression": self.compression,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "eviction_policy": self.eviction_policy,
+            "admission": self.admission,
+            "evictions": self._evictions,
+            "admission_rejects": self._admission_rejects,
+            "payload_bytes_raw": raw_bytes,
+            "payload_bytes_stored": stored_bytes,
+            "compression_ratio": raw_bytes / stored_bytes if stored_bytes else 1.0,
+            "documents": documents,
+            "document_bytes_stored": document_bytes,
             "ttl_hours": self.ttl_hours,
+            "stale_grace_hours": self.stale_grace_hours,
             "semantic_enabled": self._vec_available,
+            "vector_quantization": self.vector_quantization,
             "similarity_threshold": self.similarity_threshold,
+            "namespaces": {
+                namespace: {
+                    "entries": namespace_entries.get(namespace, 0),
+                    "ttl_hours": ttl,
+                    **self._namespace_stats.get(namespace, {"hits": 0, "misses": 0}),
+                }
+                for namespace, ttl in self.namespace_ttl_hours.items()
+            },
         }
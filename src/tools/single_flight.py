@@ -0,0 +1,91 @@
+"""
+Single-flight coalescing of concurrent identical async calls.
+
+The first caller for a key runs the work; callers arriving while it is in
+flight await the same result instead of repeating the call. Results are
+shared through a ``concurrent.futures.Future``, so callers may sit on
+different threads, each with its own event loop (as in the web app, where
+every research run gets a thread and ``asyncio.run``).
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+
+class _LeaderCancelled(Exception):
+    """Set on the shared future when the leading call was cancelled."""
+
+
+class SingleFlight:
+    """
+    Deduplicate in-flight calls by key.
+
+    Nothing is cached: once the leading call finishes, the next caller for
+    the same key starts a new one. Exceptions are shared with every waiter,
+    except cancellation of the leader: that belongs to the leader's caller,
+    so waiters retry (one of them leading a new call) instead.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._saved = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run ``fn()`` unless a call for ``key`` is already in flight.
+
+        Returns ``(result, shared)`` where ``shared`` is True for callers
+        that reused another caller's result.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._calls[key] = future
+                self._executed += 1
+            else:
+                self._saved += 1
+
+        if not leader:
+            logger.debug("Joined in-flight call", key=str(key))
+            try:
+                # shield: a cancelled waiter must not cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(future)), True
+            except _LeaderCancelled:
+                logger.debug("In-flight call cancelled, retrying", key=str(key))
+                return await self.do(key, fn)
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            self._finish(key)
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result, False
+
+    def _finish(self, key: Hashable) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Calls executed, duplicate calls saved, and calls currently in flight."""
+        with self._lock:
+            return {
+                "executed": self._executed,
+                "saved": self._saved,
+                "in_flight": len(self._calls),
+            }
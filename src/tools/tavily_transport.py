@@ -0,0 +1,241 @@
+"""
+Transports for Tavily API calls.
+
+``ThreadTransport`` runs the synchronous ``TavilyClient`` in the default
+executor: every call holds a thread for its whole round-trip. ``AsyncTransport``
+posts to the same endpoints through ``TavilyHTTPPool``, a process-wide
+keep-alive ``httpx.AsyncClient``, so concurrent calls share warm TLS
+connections and no threads.
+
+An httpx client is bound to the event loop that first uses it, while the web
+app gives every research run its own thread and ``asyncio.run`` loop. The pool
+therefore owns one event loop thread for the process; callers on any loop
+hand their requests to it and await the result.
+"""
+
+import asyncio
+import json
+import threading
+from typing import Any, Dict, Optional
+import structlog
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+from tavily.utils import get_max_items_from_list
+
+logger = structlog.get_logger()
+
+TAVILY_API_URL = "https://api.tavily.com"
+
+
+class TavilyHTTPError(RuntimeError):
+    """Non-200 response from the Tavily API."""
+
+    def __init__(self, status_code: int, detail: str = ""):
+        super().__init__(f"Tavily API returned {status_code}" + (f": {detail}" if detail else ""))
+        self.status_code = status_code
+        self.detail = detail
+
+
+class TavilyHTTPPool:
+    """
+    Shared keep-alive HTTP client on its own event loop thread.
+
+    The loop thread and client start on first use and live until ``close()``.
+    Cancelling a caller's ``post()`` cancels the request on the pool loop.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 32,
+        max_keepalive: int = 16,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 60.0,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client = None
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                if not HTTPX_AVAILABLE:
+                    raise RuntimeError("httpx is not installed")
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name="tavily-http", daemon=True)
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    async def post(self, url: str, payload: Dict[str, Any], headers: Dict[str, str],
+                   timeout: Optional[float] = None) -> Any:
+        """POST ``payload`` as JSON on the pool loop and return the decoded response."""
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._post(url, payload, headers, timeout), loop)
+        # wrap_future propagates cancellation of this await to the pool-side task
+        return await asyncio.wrap_future(future)
+
+    async def _post(self, url: str, payload: Dict[str, Any], headers: Dict[str, str],
+                    timeout: Optional[float]) -> Any:
+        # Runs on the pool loop only, so lazy creation needs no lock
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=self.timeout,
+            )
+        self._requests += 1
+        response = await self._client.post(
+            url, content=json.dumps(payload), headers=headers,
+            timeout=timeout if timeout is not None else self.timeout,
+        )
+        if response.status_code != 200:
+            self._errors += 1
+            raise TavilyHTTPError(response.status_code, _error_detail(response))
+        return response.json()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Requests sent and error responses since start."""
+        return {
+            "started": self._loop is not None,
+            "requests": self._requests,
+            "errors": self._errors,
+        }
+
+    def close(self) -> None:
+        """Close the client and stop the loop thread (the pool restarts on next use)."""
+        with self._lock:
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result(timeout=5)
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+def _error_detail(response) -> str:
+    try:
+        body = response.json()
+    except ValueError:
+        return response.text[:200]
+    if isinstance(body, dict) and isinstance(body.get("detail"), dict):
+        return str(body["detail"].get("error") or "")
+    return str(body)[:200]
+
+
+# Process-wide: every AsyncTransport shares these connections
+http_pool = TavilyHTTPPool()
+
+
+class ThreadTransport:
+    """Synchronous ``TavilyClient`` calls run in the default thread pool."""
+
+    name = "thread"
+
+    def __init__(self, client):
+        self.client = client
+
+    async def _run(self, fn, **kwargs) -> Any:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, lambda: fn(**kwargs))
+
+    async def search(self, **params) -> Dict[str, Any]:
+        return await self._run(self.client.search, **params)
+
+    async def get_search_context(self, query: str, max_results: int = 5,
+                                 search_depth: str = "basic") -> str:
+        return await self._run(self.client.get_search_context, query=query,
+                               search_depth=search_depth, max_results=max_results)
+
+    async def qna_search(self, query: str) -> str:
+        return await self._run(self.client.qna_search, query=query)
+
+    async def extract(self, url: str) -> Any:
+        return await self._run(self.client.extract, urls=url)
+
+
+class AsyncTransport:
+    """
+    Tavily endpoints over ``TavilyHTTPPool`` (``http_pool`` by default).
+
+    Requests match what ``TavilyClient`` sends for the same calls; the API
+    key goes in a per-request header, so one pool serves every key.
+    """
+
+    name = "async"
+
+    def __init__(self, api_key: str, pool: Optional[TavilyHTTPPool] = None,
+                 base_url: str = TAVILY_API_URL):
+        self.pool = pool or http_pool
+        self.base_url = base_url.rstrip("/")
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}",
+            "X-Client-Source": "tavily-python",
+        }
+
+    async def _post(self, endpoint: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        payload = {k: v for k, v in payload.items() if v is not None}
+        return await self.pool.post(self.base_url + endpoint, payload, self.headers, timeout)
+
+    async def search(self, **params) -> Dict[str, Any]:
+        response = await self._post("/search", params)
+        response.setdefault("results", [])
+        return response
+
+    async def get_search_context(self, query: str, max_results: int = 5,
+                                 search_depth: str = "basic", max_tokens: int = 4000) -> str:
+        response = await self._post("/search", {
+            "query": query, "search_depth": search_depth, "topic": "general", "days": 7,
+            "max_results": max_results, "include_answer": False,
+            "include_raw_content": False, "include_images": False,
+        })
+        context = [{"url": source["url"], "content": source["content"]}
+                   for source in response.get("results", [])]
+        return json.dumps(get_max_items_from_list(context, max_tokens))
+
+    async def qna_search(self, query: str) -> str:
+        response = await self._post("/search", {
+            "query": query, "search_depth": "advanced", "topic": "general", "days": 7,
+            "max_results": 5, "include_answer": True,
+            "include_raw_content": False, "include_images": False,
+        })
+        return response.get("answer", "")
+
+    async def extract(self, url: str) -> Any:
+        response = await self._post("/extract", {"urls": url, "timeout": 30})
+        response.setdefault("results", [])
+        response.setdefault("failed_results", [])
+        return response
+
+
+def create_transport(name: str, client, api_key: str, pool: Optional[TavilyHTTPPool] = None):
+    """
+    Transport by name ("thread" or "async").
+
+    "async" falls back to the thread transport when httpx is not installed.
+    """
+    if name == "async":
+        if HTTPX_AVAILABLE:
+            return AsyncTransport(api_key, pool=pool)
+        logger.warning("httpx not installed, using threaded Tavily transport")
+    elif name != "thread":
+        raise ValueError(f"Unknown Tavily transport: {name}")
+    return ThreadTransport(client)
@@ -0,0 +1,211 @@
+"""
+Offline calibration of the semantic cache similarity threshold.
+
+Replays queries already seen (``search_cache`` rows and the research
+database's ``queries``/``sources``), embeds them with a provider and finds
+each query's most similar other query in the same cache partition (search
+depth and max_results), exactly as a semantic lookup would.
+
+There is no labelled data, so correctness is estimated from the results:
+a pair is treated as equivalent when their result URL sets overlap by at
+least ``overlap`` (Jaccard over canonical URLs). For every candidate
+threshold the report gives the semantic hit rate, the estimated false-hit
+rate (hits whose nearest neighbour is not equivalent) and recall of the
+reusable queries, and recommends the lowest threshold whose false-hit rate
+is acceptable.
+"""
+
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+import numpy as np
+import structlog
+
+from .documents import canonical_url
+from .search_cache import _decode_payload, search_rows_condition
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class QuerySample:
+    """One distinct query in a cache partition and the URLs it returned."""
+    query: str
+    search_depth: str
+    max_results: int
+    urls: Set[str] = field(default_factory=set)
+
+
+def _add(samples: Dict[Tuple[str, str, int], QuerySample], query: str, depth: str,
+         max_results: int, urls: Iterable[str]) -> None:
+    key = (query.strip().lower(), depth, int(max_results))
+    if not key[0]:
+        return
+    sample = samples.get(key)
+    if sample is None:
+        sample = samples[key] = QuerySample(query.strip(), depth, int(max_results))
+    sample.urls.update(canonical_url(url) for url in urls if url)
+
+
+def load_samples(
+    cache_path: Optional[Union[str, Path]] = None,
+    research_db_path: Optional[Union[str, Path]] = None,
+) -> List[QuerySample]:
+    """
+    Collect distinct queries with their result URLs from the search cache
+    (expired rows included) and/or the research database.
+
+    Queries with the same normalized text and partition are merged; queries
+    without any result URL are dropped (they cannot be judged).
+    """
+    samples: Dict[Tuple[str, str, int], QuerySample] = {}
+
+    if cache_path and Path(cache_path).exists():
+        with sqlite3.connect(str(cache_path)) as conn:
+            for query, depth, max_results, stored in conn.execute(
+                "SELECT query_text, search_depth, max_results, response_json FROM search_cache "
+                f"WHERE {search_rows_condition(conn)}"
+            ):
+                try:
+                    results = _decode_payload(stored).get("results") or []
+                except Exception:
+                    continue
+                _add(samples, query, depth, max_results,
+                     (r.get("url") for r in results if isinstance(r, dict)))
+        conn.close()
+
+    if research_db_path and Path(research_db_path).exists():
+        with sqlite3.connect(str(research_db_path)) as conn:
+            for query, depth, max_results, url in conn.execute(
+                "SELECT q.query_text, COALESCE(q.search_depth, 'basic'), COALESCE(q.max_results, 5), s.url "
+                "FROM queries q JOIN sources s ON s.query_id = q.id"
+            ):
+                _add(samples, query, depth, max_results, [url])
+        conn.close()
+
+    return [sample for sample in samples.values() if sample.urls]
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def _reusable(samples: Sequence[QuerySample], overlap: float) -> np.ndarray:
+    """Queries with at least one equivalent peer in their partition (shared URLs only)."""
+    by_url: Dict[Tuple[str, int, str], List[int]] = {}
+    for i, sample in enumerate(samples):
+        for url in sample.urls:
+            by_url.setdefault((sample.search_depth, sample.max_results, url), []).append(i)
+    shared: Dict[Tuple[int, int], int] = {}
+    for members in by_url.values():
+        for a, i in enumerate(members):
+            for j in members[a + 1:]:
+                shared[(i, j)] = shared.get((i, j), 0) + 1
+
+    reusable = np.zeros(len(samples), dtype=bool)
+    for (i, j), common in shared.items():
+        union = len(samples[i].urls) + len(samples[j].urls) - common
+        if common / union >= overlap:
+            reusable[i] = reusable[j] = True
+    return reusable
+
+
+def nearest_neighbours(
+    embeddings: np.ndarray, partitions: Sequence[Tuple[str, int]], block_size: int = 1024
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Most similar other row (cosine) within the same partition, for every row.
+
+    Computes the similarity matrix in row blocks so memory stays at
+    ``block_size * n`` floats. Rows without a partition peer get
+    similarity ``-inf`` and index ``-1``.
+    """
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    unit = embeddings / np.where(norms > 0, norms, 1.0)
+    _, partition_ids = np.unique(
+        np.array([f"{depth}|{max_results}" for depth, max_results in partitions]), return_inverse=True
+    )
+
+    n = len(unit)
+    best_sim = np.full(n, -np.inf, dtype=np.float32)
+    best_idx = np.full(n, -1, dtype=np.int64)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        sims = unit[start:stop] @ unit.T
+        sims[partition_ids[start:stop, None] != partition_ids[None, :]] = -np.inf
+        sims[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        idx = sims.argmax(axis=1)
+        best_idx[start:stop] = idx
+        best_sim[start:stop] = sims[np.arange(stop - start), idx]
+    best_idx[~np.isfinite(best_sim)] = -1
+    return best_sim, best_idx
+
+
+def calibrate(
+    samples: Sequence[QuerySample],
+    provider,
+    thresholds: Optional[Sequence[float]] = None,
+    overlap: float = 0.5,
+    max_false_rate: float = 0.05,
+) -> Dict[str, object]:
+    """
+    Hit-rate / false-hit-rate curve for ``provider`` over ``samples``.
+
+    Returns ``provider`` (signature), ``queries``, ``reusable`` (queries with
+    at least one equivalent peer), ``current_threshold``, ``curve`` (one dict
+    per threshold: ``threshold``, ``hit_rate``, ``false_hit_rate``,
+    ``recall``) and ``recommended`` (lowest threshold from which every
+    higher one keeps ``false_hit_rate <= max_false_rate``, or None).
+    """
+    if thresholds is None:
+        thresholds = [round(t, 2) for t in np.arange(0.05, 1.0, 0.05)]
+    result = {
+        "provider": provider.signature,
+        "queries": len(samples),
+        "reusable": 0,
+        "current_threshold": provider.recommended_threshold,
+        "curve": [],
+        "recommended": None,
+    }
+    if len(samples) < 2:
+        return result
+
+    embeddings = np.stack([
+        np.frombuffer(embedding, dtype=np.float32)
+        for embedding in provider.embed_batch([sample.query for sample in samples])
+    ])
+    best_sim, best_idx = nearest_neighbours(
+        embeddings, [(s.search_depth, s.max_results) for s in samples]
+    )
+
+    # Equivalence of each query with its nearest neighbour, and whether any
+    # partition peer is equivalent at all (the most a perfect threshold could reuse)
+    correct = np.array([
+        j >= 0 and _jaccard(samples[i].urls, samples[j].urls) >= overlap
+        for i, j in enumerate(best_idx)
+    ])
+    result["reusable"] = int(_reusable(samples, overlap).sum())
+
+    for threshold in sorted(thresholds):
+        hits = best_sim >= threshold
+        n_hits = int(hits.sum())
+        false_hits = int((hits & ~correct).sum())
+        point = {
+            "threshold": float(threshold),
+            "hit_rate": n_hits / len(samples),
+            "false_hit_rate": false_hits / n_hits if n_hits else 0.0,
+            "recall": int((hits & correct).sum()) / result["reusable"] if result["reusable"] else 0.0,
+        }
+        result["curve"].append(point)
+
+    # Lowest threshold from which every stricter one stays within the false-hit budget
+    for point in reversed(result["curve"]):
+        if point["false_hit_rate"] > max_false_rate:
+            break
+        if point["hit_rate"] > 0:
+            result["recommended"] = point["threshold"]
+    logger.info("Calibrated similarity threshold", provider=provider.signature,
+                queries=len(samples), recommended=result["recommended"])
+    return result
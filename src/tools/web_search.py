@@ -3,15 +3,33 @@ Web search tool using Tavily API for AI-optimized search results.
 """
 
 import asyncio
+import hashlib
 import logging
+import threading
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 import os
 from tavily import TavilyClient
 import structlog
 
+from .documents import canonical_url
+from .hedging import LatencyTracker, LatencyTrackers, hedged
+from .search_cache import SearchCache
+from .single_flight import SingleFlight
+from .tavily_transport import TavilyHTTPPool, create_transport
+
 logger = structlog.get_logger()
 
+# Process-wide: identical searches from concurrent research runs share one Tavily call
+search_flight = SingleFlight()
+
+# Process-wide: recent Tavily search latencies per search depth, for choosing the hedge delay
+search_latency = LatencyTrackers()
+
+# Cache keys with a stale-while-revalidate refresh in flight (process-wide)
+_refreshing: set = set()
+_refreshing_lock = threading.Lock()
+
 
 @dataclass
 class SearchResult:
@@ -33,18 +51,67 @@ class SearchResponse:
     search_context: Optional[str] = None
     images: List[Dict[str, str]] = None
     cache_hit: bool = False
+    stale: bool = False
+    timed_out: bool = False
+    error: Optional[str] = None
+
+    @classmethod
+    def failed(cls, query: str, error: BaseException) -> "SearchResponse":
+        """Empty response recording a search that failed or missed its deadline."""
+        return cls(query=query, results=[], follow_up_questions=[], error=str(error),
+                   timed_out=isinstance(error, SearchTimeoutError))
+
+
+class SearchTimeoutError(RuntimeError):
+    """A Tavily call did not answer within the tool's deadline."""
 
 
 class WebSearchTool:
-    """Tavily-powered web search tool optimized for AI agents."""
+    """
+    Tavily-powered web search tool optimized for AI agents.
+    
+    When the search cache has a stale grace window (``stale_grace_hours``),
+    recently expired results are returned immediately with ``stale=True``
+    and refreshed from Tavily in a background thread.
+    
+    Concurrent identical searches (same cache key and flags) are coalesced
+    through ``single_flight`` (process-wide by default) into one Tavily call.
     
-    def __init__(self, api_key: Optional[str] = None, search_cache=None):
+    ``transport`` selects how Tavily is called: "thread" runs the synchronous
+    client in the default executor, "async" uses the process-wide pooled
+    keep-alive HTTP client (``tavily_transport.http_pool`` unless ``http_pool``
+    is given) and falls back to "thread" when httpx is missing.
+    
+    ``timeout`` is a deadline in seconds for each Tavily call; a search that
+    misses it raises ``SearchTimeoutError``. With ``hedge_percentile`` set
+    (e.g. 95), a search still unanswered after that percentile of recent
+    search latencies at the same depth (process-wide by default, or one
+    ``latency_tracker`` for all depths) sends one identical backup request
+    and takes whichever answers first. A search that times out counts as
+    taking the full deadline.
+    
+    With a search cache, ``get_search_context``, ``qna_search`` and
+    ``extract_url_content`` results are cached too, each in its own
+    namespace and TTL (extraction keyed by canonical URL).
+    """
+    
+    def __init__(self, api_key: Optional[str] = None, search_cache=None,
+                 single_flight: Optional[SingleFlight] = None,
+                 transport: str = "thread", http_pool: Optional[TavilyHTTPPool] = None,
+                 timeout: Optional[float] = None, hedge_percentile: Optional[float] = None,
+                 latency_tracker: Optional[LatencyTracker] = None):
         self.api_key = api_key or os.getenv("TAVILY_API_KEY")
         if not self.api_key:
             raise ValueError("Tavily API key not found. Set TAVILY_API_KEY environment variable")
         
         self.client = TavilyClient(api_key=self.api_key)
+        self._key_id = hashlib.sha256(self.api_key.encode("utf-8")).hexdigest()[:16]
+        self.transport = create_transport(transport, self.client, self.api_key, pool=http_pool)
         self.search_cache = search_cache
+        self.single_flight = single_flight or search_flight
+        self.timeout = timeout
+        self.hedge_percentile = hedge_percentile
+        self.latency_tracker = latency_tracker
         self.logger = logger.bind(tool="web_search")
         
     def _normalize_text(self, text: str) -> str:
@@ -92,38 +159,253 @@ class WebSearchTool:
         normalized_query = self._normalize_text(query)
         self.logger.info("Performing web search", query=normalized_query, max_results=max_results)
         
-        # Check cache first
+        # Check cache first. Lookups (SQLite, and on a miss possibly a remote
+        # embedding call) run in a thread so concurrent searches don't queue behind them.
         if self.search_cache:
-            cached = self.search_cache.get(normalized_query, search_depth, max_results)
+            cached = await asyncio.to_thread(self.search_cache.get, normalized_query, search_depth, max_results)
             if cached is not None:
                 return self._parse_response(normalized_query, cached, include_answer, include_images, cache_hit=True)
+            stale = await asyncio.to_thread(
+                self._get_stale, normalized_query, max_results, search_depth,
+                include_answer, include_images, include_raw_content, days
+            )
+            if stale is not None:
+                return stale
         
         try:
-            # Run Tavily search in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.client.search(
-                    query=normalized_query,
-                    search_depth=search_depth,
-                    max_results=max_results,
-                    include_answer=include_answer,
-                    include_images=include_images,
-                    include_raw_content=include_raw_content,
-                    days=days
-                )
+            response, shared = await self._fetch_shared(
+                normalized_query, max_results, search_depth,
+                include_answer, include_images, include_raw_content, days
             )
             
-            # Store in cache before parsing
-            if self.search_cache and isinstance(response, dict):
-                self.search_cache.put(normalized_query, search_depth, max_results, response)
+            # Store in cache before parsing (the leading caller already stored a shared result)
+            if self.search_cache and not shared and isinstance(response, dict):
+                await asyncio.to_thread(self.search_cache.put, normalized_query, search_depth, max_results, response)
 
             return self._parse_response(normalized_query, response, include_answer, include_images)
             
+        except SearchTimeoutError as e:
+            self.logger.warning("Web search timed out", query=query, error=str(e))
+            raise
         except Exception as e:
             self.logger.error("Web search failed", query=query, error=str(e))
             raise RuntimeError(f"Web search failed: {str(e)}") from e
 
+    async def search_many(
+        self,
+        queries: List[str],
+        max_results: int = 5,
+        search_depth: str = "basic",
+        include_answer: bool = True,
+        include_images: bool = False,
+        include_raw_content: bool = False,
+        days: Optional[int] = None,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        Search several queries at once, resolving cache hits in bulk.
+        
+        Cache lookups go through ``SearchCache.get_many`` and fresh results are
+        stored with ``put_many``; only the misses are sent to Tavily, concurrently.
+        
+        Args:
+            queries: Search queries
+            return_exceptions: If True, a failed query's slot holds its RuntimeError
+                instead of the whole call raising (like ``asyncio.gather``)
+            (other args as for ``search``)
+            
+        Returns:
+            List of SearchResponse aligned with ``queries``
+        """
+        normalized = [self._normalize_text(q) for q in queries]
+        self.logger.info("Performing bulk web search", query_count=len(normalized), max_results=max_results)
+        
+        # Cache I/O runs in a thread, as in search()
+        cached: List[Optional[Dict[str, Any]]] = [None] * len(normalized)
+        if self.search_cache:
+            cached = await asyncio.to_thread(self.search_cache.get_many, normalized, search_depth, max_results)
+        
+        results: List[Any] = [None] * len(normalized)
+        misses = []
+        for i, (query, hit) in enumerate(zip(normalized, cached)):
+            if hit is not None:
+                results[i] = self._parse_response(query, hit, include_answer, include_images, cache_hit=True)
+                continue
+            if self.search_cache:
+                results[i] = await asyncio.to_thread(
+                    self._get_stale, query, max_results, search_depth,
+                    include_answer, include_images, include_raw_content, days
+                )
+            if results[i] is None:
+                misses.append(i)
+        
+        fetched = await asyncio.gather(
+            *(self._fetch_shared(normalized[i], max_results, search_depth,
+                                 include_answer, include_images, include_raw_content, days)
+              for i in misses),
+            return_exceptions=True,
+        )
+        
+        to_store = []
+        first_error = None
+        for i, outcome in zip(misses, fetched):
+            response, shared = (outcome, False) if isinstance(outcome, Exception) else outcome
+            if isinstance(response, Exception):
+                if isinstance(response, SearchTimeoutError):
+                    self.logger.warning("Web search timed out", query=queries[i], error=str(response))
+                    error = response
+                else:
+                    self.logger.error("Web search failed", query=queries[i], error=str(response))
+                    error = RuntimeError(f"Web search failed: {str(response)}")
+                    error.__cause__ = response
+                results[i] = error
+                first_error = first_error or error
+                continue
+            if isinstance(response, dict) and not shared:
+                to_store.append((normalized[i], response))
+            results[i] = self._parse_response(normalized[i], response, include_answer, include_images)
+        
+        # Cache whatever succeeded, even if another query failed
+        if self.search_cache and to_store:
+            await asyncio.to_thread(self.search_cache.put_many, to_store, search_depth, max_results)
+        
+        if first_error is not None and not return_exceptions:
+            raise first_error
+        return results
+
+    def _get_stale(
+        self,
+        query: str,
+        max_results: int,
+        search_depth: str,
+        include_answer: bool,
+        include_images: bool,
+        include_raw_content: bool,
+        days: Optional[int],
+    ) -> Optional[SearchResponse]:
+        """Serve an entry from the cache's stale window and schedule its refresh."""
+        if getattr(self.search_cache, "stale_grace_hours", 0) <= 0:
+            return None
+        payload = self.search_cache.get_stale(query, search_depth, max_results)
+        if payload is None:
+            return None
+        self._schedule_refresh(query, max_results, search_depth,
+                               include_answer, include_images, include_raw_content, days)
+        return self._parse_response(query, payload, include_answer, include_images,
+                                    cache_hit=True, stale=True)
+
+    def _schedule_refresh(
+        self,
+        query: str,
+        max_results: int,
+        search_depth: str,
+        include_answer: bool,
+        include_images: bool,
+        include_raw_content: bool,
+        days: Optional[int],
+    ) -> Optional[threading.Thread]:
+        """
+        Re-fetch a stale entry in a daemon thread and store the fresh result.
+        
+        At most one refresh per cache key runs at a time in this process. A
+        thread (not an asyncio task) is used so the refresh survives the
+        caller's event loop, which the web app closes after each research run.
+        The thread runs the fetch on its own loop through ``_fetch_shared``,
+        so it gets the transport, deadline, hedging and single-flight of a
+        normal search.
+        """
+        key = self.search_cache._make_key(query, search_depth, max_results)
+        with _refreshing_lock:
+            if key in _refreshing:
+                return None
+            _refreshing.add(key)
+
+        def refresh():
+            # Not asyncio.run: it would wait for a hung executor call past the deadline
+            loop = asyncio.new_event_loop()
+            try:
+                response, shared = loop.run_until_complete(self._fetch_shared(
+                    query, max_results, search_depth,
+                    include_answer, include_images, include_raw_content, days
+                ))
+                # A shared response is stored by the search that led the flight
+                if isinstance(response, dict) and not shared:
+                    self.search_cache.put(query, search_depth, max_results, response)
+                    self.logger.info("Refreshed stale search result", query=query)
+            except Exception as e:
+                self.logger.warning("Background refresh failed", query=query, error=str(e))
+            finally:
+                loop.close()
+                with _refreshing_lock:
+                    _refreshing.discard(key)
+
+        thread = threading.Thread(target=refresh, name="search-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    async def _fetch_shared(
+        self,
+        query: str,
+        max_results: int,
+        search_depth: str,
+        include_answer: bool,
+        include_images: bool,
+        include_raw_content: bool,
+        days: Optional[int],
+    ) -> tuple:
+        """
+        ``_fetch`` through the single-flight layer. Returns (response, shared).
+        
+        ``shared`` is True when the response came from an identical call
+        already in flight, whose caller is responsible for caching it. Only
+        calls with the same Tavily key are merged, so each user is billed for
+        (and sees the errors of) their own key.
+        """
+        key = (self._key_id, SearchCache._make_key(query, search_depth, max_results),
+               include_answer, include_images, include_raw_content, days)
+        return await self.single_flight.do(
+            key,
+            lambda: self._fetch(query, max_results, search_depth,
+                                include_answer, include_images, include_raw_content, days),
+        )
+
+    async def _fetch(
+        self,
+        query: str,
+        max_results: int,
+        search_depth: str,
+        include_answer: bool,
+        include_images: bool,
+        include_raw_content: bool,
+        days: Optional[int],
+    ) -> Dict[str, Any]:
+        """Call Tavily search through the configured transport, with deadline and hedging."""
+        call = lambda: self.transport.search(
+            query=query,
+            search_depth=search_depth,
+            max_results=max_results,
+            include_answer=include_answer,
+            include_images=include_images,
+            include_raw_content=include_raw_content,
+            days=days
+        )
+        latency = self.latency_tracker or search_latency.get(search_depth)
+        delay = latency.percentile(self.hedge_percentile) if self.hedge_percentile else None
+        try:
+            return await self._with_deadline(hedged(call, delay, latency))
+        except SearchTimeoutError:
+            latency.record(self.timeout)
+            raise
+
+    async def _with_deadline(self, awaitable):
+        """Await a Tavily call, raising ``SearchTimeoutError`` past ``self.timeout``."""
+        if self.timeout is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, self.timeout)
+        except asyncio.TimeoutError as e:
+            raise SearchTimeoutError(f"Tavily did not answer within {self.timeout:g}s") from e
+
     def _parse_response(
         self,
         query: str,
@@ -131,6 +413,7 @@ class WebSearchTool:
         include_answer: bool = True,
         include_images: bool = False,
         cache_hit: bool = False,
+        stale: bool = False,
     ) -> SearchResponse:
         """Parse a raw Tavily response dict into a SearchResponse."""
         results = []
@@ -162,6 +445,7 @@ class WebSearchTool:
             search_context=self._normalize_text(response.get("search_context", "")),
             images=response.get("images", []) if include_images else None,
             cache_hit=cache_hit,
+            stale=stale,
         )
 
         self.logger.info(
@@ -170,6 +454,7 @@ class WebSearchTool:
             results_count=len(results),
             has_answer=bool(search_response.answer),
             cache_hit=cache_hit,
+            stale=stale,
         )
 
         return search_response
@@ -192,18 +477,23 @@ class WebSearchTool:
             Concatenated search context suitable for RAG
         """
         self.logger.info("Getting search context", query=query)
+        key = self._normalize_text(query).strip().lower()
+        if self.search_cache:
+            cached = await asyncio.to_thread(self.search_cache.get_entry, "context", key,
+                                             search_depth, max_results)
+            if cached is not None:
+                return cached
         
         try:
-            loop = asyncio.get_event_loop()
-            context = await loop.run_in_executor(
-                None,
-                lambda: self.client.get_search_context(
-                    query=query,
-                    search_depth=search_depth,
-                    max_results=max_results
-                )
-            )
+            context = await self._with_deadline(self.transport.get_search_context(
+                query=query,
+                max_results=max_results,
+                search_depth=search_depth
+            ))
             
+            if self.search_cache and isinstance(context, str):
+                await asyncio.to_thread(self.search_cache.put_entry, "context", key, context,
+                                        search_depth, max_results)
             self.logger.info("Search context retrieved", query=query, context_length=len(context))
             return context
             
@@ -222,14 +512,18 @@ class WebSearchTool:
             Direct answer string
         """
         self.logger.info("Performing QnA search", query=query)
+        key = self._normalize_text(query).strip().lower()
+        if self.search_cache:
+            cached = await asyncio.to_thread(self.search_cache.get_entry, "qna", key)
+            if cached is not None:
+                return cached
         
         try:
-            loop = asyncio.get_event_loop()
-            answer = await loop.run_in_executor(
-                None,
-                lambda: self.client.qna_search(query=query)
-            )
+            answer = await self._with_deadline(self.transport.qna_search(query))
             
+            # An empty answer is not worth keeping for the whole TTL
+            if self.search_cache and isinstance(answer, str) and answer:
+                await asyncio.to_thread(self.search_cache.put_entry, "qna", key, answer)
             self.logger.info("QnA search completed", query=query, answer_length=len(answer))
             return answer
             
@@ -248,14 +542,18 @@ class WebSearchTool:
             Extracted content as string
         """
         self.logger.info("Extracting URL content", url=url)
+        key = canonical_url(url)
+        if self.search_cache:
+            cached = await asyncio.to_thread(self.search_cache.get_entry, "extract", key)
+            if cached is not None:
+                return cached
         
         try:
-            loop = asyncio.get_event_loop()
-            content = await loop.run_in_executor(
-                None,
-                lambda: self.client.extract(url=url)
-            )
+            content = await self._with_deadline(self.transport.extract(url))
             
+            # Pages that failed to extract are retried next time
+            if self.search_cache and isinstance(content, dict) and content.get("results"):
+                await asyncio.to_thread(self.search_cache.put_entry, "extract", key, content)
             self.logger.info("URL content extracted", url=url, content_length=len(content))
             return content
             
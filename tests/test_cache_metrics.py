@@ -0,0 +1,195 @@
+"""
+Tests for per-minute cache telemetry.
+"""
+
+import pytest
+import sqlite3
+from unittest.mock import patch
+
+from src.tools.cache_metrics import (
+    LATENCY_BUCKETS_MS, MetricsBuffer, ensure_metrics_table, histogram_quantile,
+    prune_metrics, query_metrics, write_metrics,
+)
+from src.tools.search_cache import SearchCache
+
+
+@pytest.fixture
+def conn():
+    c = sqlite3.connect(":memory:")
+    ensure_metrics_table(c)
+    yield c
+    c.close()
+
+
+class TestMetricsBuffer:
+
+    def test_groups_by_minute(self):
+        buffer = MetricsBuffer()
+        buffer.record("hits", 120.0, 1.5)
+        buffer.record("misses", 130.0, 30.0)
+        buffer.record("hits", 180.0, 0.1, count=3)
+        pending = buffer.drain()
+        assert set(pending) == {2, 3}
+        assert pending[2]["hits"] == 1 and pending[2]["misses"] == 1
+        assert pending[3]["hits"] == 3
+        assert sum(pending[3]["latency"]) == 3
+        assert len(buffer) == 0
+
+    def test_requeue_merges(self):
+        buffer = MetricsBuffer()
+        buffer.record("hits", 60.0, 1.0)
+        pending = buffer.drain()
+        buffer.record("hits", 60.0, 1.0)
+        buffer.requeue(pending)
+        assert buffer.drain()[1]["hits"] == 2
+
+
+class TestHistogramQuantile:
+
+    def test_empty(self):
+        assert histogram_quantile([0] * (len(LATENCY_BUCKETS_MS) + 1), 0.5) is None
+
+    def test_interpolates_within_bucket(self):
+        counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        counts[LATENCY_BUCKETS_MS.index(10)] = 10  # all samples in (5, 10]
+        assert histogram_quantile(counts, 0.5) == pytest.approx(7.5)
+        assert histogram_quantile(counts, 1.0) == pytest.approx(10)
+
+    def test_overflow_reports_lower_bound(self):
+        counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        counts[-1] = 4
+        assert histogram_quantile(counts, 0.95) == LATENCY_BUCKETS_MS[-1]
+
+
+class TestMetricsStore:
+
+    def test_write_merges_repeated_flushes(self, conn):
+        for _ in range(2):
+            buffer = MetricsBuffer()
+            buffer.record("hits", 600.0, 2.0)
+            write_metrics(conn, "w1", buffer.drain())
+        assert conn.execute("SELECT COUNT(*), SUM(hits) FROM cache_metrics").fetchone() == (1, 2)
+
+    def test_query_aggregates_workers_and_intervals(self, conn):
+        for worker, minute, event in (("w1", 0, "hits"), ("w2", 1, "misses"),
+                                      ("w2", 2, "semantic_hits"), ("w1", 5, "misses")):
+            buffer = MetricsBuffer()
+            buffer.record(event, minute * 60.0, 1.0)
+            write_metrics(conn, worker, buffer.drain())
+
+        report = query_metrics(conn, 0, 600, bucket_minutes=5)
+        assert [row["start"] for row in report] == [0, 300]
+        assert report[0]["lookups"] == 3
+        assert report[0]["hit_ratio"] == pytest.approx(2 / 3)
+        assert 0.5 < report[0]["p50_ms"] <= 1
+        assert report[1]["hit_ratio"] == 0.0
+
+    def test_prune(self, conn):
+        buffer = MetricsBuffer()
+        buffer.record("hits", 60.0)
+        buffer.record("hits", 6000.0)
+        write_metrics(conn, "w1", buffer.drain())
+        assert prune_metrics(conn, 3000.0) == 1
+
+
+    def test_write_takes_lock_before_reading(self, tmp_path):
+        path = str(tmp_path / "metrics.db")
+        first, second = sqlite3.connect(path), sqlite3.connect(path, timeout=0)
+        ensure_metrics_table(first)
+        first.commit()
+        buffer = MetricsBuffer()
+        buffer.record("hits", 600.0, 2.0)
+        write_metrics(first, "w1", buffer.drain())
+        buffer.record("hits", 600.0, 2.0)
+        statements = []
+        second.set_trace_callback(statements.append)
+        # The concurrent flush cannot read the row until the first one commits
+        with pytest.raises(sqlite3.OperationalError):
+            write_metrics(second, "w1", buffer.drain())
+        assert not any(s.startswith("SELECT") for s in statements)
+        first.commit()
+        first.close()
+        second.close()
+
+    def test_namespaces_kept_apart(self, conn):
+        for namespace in ("search", "extract"):
+            buffer = MetricsBuffer()
+            buffer.record("hits" if namespace == "search" else "misses", 600.0, 2.0)
+            write_metrics(conn, "w1", buffer.drain(), namespace)
+        assert query_metrics(conn, 0, 900)[0]["hits"] == 1
+        assert query_metrics(conn, 0, 900, namespace="extract")[0]["misses"] == 1
+
+    def test_legacy_table_migrated(self):
+        c = sqlite3.connect(":memory:")
+        c.execute("""
+            CREATE TABLE cache_metrics (
+                minute INTEGER NOT NULL, worker TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0, misses INTEGER NOT NULL DEFAULT 0,
+                semantic_hits INTEGER NOT NULL DEFAULT 0, stale_hits INTEGER NOT NULL DEFAULT 0,
+                latency_hist TEXT NOT NULL, PRIMARY KEY (minute, worker)
+            )
+        """)
+        c.execute("INSERT INTO cache_metrics VALUES (10, 'w1', 3, 1, 0, 0, '[]')")
+        ensure_metrics_table(c)
+        assert c.execute("SELECT namespace, hits FROM cache_metrics").fetchall() == [("search", 3)]
+        c.close()
+
+class TestSearchCacheMetrics:
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        c = SearchCache(cache_path=str(tmp_path / "metrics.db"), l1_size=8)
+        yield c
+        c.close()
+
+    def test_records_lookups(self, cache):
+        cache.put("quantum computing", "basic", 5, {"results": []})
+        cache.get("quantum computing", "basic", 5)   # L2 hit
+        cache.get("quantum computing", "basic", 5)   # L1 hit
+        cache.get("protein folding", "basic", 5)     # miss
+        cache.get_many(["quantum computing", "ocean warming"], "basic", 5)
+
+        report = cache.get_metrics(since_hours=1, bucket_minutes=60)
+        assert len(report) == 1
+        assert report[0]["hits"] == 3
+        assert report[0]["misses"] == 2
+        assert report[0]["hit_ratio"] == pytest.approx(0.6)
+        assert report[0]["p95_ms"] is not None
+
+    def test_survives_restart_and_aggregates_workers(self, cache):
+        cache.get("protein folding", "basic", 5)
+        cache.close()
+
+        other = SearchCache(cache_path=str(cache.cache_path))
+        with patch("src.tools.search_cache.worker_id", return_value="other-worker"):
+            other.get("protein folding", "basic", 5)
+            report = other.get_metrics(since_hours=1)
+        with other._connect() as conn:
+            assert conn.execute("SELECT COUNT(DISTINCT worker) FROM cache_metrics").fetchone()[0] == 2
+        assert report[0]["misses"] == 2
+        other.close()
+
+    def test_caches_in_one_process_keep_own_rows(self, cache):
+        other = SearchCache(cache_path=str(cache.cache_path))
+        for _ in range(3):
+            cache.get("protein folding", "basic", 5)
+            other.get("protein folding", "basic", 5)
+        cache.flush_metrics()
+        other.flush_metrics()
+        with cache._connect() as conn:
+            assert conn.execute("SELECT COUNT(DISTINCT worker), SUM(misses) FROM cache_metrics").fetchone() == (2, 6)
+        other.close()
+
+    def test_disabled(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "off.db"), record_metrics=False)
+        cache.get("protein folding", "basic", 5)
+        assert cache.get_metrics() == []
+        cache.close()
+
+    def test_sweep_prunes_old_metrics(self, cache):
+        cache.get("protein folding", "basic", 5)
+        cache.flush_metrics()
+        cache.metrics_retention_days = -1  # cutoff a day in the future
+        cache.sweep()
+        with cache._connect() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM cache_metrics").fetchone()[0] == 0
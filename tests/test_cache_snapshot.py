@@ -0,0 +1,193 @@
+"""
+Tests for cache snapshot export/import.
+"""
+
+import pytest
+import sqlite3
+import time
+
+from src.tools.cache_snapshot import export_snapshot, import_snapshot
+from src.tools.embeddings import HashEmbedding
+from src.tools.search_cache import SearchCache
+from src.tools.translation import TranslationResult
+from src.tools.translation_cache import TranslationCache
+
+
+def _response(n):
+    return {"results": [{"title": f"Result {n}", "url": f"https://example.com/{n}",
+                         "content": f"Body of page {n}. " * 20}]}
+
+
+@pytest.fixture
+def source(tmp_path):
+    cache = SearchCache(cache_path=str(tmp_path / "source.db"), hit_flush_every=1)
+    cache.put("popular query", "basic", 5, _response(1))
+    cache.put("rare query", "basic", 5, _response(2))
+    for _ in range(3):
+        cache.get("popular query", "basic", 5)
+    yield cache
+    cache.close()
+
+
+class TestCacheSnapshot:
+    """Round trips between a source cache and a fresh one."""
+
+    def test_round_trip(self, source, tmp_path):
+        snapshot = tmp_path / "snapshot.db"
+        exported = export_snapshot(snapshot, source)
+        assert exported["entries"] == 2
+        assert exported["documents"] == 2
+        assert exported["bytes"] == snapshot.stat().st_size
+
+        target = SearchCache(cache_path=str(tmp_path / "target.db"))
+        imported = import_snapshot(snapshot, target)
+        assert imported["entries"] == 2
+        assert imported["documents"] == 2
+        assert target.get("popular query", "basic", 5) == _response(1)
+        assert target.get("rare query", "basic", 5) == _response(2)
+        target.close()
+
+    def test_filters_by_popularity_and_age(self, source, tmp_path):
+        snapshot = tmp_path / "snapshot.db"
+        assert export_snapshot(snapshot, source, min_hits=1)["entries"] == 1
+        assert export_snapshot(snapshot, source, limit=1)["entries"] == 1
+
+        with source._connect() as conn:
+            conn.execute("UPDATE search_cache SET created_at = ? WHERE query_text = 'rare query'",
+                         (time.time() - 7200,))
+        exported = export_snapshot(snapshot, source, max_age_hours=1)
+        assert exported["entries"] == 1
+        assert exported["documents"] == 1
+
+        target = SearchCache(cache_path=str(tmp_path / "target.db"))
+        import_snapshot(snapshot, target)
+        assert target.get("popular query", "basic", 5) is not None
+        assert target.get("rare query", "basic", 5) is None
+        target.close()
+
+    def test_skips_expired_entries(self, source, tmp_path):
+        with source._connect() as conn:
+            conn.execute("UPDATE search_cache SET expires_at = ? WHERE query_text = 'rare query'",
+                         (time.time() - 1,))
+        assert export_snapshot(tmp_path / "snapshot.db", source)["entries"] == 1
+
+    def test_import_keeps_existing_entries(self, source, tmp_path):
+        snapshot = tmp_path / "snapshot.db"
+        export_snapshot(snapshot, source)
+
+        target = SearchCache(cache_path=str(tmp_path / "target.db"))
+        target.put("popular query", "basic", 5, {"results": [], "local": True})
+        imported = import_snapshot(snapshot, target)
+        assert imported["entries"] == 1
+        assert target.get("popular query", "basic", 5) == {"results": [], "local": True}
+
+        # Importing the same snapshot again is a no-op
+        assert import_snapshot(snapshot, target)["entries"] == 0
+        target.close()
+
+    @pytest.mark.asyncio
+    async def test_includes_translation_cache(self, source, tmp_path):
+        translations = TranslationCache(cache_path=str(tmp_path / "tc_source.db"))
+        await translations.store_translation(TranslationResult(
+            original_text="Hello world", translated_text="Pozdravljen svet",
+            source_language="en", target_language="sl",
+            confidence_score=0.9, provider="test",
+        ), provider="test")
+
+        snapshot = tmp_path / "snapshot.db"
+        assert export_snapshot(
+            snapshot, source, translation_cache_path=tmp_path / "tc_source.db"
+        )["translations"] == 1
+
+        target = SearchCache(cache_path=str(tmp_path / "target.db"))
+        imported = import_snapshot(snapshot, target, translation_cache_path=tmp_path / "tc_target.db")
+        assert imported["translations"] == 1
+        cached = await TranslationCache(cache_path=str(tmp_path / "tc_target.db")).get_translation(
+            "Hello world", "sl", "en", "test"
+        )
+        assert cached is not None
+        assert cached.translated_text == "Pozdravljen svet"
+        target.close()
+
+    def test_failed_import_rolls_back(self, source, tmp_path):
+        snapshot = tmp_path / "snapshot.db"
+        export_snapshot(snapshot, source)
+        with sqlite3.connect(snapshot) as conn:
+            conn.execute("DROP TABLE search_documents")
+        conn.close()
+
+        target = SearchCache(cache_path=str(tmp_path / "target.db"))
+        with pytest.raises(sqlite3.Error):
+            import_snapshot(snapshot, target)
+        assert target.get_stats()["entries"] == 0
+        target.close()
+
+    def test_missing_snapshot(self, tmp_path):
+        target = SearchCache(cache_path=str(tmp_path / "target.db"))
+        with pytest.raises(FileNotFoundError):
+            import_snapshot(tmp_path / "missing.db", target)
+        target.close()
+
+
+class TestCacheSnapshotVectors:
+    """Vectors are copied when signatures match and re-embedded otherwise."""
+
+    def _source(self, tmp_path, provider):
+        cache = SearchCache(cache_path=str(tmp_path / "source.db"), embedding_provider=provider)
+        if not cache._vec_available:
+            pytest.skip("sqlite-vec not loadable")
+        cache.put_many([("quantum computing trends", _response(1)),
+                        ("ocean warming data", _response(2))], "basic", 5)
+        return cache
+
+    def _vector_count(self, cache):
+        with cache._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {cache._vec_table}").fetchone()[0]
+
+    def test_copies_vectors_for_same_signature(self, tmp_path):
+        source = self._source(tmp_path, HashEmbedding(dimensions=256))
+        snapshot = tmp_path / "snapshot.db"
+        assert export_snapshot(snapshot, source)["vectors"] == 2
+
+        target = SearchCache(cache_path=str(tmp_path / "target.db"),
+                             embedding_provider=HashEmbedding(dimensions=256))
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(target, "_embed_many", lambda *a, **k: pytest.fail("re-embedded"))
+            imported = import_snapshot(snapshot, target)
+        assert imported["vectors"] == 2
+        assert imported["vectors_rebuilt"] == 0
+        assert self._vector_count(target) == 2
+        assert target.get("quantum computing trend", "basic", 5) == _response(1)
+        target.close()
+        source.close()
+
+    def test_quantized_vectors_round_trip(self, tmp_path):
+        source = SearchCache(cache_path=str(tmp_path / "source.db"),
+                             embedding_provider=HashEmbedding(), vector_quantization="int8")
+        if not source._vec_available:
+            pytest.skip("sqlite-vec not loadable")
+        source.put("quantum computing trends", "basic", 5, _response(1))
+        snapshot = tmp_path / "snapshot.db"
+        assert export_snapshot(snapshot, source)["vectors"] == 1
+
+        target = SearchCache(cache_path=str(tmp_path / "target.db"),
+                             embedding_provider=HashEmbedding(), vector_quantization="int8")
+        imported = import_snapshot(snapshot, target)
+        assert imported["vectors"] == 1
+        assert imported["vectors_rebuilt"] == 0
+        assert target.get("quantum computing trend", "basic", 5) == _response(1)
+        target.close()
+        source.close()
+
+    def test_rebuilds_vectors_for_other_dimensions(self, tmp_path):
+        source = self._source(tmp_path, HashEmbedding(dimensions=256))
+        snapshot = tmp_path / "snapshot.db"
+        export_snapshot(snapshot, source)
+
+        target = SearchCache(cache_path=str(tmp_path / "target.db"),
+                             embedding_provider=HashEmbedding(dimensions=128))
+        imported = import_snapshot(snapshot, target)
+        assert imported["vectors_rebuilt"] == 2
+        assert self._vector_count(target) == 2
+        target.close()
+        source.close()
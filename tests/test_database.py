@@ -337,6 +337,65 @@ class TestSQLiteWriter:
         assert research["total_queries"] == 2
         assert research["total_sources"] == 8
     
+    @pytest.mark.asyncio
+    async def test_sources_share_documents(self, sqlite_writer):
+        """The same page (modulo tracking params) is stored once across researches."""
+        def research_data(topic, url, content):
+            return {"research_data": {
+                "topic": topic,
+                "agent_name": "TestAgent",
+                "queries": [{
+                    "query_text": topic,
+                    "sources": [
+                        {"title": "Shared", "url": url, "content": content, "score": 0.9},
+                        {"title": "No content", "url": "https://example.com/empty", "content": ""},
+                    ],
+                }],
+            }}
+        
+        first = await sqlite_writer.save_report("r1", "r1", research_data(
+            "AI safety", "https://Example.com/ai/?utm_source=x", "Shared article text"))
+        await sqlite_writer.save_report("r2", "r2", research_data(
+            "AI policy", "https://example.com/ai", "Shared article text"))
+        await sqlite_writer.save_report("r3", "r3", research_data(
+            "AI news", "https://example.com/ai", "Updated article text"))
+        
+        stats = sqlite_writer.get_database_stats()
+        assert stats["total_sources"] == 6
+        assert stats["total_documents"] == 2
+        
+        details = sqlite_writer.get_research_with_details(int(first.split(":")[1]))
+        sources = details["queries"][0]["sources"]
+        assert sources[0]["content"] == "Shared article text"
+        assert sources[0]["document_id"] is not None
+        assert sources[1]["document_id"] is None
+        
+        sqlite_writer.delete_research(int(first.split(":")[1]))
+        assert sqlite_writer.get_database_stats()["total_documents"] == 2
+    
+    def test_adds_document_column_to_existing_database(self, temp_db_path):
+        """Databases created before documents existed gain sources.document_id."""
+        import sqlite3
+        conn = sqlite3.connect(temp_db_path)
+        conn.execute("""
+            CREATE TABLE sources (
+                id INTEGER PRIMARY KEY, research_id INTEGER NOT NULL, query_id INTEGER NOT NULL,
+                title VARCHAR(1000) NOT NULL, url VARCHAR(2000) NOT NULL, content TEXT,
+                relevance_score FLOAT, published_date VARCHAR(20), retrieved_at DATETIME NOT NULL,
+                content_length INTEGER, domain VARCHAR(200), used_in_analysis BOOLEAN
+            )
+        """)
+        conn.close()
+        
+        writer = SQLiteWriter(database_path=temp_db_path)
+        conn = sqlite3.connect(temp_db_path)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(sources)")}
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(sources)")}
+        conn.close()
+        writer.db_manager.engine.dispose()
+        assert "document_id" in columns
+        assert "ix_sources_document_id" in indexes
+    
     def test_get_research_history(self, sqlite_writer):
         """Test research history retrieval."""
         # First ensure we have no data
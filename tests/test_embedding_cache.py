@@ -0,0 +1,117 @@
+"""
+Tests for the persistent text -> embedding cache.
+"""
+
+import pytest
+import sqlite3
+from unittest.mock import patch
+
+from src.tools.embedding_cache import CachedEmbedding, EmbeddingStore, provider_identity, text_hash
+from src.tools.embeddings import HashEmbedding
+from src.tools.search_cache import SearchCache
+
+
+class CountingEmbedding(HashEmbedding):
+    """HashEmbedding that records every batch it embeds."""
+
+    def __init__(self, dimensions=256):
+        super().__init__(dimensions=dimensions)
+        self.batches = []
+
+    def embed_batch(self, texts):
+        self.batches.append(list(texts))
+        return super().embed_batch(texts)
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = EmbeddingStore(str(tmp_path / "embeddings.db"))
+    yield s
+    s.close()
+
+
+class TestEmbeddingStore:
+
+    def test_round_trip_per_identity(self, store):
+        identity = ("HashEmbedding", "hash-256", 256)
+        store.put_many(identity, [(text_hash("a"), b"\x01"), (text_hash("b"), b"\x02")])
+        assert store.get_many(identity, [text_hash("a"), text_hash("c")]) == {text_hash("a"): b"\x01"}
+        assert store.get_many(("HashEmbedding", "hash-128", 128), [text_hash("a")]) == {}
+
+    def test_existing_rows_kept(self, store):
+        identity = ("P", "m", 1)
+        store.put_many(identity, [("k", b"old")])
+        store.put_many(identity, [("k", b"new")])
+        assert store.get_many(identity, ["k"]) == {"k": b"old"}
+        assert len(store) == 1
+
+    def test_evicts_oldest_past_cap(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path / "capped.db"), max_entries=10)
+        identity = ("P", "m", 1)
+        for i in range(11):
+            with patch("src.tools.embedding_cache.time.time", return_value=1000.0 + i):
+                store.put_many(identity, [(f"k{i}", b"x")])
+        assert len(store) == 9
+        assert store.get_many(identity, ["k0", "k1", "k10"]) == {"k10": b"x"}
+        store.close()
+
+
+class TestCachedEmbedding:
+
+    def test_delegates_identity(self):
+        cached = CachedEmbedding(HashEmbedding(dimensions=128))
+        assert cached.signature == "hash-128"
+        assert cached.dimensions == 128
+        assert cached.recommended_threshold == HashEmbedding().recommended_threshold
+        assert provider_identity(cached.provider) == ("HashEmbedding", "hash-128", 128)
+
+    def test_same_vectors_and_one_batch_for_misses(self):
+        provider = CountingEmbedding()
+        cached = CachedEmbedding(provider)
+        texts = ["quantum computing", "ocean warming", "quantum computing"]
+        assert cached.embed_batch(texts) == HashEmbedding().embed_batch(texts)
+        assert provider.batches == [["quantum computing", "ocean warming"]]
+
+        assert cached.embed(" ocean warming ") == HashEmbedding().embed("ocean warming")
+        assert len(provider.batches) == 1
+        assert (cached.hits, cached.misses) == (2, 2)
+
+    def test_persists_across_instances(self, store):
+        CachedEmbedding(CountingEmbedding(), store=store).embed_batch(["quantum computing"])
+
+        provider = CountingEmbedding()
+        restarted = CachedEmbedding(provider, store=store)
+        assert restarted.embed("quantum computing") == HashEmbedding().embed("quantum computing")
+        assert provider.batches == []
+
+    def test_store_shared_across_dimensions(self, store):
+        CachedEmbedding(CountingEmbedding(256), store=store).embed("quantum computing")
+        provider = CountingEmbedding(128)
+        CachedEmbedding(provider, store=store).embed("quantum computing")
+        assert provider.batches == [["quantum computing"]]
+        assert len(store) == 2
+
+    def test_store_errors_fall_through(self, store):
+        provider = CountingEmbedding()
+        cached = CachedEmbedding(provider, store=store)
+        with patch.object(store, "get_many", side_effect=sqlite3.OperationalError("locked")), \
+             patch.object(store, "put_many", side_effect=sqlite3.OperationalError("locked")):
+            assert cached.embed("quantum computing") == HashEmbedding().embed("quantum computing")
+        assert provider.batches == [["quantum computing"]]
+
+    def test_search_cache_uses_wrapped_provider(self, tmp_path, store):
+        plain = SearchCache(cache_path=str(tmp_path / "plain.db"), embedding_provider=HashEmbedding())
+        provider = CountingEmbedding()
+        cache = SearchCache(cache_path=str(tmp_path / "cached.db"),
+                            embedding_provider=CachedEmbedding(provider, store=store))
+        # Same vector space, so an existing index is reused as-is
+        assert cache._vec_table == plain._vec_table
+        if not cache._vec_available:
+            pytest.skip("sqlite-vec not loadable")
+        cache.put("quantum computing basics", "basic", 5, {"n": 1})
+        cache.get("quantum computing basics guide", "basic", 5)
+        cache._embedding_memo.clear()
+        cache.get("quantum computing basics guide", "basic", 5)
+        assert provider.batches == [["quantum computing basics"], ["quantum computing basics guide"]]
+        plain.close()
+        cache.close()
@@ -0,0 +1,201 @@
+"""
+Tests for the corpus-trained IDF embedding provider and provider selection.
+"""
+
+import pytest
+import random
+import sqlite3
+import threading
+import numpy as np
+from unittest.mock import patch
+
+from src.tools.embeddings import (
+    EmbeddingProviderRegistry, HashEmbedding, ReducedEmbedding, create_embedding_provider,
+)
+from src.tools.idf_embedding import IDFEmbedding, load_corpus
+from src.tools.search_cache import SearchCache
+
+TEMPLATES = ["latest {} trends 2025", "{} market analysis", "introduction to {}",
+             "{} research overview", "what is {}", "future of {}"]
+
+
+def _corpus(n_topics=150, seed=0):
+    rng = random.Random(seed)
+    words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(7)) for _ in range(200)]
+    topics = [f"{rng.choice(words)} {rng.choice(words)}" for _ in range(n_topics)]
+    return topics, [rng.choice(TEMPLATES).format(t) for t in topics for _ in range(3)]
+
+
+def _cos(provider, a, b):
+    x, y = (np.frombuffer(e, dtype=np.float32) for e in provider.embed_batch([a, b]))
+    return float(x @ y)
+
+
+@pytest.fixture(scope="module")
+def trained():
+    topics, corpus = _corpus()
+    return topics, IDFEmbedding.fit(corpus)
+
+
+class TestIDFEmbedding:
+
+    def test_rare_tokens_weigh_more(self, trained):
+        _, model = trained
+        common = model.weights[model._slot("latest") >> 1]
+        unseen = model.weights[model._slot("zzzunseen") >> 1]
+        assert common < unseen
+
+    def test_separates_topics_better_than_hash(self, trained):
+        topics, model = trained
+        margins = {}
+        for name, provider in (("idf", model), ("hash", HashEmbedding())):
+            same = np.mean([_cos(provider, f"latest {t} trends 2025", f"introduction to {t}") for t in topics[:30]])
+            other = np.mean([_cos(provider, f"latest {a} trends 2025", f"latest {b} trends 2025")
+                             for a, b in zip(topics[:30], topics[30:60])])
+            margins[name] = same - other
+        assert margins["idf"] > 0.2
+        assert margins["idf"] > margins["hash"]
+
+    def test_vectors_normalized(self, trained):
+        _, model = trained
+        embeddings = model.embed_batch(["quantum computing", "", "!!!"])
+        assert np.linalg.norm(np.frombuffer(embeddings[0], dtype=np.float32)) == pytest.approx(1.0, abs=1e-5)
+        assert not np.frombuffer(embeddings[1], dtype=np.float32).any()
+        assert model.embed("quantum computing") == embeddings[0]
+        assert len(embeddings[0]) == model.dimensions * 4
+
+    def test_char_ngrams(self):
+        model = IDFEmbedding(np.ones(64, dtype=np.float32), char_ngrams=3)
+        assert model._tokenize("AI safety") == [
+            "ai", "safety", "ai_safety", "~#ai", "~ai#", "~#sa", "~saf", "~afe", "~fet", "~ety", "~ty#",
+        ]
+
+    def test_save_load_round_trip(self, trained, tmp_path):
+        _, model = trained
+        path = model.save(tmp_path / "idf.npy", documents=450)
+        loaded = IDFEmbedding.load(path)
+        assert isinstance(loaded.weights, np.memmap)
+        assert loaded.signature == model.signature
+        assert loaded.char_ngrams == 3
+        assert loaded.embed_batch(["quantum computing basics"]) == model.embed_batch(["quantum computing basics"])
+
+    def test_signature_tracks_weights(self, trained):
+        _, model = trained
+        _, other_corpus = _corpus(seed=1)
+        assert IDFEmbedding.fit(other_corpus).signature != model.signature
+        assert model.signature.startswith("idf-256-")
+
+
+class TestLoadCorpus:
+
+    def test_reads_topics_queries_and_cache(self, tmp_path):
+        db = tmp_path / "research.db"
+        with sqlite3.connect(db) as conn:
+            conn.execute("CREATE TABLE research (id INTEGER PRIMARY KEY, topic TEXT)")
+            conn.execute("CREATE TABLE queries (id INTEGER PRIMARY KEY, query_text TEXT)")
+            conn.execute("INSERT INTO research (topic) VALUES ('ocean warming')")
+            conn.execute("INSERT INTO queries (query_text) VALUES ('ocean warming trends')")
+        conn.close()
+        cache = SearchCache(cache_path=str(tmp_path / "cache.db"))
+        cache.put("quantum computing", "basic", 5, {"results": []})
+        cache.put_entry("qna", "what is quantum computing?", "An answer")
+        cache.close()
+
+        corpus = load_corpus(db, tmp_path / "cache.db")
+        assert sorted(corpus) == ["ocean warming", "ocean warming trends", "quantum computing"]
+        assert load_corpus(tmp_path / "none.db") == []
+
+
+class TestProviderSelection:
+
+    def test_auto_prefers_trained_idf(self, tmp_path):
+        path = IDFEmbedding.fit(_corpus()[1]).save(tmp_path / "idf.npy")
+        provider = create_embedding_provider(idf_path=str(path))
+        assert isinstance(provider, IDFEmbedding)
+        assert create_embedding_provider(provider="hash", idf_path=str(path)).signature == "hash-256"
+
+    def test_missing_weights_fall_back_to_hash(self, tmp_path):
+        provider = create_embedding_provider(provider="idf", idf_path=str(tmp_path / "none.npy"))
+        assert type(provider) is HashEmbedding
+
+
+class FakeRemote(HashEmbedding):
+    """Stands in for OpenAIEmbedding; the key check blocks until released."""
+
+    instances = []
+
+    def __init__(self, api_key):
+        super().__init__(dimensions=64)
+        self.api_key = api_key
+        self.checks = 0
+        self.release = threading.Event()
+        self.fail = False
+        FakeRemote.instances.append(self)
+
+    @property
+    def signature(self):
+        return f"remote-{self.api_key}"
+
+    def embed(self, text):
+        self.checks += 1
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("invalid key")
+        return super().embed(text)
+
+
+class TestProviderRegistry:
+
+    @pytest.fixture
+    def registry(self, tmp_path):
+        FakeRemote.instances = []
+        with patch("src.tools.embeddings.OpenAIEmbedding", FakeRemote):
+            yield EmbeddingProviderRegistry(idf_path=str(tmp_path / "idf.npy"), openai_dimensions=None)
+
+    def test_no_key_uses_local(self, registry):
+        assert registry.get(None).signature == "hash-256"
+        assert registry.get(None) is registry.get(None)
+
+    def test_key_validated_in_background_once(self, registry):
+        first = registry.get("sk-a")   # returns while the check is still blocked
+        assert first.signature == "hash-256"
+        remote = FakeRemote.instances[0]
+        remote.release.set()
+        registry.wait()
+        assert registry.get("sk-a") is remote
+        assert registry.get("sk-a") is remote
+        assert remote.checks == 1
+        assert len(FakeRemote.instances) == 1
+
+    def test_failed_key_falls_back_and_rechecks_after_ttl(self, registry):
+        registry.get("sk-bad")
+        remote = FakeRemote.instances[0]
+        remote.fail = True
+        remote.release.set()
+        registry.wait()
+        assert registry.get("sk-bad").signature == "hash-256"
+        assert remote.checks == 1
+
+        registry.ttl_seconds = 0
+        remote.fail = False
+        registry.get("sk-bad")
+        registry.wait()
+        assert registry.get("sk-bad") is remote
+        assert remote.checks >= 2
+
+    def test_remote_vectors_reduced(self, tmp_path):
+        with patch("src.tools.embeddings.OpenAIEmbedding", FakeRemote):
+            registry = EmbeddingProviderRegistry(idf_path=str(tmp_path / "idf.npy"), openai_dimensions=32)
+            registry.get("sk-a")
+            FakeRemote.instances[-1].release.set()
+            registry.wait()
+            provider = registry.get("sk-a")
+        assert isinstance(provider, ReducedEmbedding)
+        assert provider.signature == "remote-sk-a-t32"
+
+    def test_local_picks_up_trained_weights_after_ttl(self, registry):
+        assert registry.local().signature == "hash-256"
+        IDFEmbedding.fit(_corpus()[1]).save(registry.idf_path)
+        assert registry.local().signature == "hash-256"  # still within TTL
+        registry.ttl_seconds = 0
+        assert isinstance(registry.local(), IDFEmbedding)
@@ -10,7 +10,7 @@ from unittest.mock import Mock, patch, AsyncMock
 from pathlib import Path
 
 from src.agents.research_agent import ResearchAgent
-from src.tools.web_search import WebSearchTool, SearchResponse, SearchResult
+from src.tools.web_search import WebSearchTool, SearchResponse, SearchResult, SearchTimeoutError
 from src.tools.report_writer import MarkdownWriter
 from src.utils.llm import LLMClient
 
@@ -171,6 +171,63 @@ class TestResearchAgent:
         assert len(responses) == 2  # Only successful searches
         assert len(research_agent.research_queries) == 2
     
+    @pytest.mark.asyncio
+    async def test_execute_searches_concurrently(self, research_agent, mock_web_search_tool):
+        """Concurrent searches stay bounded and keep queries/responses aligned."""
+        in_flight = {"now": 0, "max": 0}
+        delays = {"q1": 0.05, "q2": 0.01, "q3": 0.03, "q4": 0.0, "q5": 0.02}
+        
+        async def search(query, **kwargs):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(delays[query])
+            in_flight["now"] -= 1
+            if query == "q3":
+                raise Exception("Search failed")
+            return SearchResponse(query, [SearchResult(f"T-{query}", f"url-{query}", "c", 0.9)],
+                                  answer=f"answer {query}")
+        
+        mock_web_search_tool.search.side_effect = search
+        updates = []
+        research_agent.progress_callback = lambda step, progress, message, detail='', preview='': \
+            updates.append((progress, preview))
+        research_agent.search_concurrency = 2
+        
+        responses = await research_agent._execute_searches(list(delays))
+        
+        assert in_flight["max"] == 2
+        assert research_agent.research_queries == ["q1", "q2", "q4", "q5"]
+        assert [r.query for r in research_agent.all_search_responses] == research_agent.research_queries
+        assert [r.query for r in responses] == research_agent.research_queries
+        assert [r.url for r in research_agent.all_search_results] == ["url-q1", "url-q2", "url-q4", "url-q5"]
+        
+        progress = [p for p, _ in updates]
+        assert progress == sorted(progress)
+        assert progress[-1] == 50
+        # Rolling preview lists answers in query order, whatever the completion order
+        final_preview = updates[-1][1]
+        assert final_preview.index("answer q1") < final_preview.index("answer q2") < final_preview.index("answer q5")
+    
+    @pytest.mark.asyncio
+    async def test_failed_and_timed_out_searches_recorded(self, research_agent, mock_web_search_tool):
+        """Partial results carry on; failures are stored as unsuccessful queries."""
+        mock_web_search_tool.search.side_effect = [
+            SearchResponse("q1", [SearchResult("Title1", "url1", "content1", 0.9)]),
+            SearchTimeoutError("Tavily did not answer within 10s"),
+            Exception("Search failed"),
+        ]
+        
+        responses = await research_agent._execute_searches(["q1", "q2", "q3"])
+        
+        assert [r.query for r in responses] == ["q1"]
+        failed = research_agent.failed_search_responses
+        assert [(r.query, r.timed_out) for r in failed] == [("q2", True), ("q3", False)]
+        
+        rows = research_agent._prepare_queries_for_database()
+        assert [(row["query_text"], row["success"]) for row in rows] == [("q1", True), ("q2", False), ("q3", False)]
+        assert rows[1]["error_message"] == "Timed out: Tavily did not answer within 10s"
+        assert rows[2]["error_message"] == "Search failed"
+    
     @pytest.mark.asyncio
     async def test_analyze_sources(self, research_agent, mock_llm_client):
         """Test source analysis."""
@@ -138,3 +138,630 @@ class TestSearchCache:
 
         stats = cache.get_stats()
         assert stats["entries"] == 1
+
+
+class TestSearchCachePool:
+    """Tests for pooled, long-lived cache connections."""
+
+    def test_wal_mode_enabled(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "wal.db"))
+        with cache._connect() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        cache.close()
+
+    def test_connections_are_reused(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "reuse.db"))
+        with cache._connect() as first:
+            pass
+        cache.put("query", "basic", 5, {"results": []})
+        cache.get("query", "basic", 5)
+        with cache._connect() as again:
+            assert again is first
+        cache.close()
+
+    def test_concurrent_access_from_threads(self, tmp_path):
+        import threading
+
+        cache = SearchCache(cache_path=str(tmp_path / "threads.db"), pool_size=2)
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(20):
+                    cache.put(f"q{n}-{i}", "basic", 5, {"n": n, "i": i})
+                    assert cache.get(f"q{n}-{i}", "basic", 5) == {"n": n, "i": i}
+            except Exception as e:  # pragma: no cover - surfaced via assert below
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        assert cache.get_stats()["entries"] == 120
+        cache.close()
+
+    def test_pool_size_zero_disables_pooling(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "nopool.db"), pool_size=0)
+        cache.put("query", "basic", 5, {"results": []})
+        assert cache.get("query", "basic", 5) == {"results": []}
+        with cache._connect() as first:
+            pass
+        with cache._connect() as second:
+            assert second is not first
+
+
+class TestSearchCacheL1:
+    """Tests for the in-process L1 tier."""
+
+    @pytest.fixture
+    def tiered(self, tmp_path):
+        c = SearchCache(cache_path=str(tmp_path / "tiered.db"), l1_size=2, l1_ttl_seconds=60)
+        yield c
+        c.close()
+
+    def test_l1_disabled_by_default(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "plain.db"))
+        cache.put("query", "basic", 5, {"results": []})
+        cache.get("query", "basic", 5)
+        stats = cache.get_stats()
+        assert stats["l1_enabled"] is False
+        assert stats["l1_hits"] == 0
+        assert stats["l2_hits"] == 1
+
+    def test_put_populates_l1(self, tiered):
+        tiered.put("query", "basic", 5, {"results": [1]})
+        assert tiered.get("query", "basic", 5) == {"results": [1]}
+
+        stats = tiered.get_stats()
+        assert stats["l1_hits"] == 1
+        assert stats["l2_hits"] == 0
+        assert stats["session_hits"] == 1
+
+    def test_l2_hit_promoted_to_l1(self, tiered, tmp_path):
+        # Written by another process/worker: only present in L2
+        other = SearchCache(cache_path=str(tmp_path / "tiered.db"))
+        other.put("shared", "basic", 5, {"results": ["l2"]})
+        other.close()
+
+        assert tiered.get("shared", "basic", 5) == {"results": ["l2"]}
+        assert tiered.get("shared", "basic", 5) == {"results": ["l2"]}
+
+        stats = tiered.get_stats()
+        assert stats["l1_misses"] == 1
+        assert stats["l2_hits"] == 1
+        assert stats["l1_hits"] == 1
+
+    def test_lru_eviction_falls_back_to_l2(self, tiered):
+        for name in ("a", "b", "c"):
+            tiered.put(name, "basic", 5, {"name": name})
+
+        assert tiered.get_stats()["l1_entries"] == 2
+        # "a" was evicted from L1 but is still served by L2
+        assert tiered.get("a", "basic", 5) == {"name": "a"}
+        stats = tiered.get_stats()
+        assert stats["l2_hits"] == 1
+        assert stats["l1_hits"] == 0
+
+    def test_l1_respects_row_expiry(self, tmp_path):
+        short = SearchCache(cache_path=str(tmp_path / "short.db"), ttl_hours=0, l1_size=4)
+        short.put("query", "basic", 5, {"results": []})
+        time.sleep(0.05)
+        assert short.get("query", "basic", 5) is None
+        stats = short.get_stats()
+        assert stats["l1_misses"] == 1
+        assert stats["l2_misses"] == 1
+        short.close()
+
+    def test_miss_counts_both_tiers(self, tiered):
+        assert tiered.get("nothing", "basic", 5) is None
+        stats = tiered.get_stats()
+        assert stats["l1_misses"] == 1
+        assert stats["l2_misses"] == 1
+        assert stats["session_misses"] == 1
+
+
+class TestSearchCacheCompression:
+    """Tests for the payload storage codec."""
+
+    LARGE = {"results": [{"title": f"T{i}", "content": "raw page content " * 100} for i in range(5)]}
+
+    def _stored(self, cache):
+        import sqlite3
+        with sqlite3.connect(str(cache.cache_path)) as conn:
+            return conn.execute("SELECT response_json FROM search_cache").fetchone()[0]
+
+    @pytest.mark.parametrize("codec", ["zlib", "lzma", "none"])
+    def test_round_trip(self, tmp_path, codec):
+        cache = SearchCache(cache_path=str(tmp_path / f"{codec}.db"), compression=codec)
+        cache.put("query", "basic", 5, self.LARGE)
+        assert cache.get("query", "basic", 5) == self.LARGE
+        stored = self._stored(cache)
+        assert isinstance(stored, str if codec == "none" else bytes)
+        cache.close()
+
+    def test_small_payloads_stay_plain(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "small.db"))
+        cache.put("query", "basic", 5, {"results": []})
+        assert isinstance(self._stored(cache), str)
+        cache.close()
+
+    def test_reads_legacy_rows(self, tmp_path):
+        import json
+        import sqlite3
+        path = tmp_path / "legacy.db"
+        with sqlite3.connect(str(path)) as conn:
+            conn.execute("""
+                CREATE TABLE search_cache (
+                    cache_key TEXT PRIMARY KEY, query_text TEXT NOT NULL,
+                    search_depth TEXT NOT NULL, max_results INTEGER NOT NULL,
+                    response_json TEXT NOT NULL, created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL, hit_count INTEGER NOT NULL DEFAULT 0)
+            """)
+            conn.execute(
+                "INSERT INTO search_cache VALUES (?, ?, 'basic', 5, ?, ?, ?, 0)",
+                (SearchCache._make_key("old query", "basic", 5), "old query",
+                 json.dumps(self.LARGE), time.time(), time.time() + 3600),
+            )
+
+        cache = SearchCache(cache_path=str(path))
+        assert cache.get("old query", "basic", 5) == self.LARGE
+        assert cache.get_stats()["compression_ratio"] == 1.0
+        cache.close()
+
+    def test_recompress_and_ratio(self, tmp_path):
+        path = str(tmp_path / "migrate.db")
+        legacy = SearchCache(cache_path=path, compression="none")
+        legacy.put("query", "basic", 5, self.LARGE)
+        legacy.close()
+
+        cache = SearchCache(cache_path=path)
+        result = cache.recompress()
+        assert result["rows"] == 1
+        assert result["bytes_after"] < result["bytes_before"]
+        assert isinstance(self._stored(cache), bytes)
+        assert cache.get("query", "basic", 5) == self.LARGE
+        assert cache.get_stats()["compression_ratio"] > 2
+        cache.close()
+
+    def test_unknown_codec_rejected(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown cache codec"):
+            SearchCache(cache_path=str(tmp_path / "bad.db"), compression="brotli")
+
+
+class TestSearchCacheBatch:
+    """Tests for get_many / put_many."""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        c = SearchCache(cache_path=str(tmp_path / "batch.db"))
+        yield c
+        c.close()
+
+    def test_put_many_then_get_many(self, cache):
+        cache.put_many([("alpha", {"n": 1}), ("beta", {"n": 2})], "basic", 5)
+
+        results = cache.get_many(["beta", "missing", "Alpha"], "basic", 5)
+        assert results == [{"n": 2}, None, {"n": 1}]
+
+        stats = cache.get_stats()
+        assert stats["entries"] == 2
+        assert stats["session_hits"] == 2
+        assert stats["session_misses"] == 1
+
+    def test_get_many_respects_params(self, cache):
+        cache.put_many([("alpha", {"n": 1})], "basic", 5)
+        assert cache.get_many(["alpha"], "advanced", 5) == [None]
+        assert cache.get_many(["alpha"], "basic", 10) == [None]
+
+    def test_get_many_skips_expired(self, tmp_path):
+        short = SearchCache(cache_path=str(tmp_path / "short.db"), ttl_hours=0)
+        short.put_many([("alpha", {"n": 1})], "basic", 5)
+        time.sleep(0.05)
+        assert short.get_many(["alpha"], "basic", 5) == [None]
+        short.close()
+
+    def test_get_many_counts_hits(self, cache):
+        cache.put("alpha", "basic", 5, {"n": 1})
+        cache.get_many(["alpha", "alpha"], "basic", 5)
+        assert cache.get_stats()["total_hits_stored"] == 1
+
+    def test_get_many_uses_l1(self, tmp_path):
+        tiered = SearchCache(cache_path=str(tmp_path / "l1.db"), l1_size=8)
+        tiered.put_many([("alpha", {"n": 1})], "basic", 5)
+        assert tiered.get_many(["alpha", "beta"], "basic", 5) == [{"n": 1}, None]
+        stats = tiered.get_stats()
+        assert stats["l1_hits"] == 1
+        assert stats["l1_misses"] == 1
+        assert stats["l2_misses"] == 1
+        tiered.close()
+
+    def test_empty_batches(self, cache):
+        assert cache.get_many([], "basic", 5) == []
+        cache.put_many([], "basic", 5)
+        assert cache.get_stats()["entries"] == 0
+
+
+class TestSearchCacheEviction:
+    """Tests for size caps, eviction policies, admission and the sweeper."""
+
+    def _make(self, tmp_path, **kwargs):
+        return SearchCache(cache_path=str(tmp_path / "evict.db"), **kwargs)
+
+    def _put(self, cache, *queries):
+        for q in queries:
+            cache.put(q, "basic", 5, {"q": q})
+            time.sleep(0.01)
+
+    def test_lru_evicts_least_recently_used(self, tmp_path):
+        cache = self._make(tmp_path, max_entries=3)
+        self._put(cache, "a", "b", "c")
+        assert cache.get("a", "basic", 5) is not None
+        self._put(cache, "d")
+
+        assert cache.get("b", "basic", 5) is None
+        for q in ("a", "c", "d"):
+            assert cache.get(q, "basic", 5) == {"q": q}
+        assert cache.get_stats()["evictions"] == 1
+        cache.close()
+
+    def test_lfu_evicts_least_hit(self, tmp_path):
+        cache = self._make(tmp_path, max_entries=3, eviction_policy="lfu")
+        self._put(cache, "a", "b", "c")
+        for q in ("a", "a", "c"):
+            cache.get(q, "basic", 5)
+        self._put(cache, "d")
+
+        assert cache.get("b", "basic", 5) is None
+        assert cache.get_stats()["entries"] == 3
+        cache.close()
+
+    def test_ttl_evicts_soonest_expiring(self, tmp_path):
+        cache = self._make(tmp_path, max_entries=2, eviction_policy="ttl")
+        for q, ttl in (("a", 2), ("b", 1), ("c", 3)):
+            cache.ttl_hours = ttl
+            self._put(cache, q)
+
+        assert cache.get("b", "basic", 5) is None
+        assert cache.get("a", "basic", 5) == {"q": "a"}
+        assert cache.get("c", "basic", 5) == {"q": "c"}
+        cache.close()
+
+    def test_max_bytes(self, tmp_path):
+        cache = self._make(tmp_path, max_bytes=1000, compression="none")
+        for i in range(10):
+            cache.put(f"query {i}", "basic", 5, {"text": "x" * 200})
+
+        stats = cache.get_stats()
+        assert stats["payload_bytes_stored"] <= 1000
+        assert stats["entries"] == 4
+        assert cache.get("query 9", "basic", 5) is not None
+        cache.close()
+
+    def test_tinylfu_rejects_one_off_queries(self, tmp_path):
+        cache = self._make(tmp_path, max_entries=2, admission="tinylfu")
+        for q in ("popular a", "popular b"):
+            for _ in range(3):
+                cache.get(q, "basic", 5)
+            self._put(cache, q)
+
+        self._put(cache, "one-off")
+        stats = cache.get_stats()
+        assert stats["admission_rejects"] == 1
+        assert stats["entries"] == 2
+        assert cache.get("one-off", "basic", 5) is None
+
+        for _ in range(5):
+            cache.get("rising", "basic", 5)
+        self._put(cache, "rising")
+        assert cache.get("rising", "basic", 5) == {"q": "rising"}
+        assert cache.get_stats()["entries"] == 2
+        cache.close()
+
+    def test_unknown_policies_rejected(self, tmp_path):
+        with pytest.raises(ValueError, match="eviction policy"):
+            self._make(tmp_path, eviction_policy="random")
+        with pytest.raises(ValueError, match="admission policy"):
+            self._make(tmp_path, admission="bloom")
+
+    def test_sweep_expires_and_vacuums(self, tmp_path):
+        cache = self._make(tmp_path, ttl_hours=0, compression="none")
+        with cache._connect() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2  # INCREMENTAL
+        for i in range(50):
+            cache.put(f"query {i}", "basic", 5, {"text": "x" * 2000})
+        time.sleep(0.05)
+
+        result = cache.sweep()
+        assert result["expired"] == 50
+        assert result["pages_freed"] > 0
+        with cache._connect() as conn:
+            assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+        cache.close()
+
+    def test_background_sweeper(self, tmp_path):
+        cache = self._make(tmp_path, max_entries=2, sweep_interval_seconds=0.05)
+        self._put(cache, "a", "b", "c", "d")
+        deadline = time.time() + 5
+        while cache.get_stats()["entries"] > 2 and time.time() < deadline:
+            time.sleep(0.05)
+        assert cache.get_stats()["entries"] == 2
+        cache.close()
+        assert cache._sweeper is None
+
+    def test_recompress_enables_incremental_vacuum(self, tmp_path):
+        import sqlite3
+        path = tmp_path / "old.db"
+        sqlite3.connect(path).execute("CREATE TABLE unrelated (x)").connection.close()
+        cache = SearchCache(cache_path=str(path))
+        with cache._connect() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+        cache.recompress()
+        with cache._connect() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        cache.close()
+
+
+class TestSearchCacheHitBuffer:
+    """Tests for write-behind hit accounting."""
+
+    def _stored_hits(self, cache, query="alpha"):
+        with cache._connect() as conn:
+            return conn.execute(
+                "SELECT hit_count FROM search_cache WHERE cache_key = ?",
+                (cache._make_key(query, "basic", 5),),
+            ).fetchone()[0]
+
+    def _wait_for(self, predicate, timeout=5.0):
+        deadline = time.time() + timeout
+        while not predicate() and time.time() < deadline:
+            time.sleep(0.02)
+        return predicate()
+
+    def test_hits_are_buffered_until_flush(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "hits.db"), hit_flush_interval_seconds=60)
+        cache.put("alpha", "basic", 5, {"n": 1})
+        cache.get("alpha", "basic", 5)
+        cache.get("alpha", "basic", 5)
+
+        assert self._stored_hits(cache) == 0
+        assert cache.flush_hits() == 2
+        assert self._stored_hits(cache) == 2
+        cache.close()
+
+    def test_flush_every_n_hits(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "hits.db"),
+                            hit_flush_every=3, hit_flush_interval_seconds=60)
+        cache.put("alpha", "basic", 5, {"n": 1})
+        for _ in range(3):
+            cache.get("alpha", "basic", 5)
+        assert self._wait_for(lambda: self._stored_hits(cache) == 3)
+        cache.close()
+
+    def test_flush_on_timer(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "hits.db"), hit_flush_interval_seconds=0.05)
+        cache.put("alpha", "basic", 5, {"n": 1})
+        cache.get("alpha", "basic", 5)
+        assert self._wait_for(lambda: self._stored_hits(cache) == 1)
+        cache.close()
+
+    def test_close_flushes(self, tmp_path):
+        path = str(tmp_path / "hits.db")
+        cache = SearchCache(cache_path=path, hit_flush_interval_seconds=60)
+        cache.put("alpha", "basic", 5, {"n": 1})
+        cache.get("alpha", "basic", 5)
+        cache.close()
+
+        reopened = SearchCache(cache_path=path)
+        assert self._stored_hits(reopened) == 1
+        reopened.close()
+
+    def test_failed_flush_requeues(self, tmp_path):
+        import sqlite3
+        from unittest.mock import patch
+
+        cache = SearchCache(cache_path=str(tmp_path / "hits.db"), hit_flush_interval_seconds=60)
+        cache.put("alpha", "basic", 5, {"n": 1})
+        cache.get("alpha", "basic", 5)
+        with patch.object(cache, "_connect", side_effect=sqlite3.OperationalError("database is locked")):
+            assert cache.flush_hits() == 0
+        cache.get("alpha", "basic", 5)
+
+        assert cache.flush_hits() == 2
+        assert self._stored_hits(cache) == 2
+        cache.close()
+
+    def test_l1_hits_are_counted(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "hits.db"), l1_size=8)
+        cache.put("alpha", "basic", 5, {"n": 1})
+        cache.get("alpha", "basic", 5)
+        assert cache.get_stats()["total_hits_stored"] == 1
+        cache.close()
+
+    def test_expired_lookup_does_not_write(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "hits.db"), ttl_hours=0)
+        cache.put("alpha", "basic", 5, {"n": 1})
+        time.sleep(0.05)
+        assert cache.get("alpha", "basic", 5) is None
+        assert cache.get_stats()["entries"] == 1
+        assert cache.clear_expired() == 1
+        cache.close()
+
+
+class TestSearchCacheStale:
+    """Tests for the stale-while-revalidate grace window."""
+
+    def test_get_stale_within_grace(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "swr.db"), ttl_hours=0, stale_grace_hours=1)
+        cache.put("alpha", "basic", 5, {"n": 1})
+        time.sleep(0.05)
+
+        assert cache.get("alpha", "basic", 5) is None
+        assert cache.get_stale("alpha", "basic", 5) == {"n": 1}
+        assert cache.get_stats()["session_stale_hits"] == 1
+        cache.close()
+
+    def test_get_stale_ignores_fresh_and_disabled(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "swr.db"), stale_grace_hours=1)
+        cache.put("alpha", "basic", 5, {"n": 1})
+        assert cache.get_stale("alpha", "basic", 5) is None
+
+        plain = SearchCache(cache_path=str(tmp_path / "plain.db"), ttl_hours=0)
+        plain.put("alpha", "basic", 5, {"n": 1})
+        time.sleep(0.05)
+        assert plain.get_stale("alpha", "basic", 5) is None
+        cache.close()
+        plain.close()
+
+    def test_clear_expired_keeps_grace_window(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "swr.db"), ttl_hours=0, stale_grace_hours=1)
+        cache.put("alpha", "basic", 5, {"n": 1})
+        time.sleep(0.05)
+        assert cache.clear_expired() == 0
+
+        cache.stale_grace_hours = 0
+        assert cache.clear_expired() == 1
+        cache.close()
+
+
+class TestSearchCacheDocuments:
+    """Tests for the content-addressed document store."""
+
+    def _response(self, *pages):
+        return {"answer": "a", "results": [
+            {"title": f"Title {url}", "url": url, "content": content, "score": 0.5}
+            for url, content in pages
+        ]}
+
+    def test_shared_pages_stored_once(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "docs.db"))
+        first = self._response(("https://example.com/a", "shared text"), ("https://example.com/b", "b text"))
+        second = self._response(("https://EXAMPLE.com/a/?utm_source=news", "shared text"))
+        cache.put("first", "basic", 5, first)
+        cache.put("second", "basic", 5, second)
+
+        assert cache.get_stats()["documents"] == 2
+        assert cache.get("first", "basic", 5) == first
+        assert cache.get("second", "basic", 5) == second
+        cache.close()
+
+    def test_changed_content_is_a_new_document(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "docs.db"))
+        cache.put("first", "basic", 5, self._response(("https://example.com/a", "old text")))
+        cache.put("second", "basic", 5, self._response(("https://example.com/a", "new text")))
+        assert cache.get_stats()["documents"] == 2
+        cache.close()
+
+    def test_documents_shared_in_memory(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "docs.db"))
+        text = "shared text " * 50
+        cache.put("first", "basic", 5, self._response(("https://example.com/a", text)))
+        cache.put("second", "basic", 5, self._response(("https://example.com/a", text)))
+
+        first, second = cache.get_many(["first", "second"], "basic", 5)
+        assert first["results"][0]["content"] is second["results"][0]["content"]
+        cache.close()
+
+    def test_unreferenced_documents_collected(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "docs.db"), ttl_hours=0)
+        cache.put("first", "basic", 5, self._response(("https://example.com/a", "text")))
+        time.sleep(0.05)
+        cache.clear_expired()
+        assert cache.get_stats()["documents"] == 0
+        cache.close()
+
+    def test_inline_rows_still_readable(self, tmp_path):
+        path = str(tmp_path / "docs.db")
+        response = self._response(("https://example.com/a", "text"))
+        inline = SearchCache(cache_path=path, dedupe_documents=False)
+        inline.put("first", "basic", 5, response)
+        assert inline.get_stats()["documents"] == 0
+        inline.close()
+
+        cache = SearchCache(cache_path=path)
+        assert cache.get("first", "basic", 5) == response
+        cache.close()
+
+    def test_canonical_url(self):
+        from src.tools.documents import canonical_url
+
+        assert canonical_url("HTTPS://Example.com:443/path/?b=2&a=1&utm_medium=x#frag") == \
+            "https://example.com/path?a=1&b=2"
+        assert canonical_url("http://example.com:8080") == "http://example.com:8080/"
+        assert canonical_url("not a url") == "not a url"
+
+
+class TestSearchCacheNamespaces:
+    """Tests for cached results of other Tavily methods."""
+
+    def test_round_trip_per_namespace(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "ns.db"))
+        page = {"results": [{"url": "https://example.com/a", "raw_content": "page"}], "failed_results": []}
+        cache.put_entry("extract", "https://example.com/a", page)
+        cache.put_entry("qna", "what is ai", "An answer")
+
+        assert cache.get_entry("extract", "https://example.com/a") == page
+        assert cache.get_entry("qna", "what is ai") == "An answer"
+        assert cache.get_entry("context", "what is ai") is None
+        # Never served as a search result
+        assert cache.get("https://example.com/a", "", 0) is None
+        assert cache.get("what is ai", "basic", 5) is None
+
+        stats = cache.get_stats()["namespaces"]
+        assert stats["extract"] == {"entries": 1, "ttl_hours": 168, "hits": 1, "misses": 0}
+        assert stats["context"]["misses"] == 1
+        cache.close()
+
+    def test_namespace_ttl(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "ns.db"), ttl_hours=24,
+                            namespace_ttl_hours={"qna": 0})
+        cache.put_entry("qna", "what is ai", "An answer")
+        cache.put_entry("context", "what is ai", "[]")
+        time.sleep(0.05)
+        assert cache.get_entry("qna", "what is ai") is None
+        assert cache.get_entry("context", "what is ai") == "[]"
+        assert cache.clear_expired() == 1
+        cache.close()
+
+    def test_unknown_namespace(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "ns.db"))
+        with pytest.raises(ValueError, match="Unknown cache namespace"):
+            cache.put_entry("search", "q", {})
+        cache.close()
+
+    def test_l1_and_metrics(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "ns.db"), l1_size=10)
+        cache.put_entry("extract", "https://example.com/a", {"results": [1]})
+        cache.get_entry("extract", "https://example.com/a")
+        cache.get_entry("extract", "https://example.com/b")
+        cache.get("quantum computing", "basic", 5)
+        assert cache.get_stats()["l1_hits"] == 1
+
+        extract = cache.get_metrics(since_hours=1, namespace="extract")
+        assert (extract[0]["hits"], extract[0]["misses"]) == (1, 1)
+        search = cache.get_metrics(since_hours=1)
+        assert (search[0]["hits"], search[0]["misses"]) == (0, 1)
+        cache.close()
+
+    def test_entries_share_eviction_and_skip_vectors(self, tmp_path):
+        from src.tools.embeddings import HashEmbedding
+
+        cache = SearchCache(cache_path=str(tmp_path / "ns.db"), max_entries=2,
+                            embedding_provider=HashEmbedding())
+        cache.put("quantum computing", "basic", 5, {"results": []})
+        time.sleep(0.01)
+        cache.put_entry("extract", "https://example.com/a", {"results": [1]})
+        time.sleep(0.01)
+        cache.put_entry("extract", "https://example.com/b", {"results": [2]})
+        assert cache.get_stats()["entries"] == 2
+        assert cache.get("quantum computing", "basic", 5) is None
+
+        if cache._vec_available:
+            with cache._connect() as conn:
+                conn.execute(f"DELETE FROM {cache._vec_table}")
+            assert cache.rebuild_vectors() == 0
+        cache.close()
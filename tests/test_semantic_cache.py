@@ -4,12 +4,23 @@ Tests for semantic search cache with sqlite-vec.
 
 import pytest
 import json
+import threading
 import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 from src.tools.search_cache import SearchCache
-from src.tools.embeddings import HashEmbedding, EmbeddingProvider
+from src.tools.embeddings import HashEmbedding, EmbeddingProvider, OpenAIEmbedding, ReducedEmbedding
+
+
+def _expire_vectors(cache):
+    """Backdate expires_at on every vector row (vec0 only updates by rowid)."""
+    with cache._connect() as conn:
+        rowids = [row[0] for row in conn.execute(f"SELECT rowid FROM {cache._vec_table}")]
+        for rowid in rowids:
+            conn.execute(f"UPDATE {cache._vec_table} SET expires_at = ? WHERE rowid = ?",
+                         (time.time() - 1.0, rowid))
 
 
 @pytest.fixture
@@ -87,6 +98,191 @@ class TestHashEmbedding:
         assert len(result) == 256
         assert all(isinstance(x, float) for x in result)
 
+    def test_embed_batch_matches_embed(self, embedding_provider):
+        texts = ["quantum computing", "", "!!!", "AI safety: über-cool café_2025", "quantum computing"]
+        assert embedding_provider.embed_batch(texts) == [embedding_provider.embed(t) for t in texts]
+        assert embedding_provider.embed_batch([]) == []
+
+    def test_embed_batch_bit_compatible_with_legacy_vectors(self):
+        """Vectors already stored in vec tables must not change."""
+        import hashlib
+        import numpy as np
+
+        def legacy(text, dims):
+            cleaned = ''.join(c if c.isalnum() or c.isspace() else ' ' for c in text.lower())
+            words = cleaned.split()
+            tokens = words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+            tokens += [f"{a}_{b}_{c}" for a, b, c in zip(words, words[1:], words[2:])]
+            vec = np.zeros(dims, dtype=np.float32)
+            for token in tokens:
+                h = hashlib.md5(token.encode()).hexdigest()
+                vec[int(h[:8], 16) % dims] += 1.0 if int(h[8:16], 16) % 2 == 0 else -1.0
+            norm = np.linalg.norm(vec)
+            return (vec / norm if norm > 0 else vec).tobytes()
+
+        texts = ["Quantum computing trends 2025", "naïve Bayes vs. SVM", "東京 weather_today",
+                 "x-ray   crystallography", "a b c d e f g h i j k l m n o p"]
+        for dims in (256, 1536):
+            provider = HashEmbedding(dimensions=dims)
+            assert provider.embed_batch(texts) == [legacy(t, dims) for t in texts]
+
+
+class _StubEmbeddingsHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI /embeddings endpoint: vector i is [len(input_i), i, 0, ...]."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        self.server.requests.append(inputs)
+        data = [
+            {"object": "embedding", "index": i, "embedding": [float(len(text)), float(i)] + [0.0] * 1534}
+            for i, text in enumerate(inputs)
+        ]
+        payload = json.dumps({
+            "object": "list",
+            "data": data[::-1],  # out of order on purpose
+            "model": body["model"],
+            "usage": {"prompt_tokens": len(inputs), "total_tokens": len(inputs)},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def embeddings_server():
+    pytest.importorskip("openai")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubEmbeddingsHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestOpenAIEmbeddingBatch:
+    """OpenAIEmbedding.embed_batch against a local stub of the embeddings endpoint."""
+
+    def _provider(self, server, **kwargs):
+        return OpenAIEmbedding(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}/v1", **kwargs)
+
+    def _first(self, embedding):
+        import numpy as np
+        return np.frombuffer(embedding, dtype=np.float32)[0]
+
+    def test_one_request_for_many_inputs(self, embeddings_server):
+        provider = self._provider(embeddings_server)
+        texts = [" a ", "bb", "ccc"]
+        embeddings = provider.embed_batch(texts)
+        assert embeddings_server.requests == [["a", "bb", "ccc"]]
+        # Reordered response is mapped back by index
+        assert [self._first(e) for e in embeddings] == [1.0, 2.0, 3.0]
+        assert all(len(e) == 1536 * 4 for e in embeddings)
+
+    def test_chunks_by_input_count(self, embeddings_server):
+        provider = self._provider(embeddings_server, max_batch_inputs=2)
+        embeddings = provider.embed_batch(["a", "bb", "ccc", "dddd", "eeeee"])
+        assert [len(r) for r in embeddings_server.requests] == [2, 2, 1]
+        assert [self._first(e) for e in embeddings] == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+    def test_chunks_by_token_budget(self, embeddings_server):
+        provider = self._provider(embeddings_server, max_batch_tokens=10)
+        # Each input is estimated at its UTF-8 length + 1; an oversized one still goes out, alone
+        provider.embed_batch(["x" * 4, "y" * 4, "z" * 20, "w"])
+        assert embeddings_server.requests == [["xxxx", "yyyy"], ["z" * 20], ["w"]]
+
+    def test_embed_uses_batch_path(self, embeddings_server):
+        provider = self._provider(embeddings_server)
+        assert self._first(provider.embed("hello")) == 5.0
+        assert embeddings_server.requests == [["hello"]]
+
+    def test_search_cache_embeds_batch_in_one_request(self, embeddings_server, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "openai.db"),
+                            embedding_provider=self._provider(embeddings_server))
+        embeddings = cache._embed_many(["first query", "second query", "first query"])
+        assert embeddings_server.requests == [["first query", "second query"]]
+        assert embeddings[0] == embeddings[2]
+        cache.close()
+
+
+class TestReducedEmbedding:
+    """Truncated / randomly projected views of another provider's vectors."""
+
+    @pytest.fixture
+    def full(self):
+        return HashEmbedding(dimensions=1024)
+
+    def _matrix(self, embeddings):
+        import numpy as np
+        return np.stack([np.frombuffer(e, dtype=np.float32) for e in embeddings])
+
+    def test_truncate(self, full):
+        import numpy as np
+        reduced = ReducedEmbedding(full, 256)
+        texts = ["quantum computing basics for beginners and experts in industry", "ocean warming"]
+        expected = self._matrix(full.embed_batch(texts))[:, :256]
+        norms = np.linalg.norm(expected, axis=1, keepdims=True)
+        expected = np.divide(expected, norms, out=np.zeros_like(expected), where=norms > 0)
+        assert expected[0].any()
+        assert np.allclose(self._matrix(reduced.embed_batch(texts)), expected, atol=1e-6)
+        assert reduced.signature == "hash-1024-t256"
+        assert reduced.dimensions == 256
+        assert reduced.embed("ocean warming") == reduced.embed_batch(texts)[1]
+
+    def test_projection_preserves_similarity(self, full):
+        import numpy as np
+        texts = ["quantum computing basics", "introduction to quantum computing",
+                 "best chocolate cake recipe", "quantum computing trends 2025"]
+        exact = self._matrix(full.embed_batch(texts))
+        projected = self._matrix(ReducedEmbedding(full, 512, method="projection").embed_batch(texts))
+        assert np.allclose(projected @ projected.T, exact @ exact.T, atol=0.15)
+
+    def test_projection_seeded_and_stored(self, full, tmp_path):
+        import numpy as np
+        path = str(tmp_path / "proj.npy")
+        first = ReducedEmbedding(full, 64, method="projection", seed=7, projection_path=path)
+        vectors = first.embed_batch(["ocean warming"])
+        again = ReducedEmbedding(full, 64, method="projection", seed=7, projection_path=path)
+        assert isinstance(again.projection(), np.memmap)
+        assert again.embed_batch(["ocean warming"]) == vectors
+        assert again.signature == "hash-1024-rp64s7"
+        with pytest.raises(ValueError):
+            ReducedEmbedding(full, 32, method="projection", projection_path=path).projection()
+
+    def test_invalid(self, full):
+        with pytest.raises(ValueError):
+            ReducedEmbedding(full, 2048)
+        with pytest.raises(ValueError):
+            ReducedEmbedding(full, 64, method="pca")
+
+    def test_search_cache_indexes_reduced_vectors(self, full, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "reduced.db"),
+                            embedding_provider=ReducedEmbedding(full, 128))
+        if not cache._vec_available:
+            pytest.skip("sqlite-vec not loadable")
+        assert cache._vec_table == "search_vec_hash_1024_t128"
+        cache.put("quantum computing basics for beginners", "basic", 5, {"n": 1})
+        assert cache.get("quantum computing basics for beginners guide", "basic", 5) == {"n": 1}
+        cache.close()
+
+
+class TestDefaultEmbedBatch:
+
+    def test_abc_falls_back_to_embed(self):
+        class Upper(EmbeddingProvider):
+            dimensions = 1
+
+            def embed(self, text):
+                return text.upper().encode()
+
+        assert Upper().embed_batch(["a", "b"]) == [b"A", b"B"]
+
 
 class TestSearchCacheExactMatch:
     """Tests for exact-match caching (should still work as before)."""
@@ -191,14 +387,17 @@ class TestSearchCacheSemantic:
         response = {"results": []}
         cache.put("expired query", "basic", 5, response)
         
-        # Manually expire
+        # Manually expire (vec0 tables need a connection with sqlite-vec loaded)
         with sqlite3.connect(str(cache.cache_path)) as conn:
             conn.execute("UPDATE search_cache SET expires_at = ?", (time.time() - 1,))
-            if cache._vec_available:
-                conn.execute("UPDATE search_vec_meta SET expires_at = ?", (time.time() - 1,))
+        if cache._vec_available:
+            _expire_vectors(cache)
         
         removed = cache.clear_expired()
         assert removed == 1
+        if cache._vec_available:
+            with cache._connect() as conn:
+                assert conn.execute(f"SELECT COUNT(*) FROM {cache._vec_table}").fetchone()[0] == 0
 
 
 class TestSearchCacheBackwardCompat:
@@ -227,3 +426,247 @@ class TestSearchCacheBackwardCompat:
         
         stats = cache.get_stats()
         assert stats["total_hits_stored"] == 2
+
+
+class CountingEmbedding(HashEmbedding):
+    """HashEmbedding that records every text it embeds, and each batch."""
+
+    def __init__(self):
+        super().__init__(dimensions=256)
+        self.calls = []
+        self.batches = []
+
+    def embed_batch(self, texts):
+        self.calls.extend(texts)
+        self.batches.append(list(texts))
+        return super().embed_batch(texts)
+
+
+class FlakyBatchEmbedding(HashEmbedding):
+    """Batch calls fail; single embeds fail only for texts containing 'bad'."""
+
+    def embed_batch(self, texts):
+        if len(texts) > 1:
+            raise RuntimeError("batch rejected")
+        return super().embed_batch(texts)
+
+    def embed(self, text):
+        if "bad" in text:
+            raise RuntimeError("input rejected")
+        return super().embed(text)
+
+
+class TestSearchCacheBatchSemantic:
+    """Tests for batched semantic lookups."""
+
+    def test_get_many_semantic_hits(self, tmp_path):
+        provider = CountingEmbedding()
+        cache = SearchCache(cache_path=str(tmp_path / "batch.db"), embedding_provider=provider)
+        response = {"results": [{"title": "Quantum"}]}
+        cache.put_many([("quantum computing basics for beginners", response)], "basic", 5)
+        provider.calls.clear()
+        provider.batches.clear()
+
+        results = cache.get_many(
+            ["quantum computing basics for beginners",
+             "introduction to quantum computing fundamentals",
+             "best chocolate cake recipe"],
+            "basic", 5,
+        )
+
+        assert results[0] == response
+        assert results[2] is None
+        if cache._vec_available:
+            # Only the two exact misses are embedded
+            assert provider.calls == [
+                "introduction to quantum computing fundamentals",
+                "best chocolate cake recipe",
+            ]
+            assert results[1] == response
+            assert cache.get_stats()["session_semantic_hits"] == 1
+            # ...in a single provider call
+            assert len(provider.batches) == 1
+
+    def test_batch_failure_falls_back_per_text(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "flaky.db"), embedding_provider=FlakyBatchEmbedding())
+        embeddings = cache._embed_many(["good query", "bad query", "good query"])
+        assert embeddings[0] is not None and embeddings[0] == embeddings[2]
+        assert embeddings[1] is None
+
+    def test_put_many_stores_vectors(self, tmp_path):
+        import sqlite3
+
+        cache = SearchCache(cache_path=str(tmp_path / "vec.db"), embedding_provider=HashEmbedding())
+        if not cache._vec_available:
+            pytest.skip("sqlite-vec not loadable")
+        cache.put_many([("first query", {"n": 1}), ("second query", {"n": 2})], "basic", 5)
+        with cache._connect() as conn:
+            assert conn.execute(f"SELECT COUNT(*) FROM {cache._vec_table}").fetchone()[0] == 2
+
+
+class TestPartitionedVectorIndex:
+    """Tests for the depth/max_results-partitioned vector table."""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        c = SearchCache(cache_path=str(tmp_path / "part.db"), embedding_provider=HashEmbedding())
+        if not c._vec_available:
+            pytest.skip("sqlite-vec not loadable")
+        yield c
+        c.close()
+
+    def test_semantic_hit_not_crowded_out_by_other_partitions(self, cache):
+        """Near-identical entries in other partitions must not hide the eligible one."""
+        base = "quantum computing basics for beginners"
+        for max_results in (1, 2, 3, 4, 6, 7):
+            cache.put(base, "basic", max_results, {"max": max_results})
+        cache.put(base, "advanced", 5, {"max": "advanced"})
+        cache.put("quantum computing basics for beginners guide", "basic", 5, {"max": 5})
+
+        result = cache.get(base + " today", "basic", 5)
+        assert result == {"max": 5}
+
+    def test_expired_vectors_filtered_in_knn(self, cache):
+        cache.put("quantum computing basics", "basic", 5, {"fresh": False})
+        _expire_vectors(cache)
+        assert cache.get("quantum computing basics today", "basic", 5) is None
+
+    def test_put_replaces_vector_for_same_key(self, cache):
+        cache.put("quantum computing", "basic", 5, {"v": 1})
+        cache.put("quantum computing", "basic", 5, {"v": 2})
+        with cache._connect() as conn:
+            assert conn.execute(f"SELECT COUNT(*) FROM {cache._vec_table}").fetchone()[0] == 1
+
+    def test_table_per_embedding_signature(self, tmp_path):
+        path = str(tmp_path / "multi.db")
+        small = SearchCache(cache_path=path, embedding_provider=HashEmbedding(dimensions=128))
+        large = SearchCache(cache_path=path, embedding_provider=HashEmbedding(dimensions=256))
+        if not small._vec_available:
+            pytest.skip("sqlite-vec not loadable")
+        assert small._vec_table != large._vec_table
+
+        small.put("quantum computing basics", "basic", 5, {"from": "small"})
+        large.put("machine learning intro", "basic", 5, {"from": "large"})
+        assert small.get("quantum computing basics today", "basic", 5) == {"from": "small"}
+        assert large.get("machine learning intro today", "basic", 5) == {"from": "large"}
+
+    def test_migrates_legacy_vector_tables(self, tmp_path):
+        import sqlite3
+        import sqlite_vec
+
+        path = tmp_path / "legacy.db"
+        plain = SearchCache(cache_path=str(path))
+        plain.put("quantum computing basics", "basic", 5, {"legacy": True})
+        plain.close()
+        with sqlite3.connect(str(path)) as conn:
+            if not hasattr(conn, "enable_load_extension"):
+                pytest.skip("sqlite extensions not loadable")
+            conn.enable_load_extension(True)
+            sqlite_vec.load(conn)
+            conn.execute("CREATE VIRTUAL TABLE search_vec USING vec0(embedding float[256])")
+            conn.execute("CREATE TABLE search_vec_meta (rowid INTEGER PRIMARY KEY, cache_key TEXT)")
+
+        cache = SearchCache(cache_path=str(path), embedding_provider=HashEmbedding())
+        with cache._connect() as conn:
+            names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        assert "search_vec_meta" not in names
+        assert "search_vec" not in names
+        # Live entries were re-embedded into the new table
+        assert cache.get("quantum computing basics today", "basic", 5) == {"legacy": True}
+
+    def test_eviction_removes_vectors(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "evict.db"),
+                            embedding_provider=HashEmbedding(), max_entries=2)
+        if not cache._vec_available:
+            pytest.skip("sqlite-vec not loadable")
+        for q in ("quantum computing", "machine learning", "protein folding"):
+            cache.put(q, "basic", 5, {"q": q})
+            time.sleep(0.01)
+
+        with cache._connect() as conn:
+            keys = {row[0] for row in conn.execute(f"SELECT cache_key FROM {cache._vec_table}")}
+        assert len(keys) == 2
+        assert cache._make_key("quantum computing", "basic", 5) not in keys
+        cache.close()
+
+
+class TestQuantizedVectorIndex:
+    """Tests for int8/binary KNN storage with exact re-ranking."""
+
+    @pytest.fixture(params=["int8", "binary"])
+    def cache(self, request, tmp_path):
+        c = SearchCache(cache_path=str(tmp_path / "quant.db"), embedding_provider=HashEmbedding(),
+                        vector_quantization=request.param)
+        if not c._vec_available:
+            pytest.skip("sqlite-vec not loadable")
+        yield c
+        c.close()
+
+    def test_semantic_hit_and_miss(self, cache):
+        cache.put("quantum computing basics for beginners", "basic", 5, {"q": "quantum"})
+        cache.put("history of the roman empire", "basic", 5, {"q": "rome"})
+        assert cache.get("quantum computing basics for beginners today", "basic", 5) == {"q": "quantum"}
+        assert cache.get("best pasta recipes for dinner", "basic", 5) is None
+        assert cache.get_stats()["vector_quantization"] == cache.vector_quantization
+
+    def test_stores_quantized_and_full_vectors(self, cache):
+        cache.put("quantum computing", "basic", 5, {"v": 1})
+        column_type = {"int8": "int8", "binary": "bit"}[cache.vector_quantization]
+        with cache._connect() as conn:
+            assert conn.execute(f"SELECT vec_type(embedding) FROM {cache._vec_table}").fetchone()[0] == column_type
+            full = conn.execute(f"SELECT full_embedding FROM {cache._vec_table}").fetchone()[0]
+        assert full == HashEmbedding().embed("quantum computing")
+
+    def test_rerank_uses_exact_distance(self, cache):
+        """The closest entry by float32 distance wins even if quantization ties or reorders."""
+        cache.put("quantum computing basics", "basic", 5, {"q": "near"})
+        cache.put("quantum computing basics and history", "basic", 5, {"q": "far"})
+        assert cache.get("quantum computing basics today", "basic", 5) == {"q": "near"}
+
+    def test_separate_table_from_float_index(self, cache, tmp_path):
+        plain = SearchCache(cache_path=str(cache.cache_path), embedding_provider=HashEmbedding())
+        assert plain._vec_table != cache._vec_table
+        assert cache._vec_table.endswith("_" + cache.vector_quantization)
+        plain.close()
+
+    def test_unknown_quantization(self, tmp_path):
+        with pytest.raises(ValueError):
+            SearchCache(cache_path=str(tmp_path / "bad.db"), vector_quantization="int4")
+
+
+class TestEmbeddingReuse:
+    """A miss followed by put() should embed the query once."""
+
+    @pytest.fixture
+    def provider(self):
+        return CountingEmbedding()
+
+    @pytest.fixture
+    def cache(self, tmp_path, provider):
+        c = SearchCache(cache_path=str(tmp_path / "memo.db"), embedding_provider=provider)
+        if not c._vec_available:
+            pytest.skip("sqlite-vec not loadable")
+        yield c
+        c.close()
+
+    def test_miss_then_put_embeds_once(self, cache, provider):
+        assert cache.get("quantum computing basics", "basic", 5) is None
+        cache.put("quantum computing basics", "basic", 5, {"n": 1})
+        assert provider.calls == ["quantum computing basics"]
+        assert len(cache._embedding_memo) == 0
+
+    def test_batched_miss_then_put_many_embeds_once(self, cache, provider):
+        queries = ["quantum computing basics", "best chocolate cake recipe"]
+        assert cache.get_many(queries, "basic", 5) == [None, None]
+        cache.put_many([(q, {"q": q}) for q in queries], "basic", 5)
+        assert provider.calls == queries
+
+    def test_memo_disabled(self, tmp_path, provider):
+        cache = SearchCache(cache_path=str(tmp_path / "nomemo.db"),
+                            embedding_provider=provider, embedding_memo_size=0)
+        if not cache._vec_available:
+            pytest.skip("sqlite-vec not loadable")
+        cache.get("quantum computing basics", "basic", 5)
+        cache.put("quantum computing basics", "basic", 5, {"n": 1})
+        assert provider.calls == ["quantum computing basics"] * 2
+        cache.close()
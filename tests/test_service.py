@@ -120,6 +120,67 @@ class TestResearchServiceCache:
         result = svc.get_history(limit=10)
         assert len(result) == 2
 
+    def test_search_cache_shared_per_embedding_key(self):
+        svc = ResearchService(db=MagicMock())
+        with patch('src.tools.search_cache.SearchCache') as cache_cls, \
+             patch('src.tools.embeddings.get_embedding_provider') as get_provider, \
+             patch('src.tools.embedding_cache.EmbeddingStore') as store_cls:
+            get_provider.return_value.signature = 'hash-256'
+            cache_cls.side_effect = lambda **kw: MagicMock()
+            first = svc._get_search_cache('sk-a')
+            again = svc._get_search_cache('sk-a')
+            other = svc._get_search_cache('sk-b')
+            # Once the key validates, the key gets a cache for the new provider
+            get_provider.return_value.signature = 'openai-text-embedding-3-small-1536'
+            upgraded = svc._get_search_cache('sk-a')
+        assert first is again
+        assert other is not first
+        assert upgraded is not first
+        assert cache_cls.call_count == 3
+        # Both caches' providers share one embedding store
+        assert store_cls.call_count == 1
+        providers = [kw['embedding_provider'] for _, kw in cache_cls.call_args_list]
+        assert providers[0].store is providers[1].store
+
+    def test_close_at_exit_flushes_buffered_hits(self, tmp_path):
+        import sqlite3
+        from src.tools.search_cache import SearchCache
+        
+        path = str(tmp_path / 'cache.db')
+        svc = ResearchService(db=MagicMock())
+        with patch('src.tools.search_cache.SearchCache',
+                   side_effect=lambda **kw: SearchCache(cache_path=path, **kw)), \
+             patch('src.tools.embedding_cache.EmbeddingStore'), \
+             patch('src.services.research_service.atexit.register') as register:
+            cache = svc._get_search_cache()
+            svc._get_search_cache('sk-a')
+        register.assert_called_once_with(svc.close)
+        
+        cache.put('quantum computing basics', 'basic', 5, {'results': []})
+        assert cache.get('quantum computing basics', 'basic', 5) is not None
+        register.call_args[0][0]()
+        with sqlite3.connect(path) as conn:
+            assert conn.execute('SELECT SUM(hit_count) FROM search_cache').fetchone()[0] == 1
+        assert svc._search_caches == {}
+        svc.close()
+
+    def test_search_caches_bounded_lru(self):
+        svc = ResearchService(db=MagicMock())
+        with patch('src.tools.search_cache.SearchCache') as cache_cls, \
+             patch('src.tools.embeddings.get_embedding_provider') as get_provider, \
+             patch('src.tools.embedding_cache.EmbeddingStore'), \
+             patch('src.services.research_service.SEARCH_CACHE_MAX_INSTANCES', 2), \
+             patch('src.services.research_service.atexit.register'):
+            get_provider.return_value.signature = 'hash-256'
+            cache_cls.side_effect = lambda **kw: MagicMock()
+            first = svc._get_search_cache('sk-a')
+            second = svc._get_search_cache('sk-b')
+            svc._get_search_cache('sk-a')  # sk-b is now least recently used
+            svc._get_search_cache('sk-c')
+        assert len(svc._search_caches) == 2
+        second.close.assert_called_once()
+        first.close.assert_not_called()
+
 
 class TestResearchServiceRecordCreation:
     """Test DB record creation."""
@@ -191,6 +252,155 @@ class TestCLI:
         assert 'Research topic' in result.stdout
         assert '--depth' in result.stdout
 
+    def test_cli_cache_recompress(self, tmp_path):
+        import subprocess
+        from src.tools.search_cache import SearchCache
+        
+        path = str(tmp_path / "cache.db")
+        legacy = SearchCache(cache_path=path, compression="none")
+        legacy.put("quantum computing basics", "basic", 5, {"results": [{"content": "qubits " * 200}]})
+        legacy.close()
+        
+        result = subprocess.run(
+            [sys.executable, 'cli.py', 'cache', '--cache-path', path, 'recompress', '--codec', 'lzma'],
+            capture_output=True, text=True, timeout=30
+        )
+        assert result.returncode == 0, result.stderr
+        assert 'Recompressed 1 entries with lzma' in result.stdout
+        
+        result = subprocess.run(
+            [sys.executable, 'cli.py', 'cache', '--cache-path', path, 'stats'],
+            capture_output=True, text=True, timeout=30
+        )
+        assert result.returncode == 0, result.stderr
+        assert 'Compression ratio' in result.stdout
+
+    def test_cli_import_uses_service_vector_table(self, tmp_path, monkeypatch):
+        import cli
+        from src.tools import embeddings
+        from src.tools.search_cache import SearchCache
+        
+        class FakeOpenAI(embeddings.HashEmbedding):
+            def __init__(self, api_key):
+                super().__init__(dimensions=1536)
+            
+            @property
+            def signature(self):
+                return 'openai-text-embedding-3-small-1536'
+        
+        monkeypatch.setattr(embeddings, 'OpenAIEmbedding', FakeOpenAI)
+        monkeypatch.setattr(embeddings, '_registry',
+                            embeddings.EmbeddingProviderRegistry(idf_path=str(tmp_path / 'idf.npy')))
+        monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+        
+        cli_cache = SearchCache(cache_path=str(tmp_path / 'cli.db'), embedding_provider=cli.service_embedding_provider())
+        svc = ResearchService(db=MagicMock())
+        with patch('src.tools.search_cache.SearchCache',
+                   side_effect=lambda **kw: SearchCache(cache_path=str(tmp_path / 'svc.db'), **kw)), \
+             patch('src.tools.embedding_cache.EmbeddingStore'):
+            svc_cache = svc._get_search_cache('sk-test')
+        assert cli_cache._vec_table == svc_cache._vec_table == 'search_vec_openai_text_embedding_3_small_1536_t512'
+        cli_cache.close()
+        svc_cache.close()
+
+    def test_cli_cache_report(self, tmp_path):
+        import subprocess
+        from src.tools.search_cache import SearchCache
+        
+        path = str(tmp_path / "cache.db")
+        cache = SearchCache(cache_path=path)
+        cache.put("quantum computing basics", "basic", 5, {"results": []})
+        cache.get("quantum computing basics", "basic", 5)
+        cache.get("protein folding basics", "basic", 5)
+        cache.close()
+        
+        result = subprocess.run(
+            [sys.executable, 'cli.py', 'cache', '--cache-path', path, 'report', '--hours', '1'],
+            capture_output=True, text=True, timeout=30
+        )
+        assert result.returncode == 0, result.stderr
+        assert 'Total: 2 lookups, hit ratio 50.0%' in result.stdout
+
+    def test_cli_cache_calibrate(self, tmp_path):
+        import subprocess
+        from src.tools.search_cache import SearchCache
+        
+        path = str(tmp_path / "cache.db")
+        cache = SearchCache(cache_path=path)
+        for query, url in (("quantum computing basics", "https://a.com"),
+                           ("quantum computing basic", "https://a.com"),
+                           ("ocean warming trends", "https://b.com")):
+            cache.put(query, "basic", 5, {"results": [{"url": url, "content": "text"}]})
+        cache.close()
+        env = {k: v for k, v in os.environ.items() if k != 'OPENAI_API_KEY'}
+        
+        result = subprocess.run(
+            [sys.executable, 'cli.py', 'cache', '--cache-path', path, 'calibrate',
+             '--research-db', str(tmp_path / "missing.db")],
+            capture_output=True, text=True, timeout=30, env=env
+        )
+        assert result.returncode == 0, result.stderr
+        assert 'Threshold calibration on 3 distinct queries' in result.stdout
+        assert 'hash-256' in result.stdout
+        assert 'Skipping openai' in result.stdout
+
+    def test_cli_cache_train_idf(self, tmp_path):
+        import subprocess
+        from src.tools.search_cache import SearchCache
+        
+        path = str(tmp_path / "cache.db")
+        cache = SearchCache(cache_path=path)
+        for query in ("quantum computing basics", "ocean warming trends", "protein folding news"):
+            cache.put(query, "basic", 5, {"results": [{"url": f"https://{query[:5]}.com", "content": "text"}]})
+        cache.close()
+        idf_path = str(tmp_path / "idf.npy")
+        
+        result = subprocess.run(
+            [sys.executable, 'cli.py', 'cache', '--cache-path', path, 'train-idf',
+             '--research-db', str(tmp_path / "missing.db"), '--idf-path', idf_path],
+            capture_output=True, text=True, timeout=30
+        )
+        assert result.returncode == 0, result.stderr
+        assert 'on 3 texts' in result.stdout
+        assert os.path.exists(idf_path)
+        
+        result = subprocess.run(
+            [sys.executable, 'cli.py', 'cache', '--cache-path', path, 'calibrate', '--providers', 'idf',
+             '--research-db', str(tmp_path / "missing.db"), '--idf-path', idf_path],
+            capture_output=True, text=True, timeout=30
+        )
+        assert result.returncode == 0, result.stderr
+        assert 'idf-256-' in result.stdout
+
+    def test_cli_cache_export_import(self, tmp_path):
+        import subprocess
+        from src.tools.search_cache import SearchCache
+        
+        source = str(tmp_path / "source.db")
+        cache = SearchCache(cache_path=source)
+        cache.put("quantum computing basics", "basic", 5, {"results": [{"content": "qubits"}]})
+        cache.close()
+        snapshot = str(tmp_path / "snapshot.db")
+        env = {k: v for k, v in os.environ.items() if k != 'OPENAI_API_KEY'}
+        
+        result = subprocess.run(
+            [sys.executable, 'cli.py', 'cache', '--cache-path', source, 'export', snapshot,
+             '--min-hits', '0', '--translation-cache-path', str(tmp_path / "tc.db")],
+            capture_output=True, text=True, timeout=30, env=env
+        )
+        assert result.returncode == 0, result.stderr
+        assert 'Exported 1 entries' in result.stdout
+        
+        target = str(tmp_path / "target.db")
+        result = subprocess.run(
+            [sys.executable, 'cli.py', 'cache', '--cache-path', target, 'import', snapshot,
+             '--translation-cache-path', str(tmp_path / "tc.db")],
+            capture_output=True, text=True, timeout=30, env=env
+        )
+        assert result.returncode == 0, result.stderr
+        assert 'Imported 1 entries' in result.stdout
+        assert SearchCache(cache_path=target).get("quantum computing basics", "basic", 5) is not None
+
     def test_cli_short_topic(self):
         import subprocess
         result = subprocess.run(
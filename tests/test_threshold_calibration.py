@@ -0,0 +1,116 @@
+"""
+Tests for offline similarity-threshold calibration.
+"""
+
+import sqlite3
+import numpy as np
+
+from src.tools.embeddings import EmbeddingProvider, HashEmbedding
+from src.tools.search_cache import SearchCache
+from src.tools.threshold_calibration import (
+    QuerySample, calibrate, load_samples, nearest_neighbours,
+)
+
+
+class FixedEmbedding(EmbeddingProvider):
+    """Returns preset unit vectors per query."""
+
+    def __init__(self, vectors):
+        self.vectors = {q: (np.asarray(v) / np.linalg.norm(v)).astype(np.float32) for q, v in vectors.items()}
+
+    @property
+    def dimensions(self) -> int:
+        return 3
+
+    def embed(self, text: str) -> bytes:
+        return self.vectors[text].tobytes()
+
+
+def _results(*urls):
+    return {"results": [{"title": u, "url": u, "content": "text"} for u in urls]}
+
+
+class TestLoadSamples:
+
+    def test_from_cache_and_research_db(self, tmp_path):
+        cache = SearchCache(cache_path=str(tmp_path / "cache.db"))
+        cache.put("Quantum computing", "basic", 5, _results("https://a.com/1", "https://a.com/2?utm_source=x"))
+        cache.put("no results query", "basic", 5, {"results": []})
+        cache.close()
+
+        db = tmp_path / "research.db"
+        with sqlite3.connect(db) as conn:
+            conn.execute("CREATE TABLE queries (id INTEGER PRIMARY KEY, query_text TEXT, "
+                         "search_depth TEXT, max_results INTEGER)")
+            conn.execute("CREATE TABLE sources (id INTEGER PRIMARY KEY, query_id INTEGER, url TEXT)")
+            conn.execute("INSERT INTO queries VALUES (1, 'quantum computing', 'basic', 5)")
+            conn.execute("INSERT INTO queries VALUES (2, 'ocean warming', 'advanced', 5)")
+            conn.executemany("INSERT INTO sources (query_id, url) VALUES (?, ?)",
+                             [(1, "https://a.com/3"), (2, "https://b.com/")])
+        conn.close()
+
+        samples = {(s.query.lower(), s.search_depth): s for s in load_samples(tmp_path / "cache.db", db)}
+        assert set(samples) == {("quantum computing", "basic"), ("ocean warming", "advanced")}
+        assert samples[("quantum computing", "basic")].urls == {
+            "https://a.com/1", "https://a.com/2", "https://a.com/3",
+        }
+
+    def test_missing_sources(self, tmp_path):
+        assert load_samples(tmp_path / "none.db", tmp_path / "none2.db") == []
+
+
+class TestNearestNeighbours:
+
+    def test_respects_partitions(self):
+        embeddings = np.array([[1, 0], [0.9, 0.1], [1, 0.05]], dtype=np.float32)
+        sims, idx = nearest_neighbours(embeddings, [("basic", 5), ("advanced", 5), ("basic", 5)])
+        assert list(idx) == [2, -1, 0]
+        assert np.isneginf(sims[1])
+
+    def test_blocks_match_full_matrix(self):
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(size=(50, 8)).astype(np.float32)
+        partitions = [("basic", 5)] * 50
+        full = nearest_neighbours(embeddings, partitions)
+        blocked = nearest_neighbours(embeddings, partitions, block_size=7)
+        assert np.array_equal(full[1], blocked[1])
+
+
+class TestCalibrate:
+
+    def _samples(self):
+        return [
+            QuerySample("quantum computing", "basic", 5, {"a", "b", "c"}),
+            QuerySample("quantum computers", "basic", 5, {"a", "b", "d"}),
+            QuerySample("quantum physics", "basic", 5, {"x", "y"}),
+            QuerySample("ocean warming", "basic", 5, {"o", "p"}),
+        ]
+
+    def test_curve_and_recommendation(self):
+        provider = FixedEmbedding({
+            "quantum computing": [1, 0, 0],
+            "quantum computers": [0.98, 0.2, 0],   # ~0.98 to "computing", same results
+            "quantum physics": [0.75, 0, 0.66],    # ~0.75 to "computing", different results
+            "ocean warming": [0, 0, 1],
+        })
+        result = calibrate(self._samples(), provider, thresholds=[0.5, 0.7, 0.9, 0.99],
+                           overlap=0.5, max_false_rate=0.0)
+        assert result["queries"] == 4
+        assert result["reusable"] == 2
+        curve = {p["threshold"]: p for p in result["curve"]}
+        assert curve[0.9]["hit_rate"] == 0.5
+        assert curve[0.9]["false_hit_rate"] == 0.0
+        assert curve[0.9]["recall"] == 1.0
+        assert curve[0.7]["false_hit_rate"] > 0
+        assert result["recommended"] == 0.9
+
+    def test_too_few_queries(self):
+        result = calibrate(self._samples()[:1], HashEmbedding())
+        assert result["curve"] == []
+        assert result["recommended"] is None
+
+    def test_hash_provider_runs(self):
+        result = calibrate(self._samples(), HashEmbedding())
+        assert result["provider"] == "hash-256"
+        assert len(result["curve"]) == 19
+        assert all(0.0 <= p["false_hit_rate"] <= 1.0 for p in result["curve"])
@@ -2,13 +2,19 @@
 Tests for the WebSearchTool module.
 """
 
+import asyncio
 import pytest
 import json
 import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import Mock, patch, AsyncMock
 from pathlib import Path
 
-from src.tools.web_search import WebSearchTool, SearchResult, SearchResponse
+from src.tools.hedging import LatencyTracker, LatencyTrackers, hedged
+from src.tools.single_flight import SingleFlight
+from src.tools.web_search import WebSearchTool, SearchResult, SearchResponse, SearchTimeoutError
+from src.tools.tavily_transport import AsyncTransport, TavilyHTTPPool, ThreadTransport
 
 
 class TestWebSearchTool:
@@ -144,6 +150,217 @@ class TestWebSearchTool:
                 await web_search_tool.extract_url_content("https://example.com")
 
 
+    @pytest.mark.asyncio
+    async def test_search_many_uses_bulk_cache(self, tmp_path, mock_tavily_response):
+        """Bulk search resolves hits via get_many and stores misses via put_many."""
+        from src.tools.search_cache import SearchCache
+
+        cache = SearchCache(cache_path=str(tmp_path / "cache.db"))
+        cache.put("cached query", "basic", 5, mock_tavily_response)
+        tool = WebSearchTool(api_key="test-key", search_cache=cache)
+
+        with patch.object(tool.client, 'search', return_value=mock_tavily_response) as mock_search:
+            results = await tool.search_many(["cached query", "fresh query"])
+
+        assert [r.query for r in results] == ["cached query", "fresh query"]
+        assert results[0].cache_hit is True
+        assert results[1].cache_hit is False
+        mock_search.assert_called_once()
+        assert cache.get("fresh query", "basic", 5) is not None
+
+    @pytest.mark.asyncio
+    async def test_search_many_failures(self, web_search_tool, mock_tavily_response):
+        """A failed query raises by default, or is returned in place with return_exceptions."""
+        def fake_search(query, **kwargs):
+            if query == "bad":
+                raise Exception("API Error")
+            return mock_tavily_response
+
+        with patch.object(web_search_tool.client, 'search', side_effect=fake_search):
+            with pytest.raises(RuntimeError, match="Web search failed: API Error"):
+                await web_search_tool.search_many(["good", "bad"])
+
+            results = await web_search_tool.search_many(["good", "bad"], return_exceptions=True)
+
+        assert isinstance(results[0], SearchResponse)
+        assert isinstance(results[1], RuntimeError)
+
+    @pytest.fixture
+    def stale_cache(self, tmp_path, mock_tavily_response):
+        """Cache holding one entry that has expired but is inside the grace window."""
+        import time
+        from src.tools.search_cache import SearchCache
+
+        cache = SearchCache(cache_path=str(tmp_path / "swr.db"), ttl_hours=0, stale_grace_hours=1)
+        cache.put("stale query", "basic", 5, mock_tavily_response)
+        time.sleep(0.05)
+        cache.ttl_hours = 1
+        yield cache
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_stale_result_served_and_refreshed(self, stale_cache, mock_tavily_response):
+        """An expired entry in the grace window is returned at once and refreshed behind."""
+        import threading
+
+        tool = WebSearchTool(api_key="test-key", search_cache=stale_cache)
+        fresh = dict(mock_tavily_response, answer="Fresh answer")
+        refreshed = threading.Event()
+
+        def fake_search(**kwargs):
+            refreshed.set()
+            return fresh
+
+        with patch.object(tool.client, 'search', side_effect=fake_search):
+            result = await tool.search("stale query")
+            assert result.stale is True
+            assert result.cache_hit is True
+            assert result.answer == mock_tavily_response["answer"]
+            assert refreshed.wait(5)
+
+            for _ in range(100):
+                if stale_cache.get("stale query", "basic", 5) is not None:
+                    break
+                await asyncio.sleep(0.02)
+        assert stale_cache.get("stale query", "basic", 5)["answer"] == "Fresh answer"
+
+    @pytest.mark.asyncio
+    async def test_refresh_deduplicated_per_key(self, stale_cache, mock_tavily_response):
+        """Only one background refresh runs per cache key."""
+        import threading
+
+        tool = WebSearchTool(api_key="test-key", search_cache=stale_cache)
+        release = threading.Event()
+
+        def slow_search(**kwargs):
+            release.wait(5)
+            return mock_tavily_response
+
+        with patch.object(tool.client, 'search', side_effect=slow_search) as mock_search:
+            first = tool._schedule_refresh("stale query", 5, "basic", True, False, False, None)
+            second = tool._schedule_refresh("stale query", 5, "basic", True, False, False, None)
+            assert first is not None
+            assert second is None
+            release.set()
+            first.join(5)
+        assert mock_search.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_deadline_releases_key(self, stale_cache, mock_tavily_response):
+        """A hung refresh gives up at the tool's deadline and can be retried."""
+        import threading
+
+        tool = WebSearchTool(api_key="test-key", search_cache=stale_cache, timeout=0.1,
+                             single_flight=SingleFlight())
+        release = threading.Event()
+
+        def hung_search(**kwargs):
+            release.wait(5)
+            return mock_tavily_response
+
+        with patch.object(tool.client, 'search', side_effect=hung_search):
+            first = tool._schedule_refresh("stale query", 5, "basic", True, False, False, None)
+            first.join(2)
+            assert not first.is_alive()
+            again = tool._schedule_refresh("stale query", 5, "basic", True, False, False, None)
+            assert again is not None
+            release.set()
+            again.join(5)
+
+    @pytest.mark.asyncio
+    async def test_no_grace_window_goes_to_tavily(self, tmp_path, mock_tavily_response):
+        """Without stale_grace_hours an expired entry is a plain miss."""
+        import time
+        from src.tools.search_cache import SearchCache
+
+        cache = SearchCache(cache_path=str(tmp_path / "noswr.db"), ttl_hours=0)
+        cache.put("old query", "basic", 5, mock_tavily_response)
+        time.sleep(0.05)
+        tool = WebSearchTool(api_key="test-key", search_cache=cache)
+
+        with patch.object(tool.client, 'search', return_value=mock_tavily_response) as mock_search:
+            result = await tool.search("old query")
+        assert result.stale is False
+        assert result.cache_hit is False
+        mock_search.assert_called_once()
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_extract_cached_by_canonical_url(self, tmp_path):
+        from src.tools.search_cache import SearchCache
+
+        cache = SearchCache(cache_path=str(tmp_path / "extract.db"))
+        tool = WebSearchTool(api_key="test-key", search_cache=cache)
+        page = {"results": [{"url": "https://example.com/a", "raw_content": "text"}], "failed_results": []}
+        with patch.object(tool.client, 'extract', return_value=page) as mock_extract:
+            first = await tool.extract_url_content("https://Example.com/a/?utm_source=x")
+            second = await tool.extract_url_content("https://example.com/a#section")
+        assert first == second == page
+        assert mock_extract.call_count == 1
+
+        failed = {"results": [], "failed_results": [{"url": "https://example.com/b"}]}
+        with patch.object(tool.client, 'extract', return_value=failed) as mock_extract:
+            await tool.extract_url_content("https://example.com/b")
+            await tool.extract_url_content("https://example.com/b")
+        assert mock_extract.call_count == 2
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_context_and_qna_cached(self, tmp_path):
+        from src.tools.search_cache import SearchCache
+
+        cache = SearchCache(cache_path=str(tmp_path / "qna.db"))
+        tool = WebSearchTool(api_key="test-key", search_cache=cache)
+        with patch.object(tool.client, 'qna_search', return_value="An answer") as mock_qna, \
+                patch.object(tool.client, 'get_search_context', return_value="[]") as mock_context:
+            assert await tool.qna_search("What is AI?") == "An answer"
+            assert await tool.qna_search("what is ai? ") == "An answer"
+            await tool.get_search_context("What is AI?", max_results=5)
+            await tool.get_search_context("What is AI?", max_results=5)
+            await tool.get_search_context("What is AI?", max_results=10)
+        assert mock_qna.call_count == 1
+        assert mock_context.call_count == 2
+        assert cache.get_stats()["namespaces"]["context"]["entries"] == 2
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_cache_lookups_do_not_block_loop(self, mock_tavily_response):
+        import time
+
+        def slow_get(query, depth, max_results):
+            time.sleep(0.1)  # e.g. a remote embedding call on a semantic lookup
+            return mock_tavily_response
+
+        tool = WebSearchTool(api_key="test-key", search_cache=Mock(get=Mock(side_effect=slow_get)))
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(tool.search(f"query {i}") for i in range(4)))
+        assert time.perf_counter() - start < 0.3
+        assert all(response.cache_hit for response in responses)
+
+    @pytest.mark.asyncio
+    async def test_bulk_cache_lookup_does_not_block_loop(self, mock_tavily_response):
+        import time
+
+        def slow_get_many(queries, depth, max_results):
+            time.sleep(0.2)
+            return [mock_tavily_response] * len(queries)
+
+        tool = WebSearchTool(api_key="test-key", search_cache=Mock(get_many=Mock(side_effect=slow_get_many)))
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        responses = await tool.search_many(["a", "b"])
+        task.cancel()
+        assert ticks >= 5
+        assert all(response.cache_hit for response in responses)
+
+
 class TestSearchResult:
     """Test suite for SearchResult dataclass."""
     
@@ -213,4 +430,418 @@ class TestSearchResponse:
         assert response.answer is None
         assert response.follow_up_questions is None
         assert response.search_context is None
-        assert response.images is None
\ No newline at end of file
+        assert response.images is None
+
+class TestSingleFlight:
+    """Concurrent identical searches share one Tavily call."""
+
+    @pytest.fixture
+    def flight(self):
+        from src.tools.single_flight import SingleFlight
+        return SingleFlight()
+
+    @pytest.fixture
+    def slow_client_search(self, mock_tavily_response):
+        import time
+
+        def slow_search(**kwargs):
+            time.sleep(0.2)
+            return mock_tavily_response
+        return slow_search
+
+    @pytest.fixture
+    def mock_tavily_response(self):
+        fixture_path = Path(__file__).parent / "fixtures" / "mock_tavily_response.json"
+        with open(fixture_path, 'r') as f:
+            return json.load(f)
+
+    @pytest.mark.asyncio
+    async def test_same_loop_coalesced(self, tmp_path, flight, slow_client_search):
+        from src.tools.search_cache import SearchCache
+
+        cache = SearchCache(cache_path=str(tmp_path / "sf.db"))
+        tool = WebSearchTool(api_key="test-key", search_cache=cache, single_flight=flight)
+        with patch.object(tool.client, 'search', side_effect=slow_client_search) as mock_search, \
+                patch.object(cache, 'put', wraps=cache.put) as mock_put:
+            first, second = await asyncio.gather(tool.search("same query"), tool.search("same query"))
+
+        assert mock_search.call_count == 1
+        assert mock_put.call_count == 1
+        assert first.results == second.results
+        assert flight.get_stats() == {"executed": 1, "saved": 1, "in_flight": 0}
+        cache.close()
+
+    def test_coalesced_across_threads(self, flight, slow_client_search):
+        """Each app research thread runs its own event loop."""
+        import threading
+
+        tool = WebSearchTool(api_key="test-key", single_flight=flight)
+        results = []
+        with patch.object(tool.client, 'search', side_effect=slow_client_search) as mock_search:
+            threads = [
+                threading.Thread(target=lambda: results.append(asyncio.run(tool.search("shared query"))))
+                for _ in range(3)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(5)
+
+        assert len(results) == 3
+        assert mock_search.call_count == 1
+        assert flight.get_stats()["saved"] == 2
+
+    @pytest.mark.asyncio
+    async def test_different_params_not_coalesced(self, flight, slow_client_search):
+        tool = WebSearchTool(api_key="test-key", single_flight=flight)
+        with patch.object(tool.client, 'search', side_effect=slow_client_search) as mock_search:
+            await asyncio.gather(tool.search("q", max_results=5), tool.search("q", max_results=10))
+        assert mock_search.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_different_api_keys_not_coalesced(self, flight, slow_client_search):
+        tools = [WebSearchTool(api_key=key, single_flight=flight) for key in ("key-a", "key-b")]
+        with patch.object(tools[0].client, 'search', side_effect=slow_client_search) as search_a, \
+                patch.object(tools[1].client, 'search', side_effect=slow_client_search) as search_b:
+            await asyncio.gather(*(tool.search("same query") for tool in tools))
+        assert (search_a.call_count, search_b.call_count) == (1, 1)
+        assert flight.get_stats()["saved"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_not_shared(self, flight):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return len(calls)
+
+        leader = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await follower == (2, False)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_shared(self, flight):
+        import time
+
+        def failing_search(**kwargs):
+            time.sleep(0.1)
+            raise Exception("API Error")
+
+        tool = WebSearchTool(api_key="test-key", single_flight=flight)
+        with patch.object(tool.client, 'search', side_effect=failing_search) as mock_search:
+            outcomes = await asyncio.gather(tool.search("q"), tool.search("q"), return_exceptions=True)
+
+        assert mock_search.call_count == 1
+        assert all(isinstance(o, RuntimeError) for o in outcomes)
+        assert flight.get_stats()["in_flight"] == 0
+
+
+class _StubTavilyHandler(BaseHTTPRequestHandler):
+    """Minimal Tavily /search and /extract endpoints over keep-alive HTTP/1.1."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, body, self.headers.get("Authorization"), self.client_address[1]))
+        if body.get("query") == "fail":
+            status, payload = 429, {"detail": {"error": "rate limited"}}
+        elif self.path == "/extract":
+            status, payload = 200, {"results": [{"url": body["urls"], "raw_content": "page text"}]}
+        else:
+            status, payload = 200, dict(self.server.search_response, query=body["query"])
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestAsyncTransport:
+    """WebSearchTool over the pooled HTTP transport, against a local Tavily stub."""
+
+    @pytest.fixture
+    def tavily_server(self):
+        pytest.importorskip("httpx")
+        fixture_path = Path(__file__).parent / "fixtures" / "mock_tavily_response.json"
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _StubTavilyHandler)
+        server.requests = []
+        server.search_response = json.loads(fixture_path.read_text())
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    @pytest.fixture
+    def pool(self):
+        pool = TavilyHTTPPool()
+        yield pool
+        pool.close()
+
+    def _tool(self, server, pool, **kwargs):
+        tool = WebSearchTool(api_key="test-key", transport="async", http_pool=pool, **kwargs)
+        tool.transport.base_url = f"http://127.0.0.1:{server.server_port}"
+        return tool
+
+    @pytest.mark.asyncio
+    async def test_search(self, tavily_server, pool):
+        tool = self._tool(tavily_server, pool)
+        assert isinstance(tool.transport, AsyncTransport)
+        response = await tool.search("AI trends 2025", max_results=3)
+
+        assert len(response.results) == 5
+        assert response.answer
+        path, body, auth, _ = tavily_server.requests[0]
+        assert (path, auth) == ("/search", "Bearer test-key")
+        assert body == {"query": "AI trends 2025", "search_depth": "basic", "max_results": 3,
+                        "include_answer": True, "include_images": False, "include_raw_content": False}
+
+    def test_connections_reused_across_event_loops(self, tavily_server, pool):
+        """Research runs each get their own loop; they still share warm connections."""
+        tool = self._tool(tavily_server, pool)
+        for i in range(3):
+            thread = threading.Thread(target=lambda i=i: asyncio.run(tool.search(f"query {i}")))
+            thread.start()
+            thread.join(5)
+
+        assert len(tavily_server.requests) == 3
+        assert len({port for *_, port in tavily_server.requests}) == 1
+        assert pool.get_stats() == {"started": True, "requests": 3, "errors": 0}
+
+    @pytest.mark.asyncio
+    async def test_error_status(self, tavily_server, pool):
+        tool = self._tool(tavily_server, pool)
+        with pytest.raises(RuntimeError, match="Web search failed: Tavily API returned 429: rate limited"):
+            await tool.search("fail")
+        assert pool.get_stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_qna_context_and_extract(self, tavily_server, pool):
+        tool = self._tool(tavily_server, pool)
+        assert await tool.qna_search("AI trends") == tavily_server.search_response["answer"]
+        assert tavily_server.requests[-1][1]["search_depth"] == "advanced"
+
+        # Token counting needs tiktoken's downloadable encodings
+        with patch("src.tools.tavily_transport.get_max_items_from_list", side_effect=lambda items, n: items[:2]):
+            context = json.loads(await tool.get_search_context("AI trends"))
+        assert [c["url"] for c in context] == [r["url"] for r in tavily_server.search_response["results"][:2]]
+        assert tavily_server.requests[-1][1]["include_answer"] is False
+
+        extracted = await tool.extract_url_content("https://example.com/a")
+        assert extracted["results"][0]["raw_content"] == "page text"
+        assert extracted["failed_results"] == []
+        assert tavily_server.requests[-1][:2] == ("/extract", {"urls": "https://example.com/a", "timeout": 30})
+
+    def test_transport_selection(self):
+        assert isinstance(WebSearchTool(api_key="k").transport, ThreadTransport)
+        with patch("src.tools.tavily_transport.HTTPX_AVAILABLE", False):
+            assert isinstance(WebSearchTool(api_key="k", transport="async").transport, ThreadTransport)
+        with pytest.raises(ValueError, match="Unknown Tavily transport"):
+            WebSearchTool(api_key="k", transport="grpc")
+
+
+class TestDeadlinesAndHedging:
+    """Per-call deadlines and hedged backup requests."""
+
+    @pytest.fixture
+    def mock_tavily_response(self):
+        fixture_path = Path(__file__).parent / "fixtures" / "mock_tavily_response.json"
+        with open(fixture_path, 'r') as f:
+            return json.load(f)
+
+    @pytest.fixture
+    def tracker(self):
+        tracker = LatencyTracker(min_samples=5)
+        for _ in range(5):
+            tracker.record(0.02)
+        return tracker
+
+    def _slow_first(self, response, first_delay):
+        import time
+        calls = []
+
+        def search(**kwargs):
+            calls.append(kwargs["query"])
+            if len(calls) == 1:
+                time.sleep(first_delay)
+            return response
+        return search, calls
+
+    @pytest.mark.asyncio
+    async def test_deadline_raises_timeout(self, mock_tavily_response):
+        search, _ = self._slow_first(mock_tavily_response, 0.5)
+        tool = WebSearchTool(api_key="test-key", timeout=0.1, single_flight=SingleFlight())
+        with patch.object(tool.client, 'search', side_effect=search):
+            with pytest.raises(SearchTimeoutError, match="within 0.1s") as excinfo:
+                await tool.search("slow query")
+
+        failed = SearchResponse.failed("slow query", excinfo.value)
+        assert failed.timed_out and failed.results == []
+        assert SearchResponse.failed("q", RuntimeError("boom")).timed_out is False
+
+    @pytest.mark.asyncio
+    async def test_search_many_keeps_timeouts(self, mock_tavily_response):
+        import time
+
+        def search(**kwargs):
+            if kwargs["query"] == "slow":
+                time.sleep(0.5)
+            return mock_tavily_response
+
+        tool = WebSearchTool(api_key="test-key", timeout=0.1, single_flight=SingleFlight())
+        with patch.object(tool.client, 'search', side_effect=search):
+            fast, slow = await tool.search_many(["fast", "slow"], return_exceptions=True)
+        assert len(fast.results) == 5
+        assert isinstance(slow, SearchTimeoutError)
+
+    @pytest.mark.asyncio
+    async def test_slow_call_hedged(self, tracker, mock_tavily_response):
+        search, calls = self._slow_first(mock_tavily_response, 0.5)
+        tool = WebSearchTool(api_key="test-key", hedge_percentile=95, latency_tracker=tracker,
+                             single_flight=SingleFlight())
+        with patch.object(tool.client, 'search', side_effect=search):
+            start = asyncio.get_running_loop().time()
+            response = await tool.search("hedged query")
+            elapsed = asyncio.get_running_loop().time() - start
+
+        assert len(response.results) == 5
+        assert calls == ["hedged query", "hedged query"]
+        assert elapsed < 0.4
+        assert tracker.get_stats()["hedged"] == 1
+        assert tracker.get_stats()["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fast_call_not_hedged(self, tracker, mock_tavily_response):
+        tool = WebSearchTool(api_key="test-key", hedge_percentile=95, latency_tracker=tracker,
+                             single_flight=SingleFlight())
+        with patch.object(tool.client, 'search', return_value=mock_tavily_response) as mock_search:
+            await tool.search("fast query")
+        assert mock_search.call_count == 1
+        assert tracker.get_stats()["samples"] == 6
+
+    @pytest.mark.asyncio
+    async def test_timeout_recorded_at_deadline(self, mock_tavily_response):
+        search, _ = self._slow_first(mock_tavily_response, 0.5)
+        tracker = LatencyTracker(min_samples=1)
+        tool = WebSearchTool(api_key="test-key", timeout=0.1, latency_tracker=tracker,
+                             single_flight=SingleFlight())
+        with patch.object(tool.client, 'search', side_effect=search):
+            with pytest.raises(SearchTimeoutError):
+                await tool.search("slow query")
+        assert tracker.get_stats()["samples"] == 1
+        assert tracker.percentile(50) == pytest.approx(0.1)
+
+    @pytest.mark.asyncio
+    async def test_latency_tracked_per_depth(self, mock_tavily_response, monkeypatch):
+        import src.tools.web_search as web_search
+
+        trackers = LatencyTrackers()
+        monkeypatch.setattr(web_search, "search_latency", trackers)
+        tool = WebSearchTool(api_key="test-key", hedge_percentile=95, single_flight=SingleFlight())
+        with patch.object(tool.client, 'search', return_value=mock_tavily_response):
+            await tool.search("basic query")
+            await tool.search("deep query", search_depth="advanced")
+            await tool.search("other deep query", search_depth="advanced")
+        stats = trackers.get_stats()
+        assert stats["basic"]["samples"] == 1
+        assert stats["advanced"]["samples"] == 2
+
+    @pytest.mark.asyncio
+    async def test_no_hedging_before_enough_samples(self, mock_tavily_response):
+        search, calls = self._slow_first(mock_tavily_response, 0.1)
+        tool = WebSearchTool(api_key="test-key", hedge_percentile=95,
+                             latency_tracker=LatencyTracker(min_samples=5), single_flight=SingleFlight())
+        with patch.object(tool.client, 'search', side_effect=search):
+            await tool.search("cold start")
+        assert len(calls) == 1
+
+
+class TestHedged:
+
+    @pytest.mark.asyncio
+    async def test_failed_attempt_falls_back_to_other(self):
+        tracker = LatencyTracker()
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            if len(attempts) == 1:
+                await asyncio.sleep(0.05)
+                raise RuntimeError("primary broke")
+            await asyncio.sleep(0.1)
+            return "backup"
+
+        assert await hedged(call, 0.01, tracker) == "backup"
+        assert (tracker.hedged, tracker.hedge_wins) == (1, 1)
+        # The failed primary and the winning backup are both recorded
+        assert len(tracker._samples) == 2
+
+    @pytest.mark.asyncio
+    async def test_losing_primary_recorded_as_lower_bound(self):
+        tracker = LatencyTracker()
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            await asyncio.sleep(1 if len(attempts) == 1 else 0.02)
+            return len(attempts)
+
+        await hedged(call, 0.05, tracker)
+        samples = sorted(tracker._samples)
+        assert len(samples) == 2
+        assert samples[0] < 0.05 <= samples[1] < 0.5
+
+    @pytest.mark.asyncio
+    async def test_caller_cancellation_not_recorded(self):
+        tracker = LatencyTracker()
+
+        async def call():
+            await asyncio.sleep(1)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(hedged(call, 0.01, tracker), 0.05)
+        assert len(tracker._samples) == 0
+
+    @pytest.mark.asyncio
+    async def test_both_failing_raise_first_error(self):
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            await asyncio.sleep(0.05 if len(attempts) == 1 else 0.1)
+            raise RuntimeError(f"attempt {len(attempts)}")
+
+        with pytest.raises(RuntimeError, match="attempt"):
+            await hedged(call, 0.01)
+        assert len(attempts) == 2
+
+    @pytest.mark.asyncio
+    async def test_loser_cancelled(self):
+        cancelled = []
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            if len(attempts) == 1:
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    cancelled.append("primary")
+                    raise
+            return "backup"
+
+        assert await hedged(call, 0.01) == "backup"
+        await asyncio.sleep(0)
+        assert cancelled == ["primary"]